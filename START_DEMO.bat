@@ -10,7 +10,7 @@ echo This will start BOTH the dashboard AND simulator!
 echo.
 echo Features:
 echo  - Green "DEMO LIVE" indicator
-echo  - Auto-refresh every 5 seconds
+echo  - Live updates as new data arrives
 echo  - Simulated emails every 10 seconds
 echo  - CRITICAL/urgent emails every 5th email
 echo  - Perfect for demonstrations!
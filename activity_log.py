@@ -0,0 +1,183 @@
+"""
+Activity Log - Non-blocking, rotating writer for bot_activity.log
+
+log() only puts a record on a queue; a background thread writes whatever
+has queued up in one batch, so logging never waits on the disk.
+
+- the log rotates when it passes max_bytes, and when the day (or hour)
+  changes - rotated segments are gzipped and only the newest `backups` kept
+- optional JSON lines file (one {"ts", "level", "msg", ...} object per
+  line) next to the human-readable log, rotated the same way
+- stop() writes everything still queued
+"""
+
+import glob
+import gzip
+import json
+import os
+import queue
+import shutil
+import threading
+from datetime import datetime
+
+ROTATE_WHEN = {"daily": "%Y-%m-%d", "hourly": "%Y-%m-%d %H", None: None}
+
+
+def format_text(ts, level, msg, fields):
+    """The bot_activity.log line format"""
+    return f"[{ts.strftime('%Y-%m-%d %H:%M:%S')}] [{level}] {msg}\n"
+
+
+def format_json(ts, level, msg, fields):
+    """One JSON object per line"""
+    record = {"ts": ts.isoformat(timespec="milliseconds"), "level": level, "msg": msg}
+    record.update(fields)
+    return json.dumps(record, ensure_ascii=False, default=str) + "\n"
+
+
+class LogSegment:
+    """One log file: appends text, rotates on size/time, gzips old segments"""
+
+    def __init__(self, path, formatter, max_bytes, when, backups, compress):
+        self.path = path
+        self.formatter = formatter
+        self.max_bytes = max_bytes
+        self.period_format = ROTATE_WHEN[when]
+        self.backups = backups
+        self.compress = compress
+        self._file = None
+        self._period = None
+
+    def _open(self, now):
+        if self._file is None:
+            self._file = open(self.path, "a", encoding="utf-8")
+            # An existing file belongs to the period it was last written in
+            started = datetime.fromtimestamp(os.path.getmtime(self.path)) if self._file.tell() else now
+            self._period = self._period_of(started)
+        return self._file
+
+    def _period_of(self, ts):
+        return ts.strftime(self.period_format) if self.period_format else None
+
+    def write(self, records):
+        """Write a batch of (ts, level, msg, fields) records, rotating first if due"""
+        text = "".join(self.formatter(*r) for r in records)
+        now = records[-1][0]
+        f = self._open(now)
+        if not f.tell():
+            self._period = self._period_of(now)
+        elif ((self.max_bytes and f.tell() + len(text) > self.max_bytes)
+              or self._period_of(now) != self._period):
+            self.rotate()
+            f = self._open(now)
+        f.write(text)
+        f.flush()
+
+    def rotate(self):
+        """Close the current file, rename (and gzip) it, prune old segments"""
+        self.close()
+        if not os.path.exists(self.path) or os.path.getsize(self.path) == 0:
+            return
+        stamp = datetime.fromtimestamp(os.path.getmtime(self.path)).strftime("%Y%m%d-%H%M%S")
+        target = f"{self.path}.{stamp}"
+        n = 1
+        while os.path.exists(target) or os.path.exists(target + ".gz"):
+            target = f"{self.path}.{stamp}-{n}"
+            n += 1
+        os.replace(self.path, target)
+
+        if self.compress:
+            with open(target, "rb") as src, gzip.open(target + ".gz", "wb") as dst:
+                shutil.copyfileobj(src, dst)
+            os.remove(target)
+
+        if self.backups is not None:
+            old = sorted(glob.glob(glob.escape(self.path) + ".*"), key=os.path.getmtime)
+            for path in old[:max(len(old) - self.backups, 0)]:
+                os.remove(path)
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class ActivityLog:
+    """Queue-fed activity log with a background batch writer"""
+
+    def __init__(self, path, json_path=None, max_bytes=10 * 1024 * 1024, when="daily",
+                 backups=14, compress=True, batch_size=500):
+        if when not in ROTATE_WHEN:
+            raise ValueError(f"when must be one of {list(ROTATE_WHEN)}, got {when!r}")
+        self.batch_size = batch_size
+        self.segments = [LogSegment(path, format_text, max_bytes, when, backups, compress)]
+        if json_path:
+            self.segments.append(LogSegment(json_path, format_json, max_bytes, when, backups, compress))
+
+        self._queue = queue.SimpleQueue()
+        self._write_lock = threading.Lock()
+        self._thread = None
+        self.dropped = 0  # records lost to write errors
+
+    def write(self, level, msg, **fields):
+        """Queue one record (never blocks on the disk once start() is called)"""
+        self._queue.put((datetime.now(), level, msg, fields))
+        if self._thread is None:
+            self.flush()  # no background writer running - write now
+
+    def _take(self, batch):
+        """Move queued records into batch (up to batch_size). False once stop() was called"""
+        try:
+            while len(batch) < self.batch_size:
+                record = self._queue.get_nowait()
+                if record is None:
+                    return False
+                batch.append(record)
+        except queue.Empty:
+            pass
+        return True
+
+    def flush(self):
+        """Write everything queued so far"""
+        with self._write_lock:
+            while True:
+                batch = []
+                self._take(batch)
+                if not batch:
+                    return
+                self._write(batch)
+
+    def _write(self, batch):
+        for segment in self.segments:
+            try:
+                segment.write(batch)
+            except Exception:
+                segment.close()
+                self.dropped += len(batch)
+
+    def _run(self):
+        running = True
+        while running:
+            record = self._queue.get()  # sleep until something is logged
+            if record is None:
+                break
+            batch = [record]
+            running = self._take(batch)  # plus whatever queued up meanwhile
+            with self._write_lock:
+                self._write(batch)
+
+    def start(self):
+        """Start the background writer"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="activity-log", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """Stop the background writer, write anything still queued, close the files"""
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join(timeout=5)
+            self._thread = None
+        self.flush()
+        for segment in self.segments:
+            segment.close()
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Activity log benchmark: open/append/close per line vs queued ActivityLog.
+
+Measures what log() costs the caller for N lines, and the total time until
+every line is on disk (stop() included).
+
+    python benchmarks/bench_activity_log.py [N]
+"""
+
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import common  # noqa: F401  (puts the repo root on sys.path)
+
+from activity_log import ActivityLog
+
+
+def log_legacy(path, msg, level="INFO"):
+    """The original file half of distributor.log"""
+    timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(f"[{timestamp}] [{level}] {msg}\n")
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 20_000
+    msg = "[CRITICAL] Assigned to staff.member@sa.gov.au: URGENT - delete duplicate patient scan..."
+
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"Activity log - {n:,} lines")
+
+        path = os.path.join(tmp, "legacy.log")
+        start = time.perf_counter()
+        for _ in range(n):
+            log_legacy(path, msg)
+        base = time.perf_counter() - start
+        print(f"  {'open/append/close per line':<32} caller {base * 1000:8.1f} ms   total {base * 1000:8.1f} ms")
+
+        for label, json_lines in (("ActivityLog", False), ("ActivityLog + JSON lines", True)):
+            path = os.path.join(tmp, f"{json_lines}.log")
+            activity = ActivityLog(path, json_path=path + "l" if json_lines else None)
+            activity.start()
+            start = time.perf_counter()
+            for i in range(n):
+                activity.write("INFO", msg, event="assigned", msg_id=i)
+            caller = time.perf_counter() - start
+            activity.stop()
+            total = time.perf_counter() - start
+            with open(path, encoding="utf-8") as f:
+                assert sum(1 for _ in f) == n
+            print(f"  {label:<32} caller {caller * 1000:8.1f} ms   total {total * 1000:8.1f} ms"
+                  f"   ({base / caller:4.1f}x / {base / total:4.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
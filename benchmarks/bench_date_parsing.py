@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Stats normalization benchmark: per-row date parsing vs whole-column passes.
+
+Normalizes N parsed daily_stats.csv rows - 80% YYYY-MM-DD dates, 20%
+DD/MM/YYYY (rows edited in Excel), and some times saved without seconds
+(9:05) or with AM/PM - the way load_data used to (three
+to_datetime attempts per row, then Date + Time parsed again into DateTime)
+and with normalize_stats (datetime64 columns, built in column passes).
+
+    python benchmarks/bench_date_parsing.py [N ...]
+"""
+
+import sys
+import time
+
+import pandas as pd
+
+import common  # noqa: F401  (puts the repo root on sys.path)
+
+from stats_loader import normalize_stats
+
+
+def legacy_normalize(df):
+    """load_data's normalization before stats_loader.normalize_stats"""
+    def parse_date(date_str):
+        if pd.isna(date_str):
+            return None
+        date_str = str(date_str).strip()
+        try:
+            return pd.to_datetime(date_str, format='%Y-%m-%d').strftime('%Y-%m-%d')
+        except Exception:
+            pass
+        try:
+            return pd.to_datetime(date_str, format='%d/%m/%Y').strftime('%Y-%m-%d')
+        except Exception:
+            pass
+        try:
+            return pd.to_datetime(date_str, dayfirst=True).strftime('%Y-%m-%d')
+        except Exception:
+            return None
+
+    df['Date'] = df['Date'].apply(parse_date)
+    df = df[df['Date'].notna()].copy()
+    df['Assigned To'] = df['Assigned To'].str.lower()
+    df['DateTime'] = pd.to_datetime(df['Date'] + ' ' + df['Time'], errors='coerce')
+    return df
+
+
+def clock_time(i):
+    hour, minute = 7 + i % 11, i % 60
+    if i % 13 == 5:
+        return f"{hour}:{minute:02d}"  # Excel drops the seconds (and the leading zero)
+    if i % 17 == 5:
+        return f"{(hour - 1) % 12 + 1}:{minute:02d} {'PM' if hour >= 12 else 'AM'}"
+    return f"{hour:02d}:{minute:02d}:{i * 7 % 60:02d}"
+
+
+def frame(n):
+    days = pd.date_range("2022-01-01", periods=max(1, n // 300))
+    day = days[[i * len(days) // n for i in range(n)]]
+    iso = day.strftime('%Y-%m-%d')
+    dmy = day.strftime('%d/%m/%Y')
+    return pd.DataFrame({
+        "Date": [dmy[i] if i % 5 == 0 else iso[i] for i in range(n)],
+        "Time": [clock_time(i) for i in range(n)],
+        "Subject": "CT transfer",
+        "Assigned To": [f"Staff{i % 9}@sa.gov.au" for i in range(n)],
+        "Sender": "ward@hospital.org.au",
+        "Risk Level": "normal",
+    }, dtype=str)
+
+
+def timed(fn, df):
+    start = time.perf_counter()
+    out = fn(df.copy())
+    return time.perf_counter() - start, out
+
+
+def main():
+    sizes = [int(a) for a in sys.argv[1:]] or [100_000, 1_000_000]
+    print("Stats normalization (dates + DateTime)")
+    for n in sizes:
+        df = frame(n)
+        legacy, old = timed(legacy_normalize, df)
+        vector, new = timed(normalize_stats, df)
+        assert (old['Date'] == new['Date'].dt.strftime('%Y-%m-%d')).all()
+        # Same times wherever the old parsing worked (it guessed one time format
+        # from the first row), and every H:MM / AM-PM time as well
+        parsed = old['DateTime'].notna()
+        assert (old['DateTime'][parsed] == new['DateTime'][parsed]).all()
+        assert new['DateTime'].notna().all()
+        mem_old = old['Date'].memory_usage(deep=True) / 1e6
+        mem_new = new['Date'].memory_usage(deep=True) / 1e6
+        print(f"  {n:>10,} rows   per-row {legacy:7.2f} s   column passes {vector * 1000:7.1f} ms"
+              f"   ({legacy / vector:5.0f}x)   Date column {mem_old:6.1f} MB -> {mem_new:5.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Escalation delivery benchmark: a mass SLA breach against a local SMTP server.
+
+N tickets breach at once, spread over M managers. The debug SMTP server
+charges a handshake per connection (TCP + TLS + login) and a little time
+per message, like a real relay. Compared:
+
+1. a new SMTP connection per escalation, one after another
+2. the outbox over a connection pool, one email per escalation
+3. the outbox over a connection pool, coalesced into per-manager digests
+
+Reports time until every escalation was accepted, per-escalation latency,
+emails and connections used. Finally the server is made to fail for a
+while - every escalation still arrives once it recovers (outbox retries).
+
+    python benchmarks/bench_escalations.py [N] [M]
+"""
+
+import os
+import smtplib
+import sys
+import tempfile
+import threading
+import time
+from datetime import timedelta
+
+import common  # noqa: F401  (puts the repo root on sys.path)
+
+from escalation_outbox import EscalationOutbox
+from smtp_pool import DebugSmtpServer, SmtpPool
+
+CONNECT_LATENCY = 0.03   # per connection
+MESSAGE_LATENCY = 0.005  # per message
+POOL_SIZE = 4
+
+
+def breaches(n, managers):
+    for i in range(n):
+        ticket = {"subject": f"URGENT delete patient scan #{i}", "assigned_to": f"staff{i % 7}@sa.gov.au",
+                  "sender": "ward@hospital.org.au", "risk_type": "Action+Context: delete+patient",
+                  "escalation_count": 0}
+        yield f"manager{i % managers}@sa.gov.au", ticket, timedelta(minutes=21)
+
+
+def per_connection(server, n, managers, tmp):
+    """Baseline: connect, send, quit for every escalation"""
+    outbox = EscalationOutbox(os.path.join(tmp, "baseline.db"), log_path=None)
+    accepted = []
+    start = time.perf_counter()
+    for manager, ticket, elapsed in breaches(n, managers):
+        entry = {"manager": manager, "queued_at": "", "ticket": ticket, "elapsed_s": elapsed.total_seconds()}
+        with smtplib.SMTP(server.host, server.port) as conn:
+            conn.send_message(outbox._message(manager, [entry]))
+        accepted.append(time.perf_counter() - start)
+    return time.perf_counter() - start, accepted, n, n
+
+
+def pooled(server, n, managers, tmp, coalesce, digest_max, fail_for=0.0):
+    """Outbox + pool, delivered by a loop like the bot's escalation task"""
+    pool = SmtpPool(server.host, server.port, size=POOL_SIZE)
+    accepted = []
+    lock = threading.Lock()
+    start = time.perf_counter()
+
+    def send(message):
+        if time.perf_counter() - start < fail_for:
+            raise smtplib.SMTPServerDisconnected("simulated outage")
+        pool.send(message)
+        with lock:
+            accepted.extend([time.perf_counter() - start] * message.get_content().count("] ESCALATION"))
+
+    outbox = EscalationOutbox(os.path.join(tmp, f"outbox_{coalesce}_{digest_max}_{fail_for}.db"), send=send,
+                              log_path=os.path.join(tmp, "escalations.log"), coalesce_seconds=coalesce,
+                              digest_max=digest_max, workers=POOL_SIZE, retry_base=0.5)
+    outbox.open()
+    done = threading.Event()
+
+    def deliver_loop():
+        while not done.is_set():
+            outbox.deliver(0.5)
+
+    worker = threading.Thread(target=deliver_loop, daemon=True)
+    worker.start()
+    for manager, ticket, elapsed in breaches(n, managers):
+        outbox.add(manager, ticket, elapsed)
+    queued = time.perf_counter() - start
+    while outbox.delivered < n:
+        time.sleep(0.005)
+    elapsed = time.perf_counter() - start
+    done.set()
+    worker.join()
+    outbox.close()
+    pool.close()
+    return elapsed, sorted(accepted), outbox.emails, pool.opened, queued, outbox.failed
+
+
+def pct(samples, p):
+    return samples[min(len(samples) - 1, int(len(samples) * p))]
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    managers = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    server = DebugSmtpServer(latency=MESSAGE_LATENCY, connect_latency=CONNECT_LATENCY).start()
+    print(f"Escalation delivery - {n} simultaneous breaches, {managers} managers "
+          f"(SMTP handshake {CONNECT_LATENCY * 1000:.0f} ms, {MESSAGE_LATENCY * 1000:.0f} ms per message)")
+    with tempfile.TemporaryDirectory() as tmp:
+        cases = (
+            ("connection per email", lambda: per_connection(server, n, managers, tmp)),
+            (f"pool of {POOL_SIZE}, per email", lambda: pooled(server, n, managers, tmp, 0, 1)),
+            (f"pool of {POOL_SIZE}, 1 s digests", lambda: pooled(server, n, managers, tmp, 1.0, 50)),
+        )
+        for label, run in cases:
+            before = server.connections
+            result = run()
+            elapsed, accepted, emails = result[:3]
+            print(f"  {label:<24} all in {elapsed:6.2f} s  {n / elapsed:7.0f}/s  latency p50 {pct(accepted, 0.5):5.2f} s"
+                  f"  p99 {pct(accepted, 0.99):5.2f} s  {emails:4} emails  {server.connections - before:4} connections")
+            if len(result) > 4:
+                print(f"  {'':<24} queueing (durable outbox): {result[4] / n * 1e6:6.0f} µs per escalation")
+
+        elapsed, accepted, emails, _, _, failed = pooled(server, n, managers, tmp, 1.0, 50, fail_for=2.0)
+        print(f"\nMail server failing for the first 2 s: {len(accepted)}/{n} delivered after {elapsed:.2f} s "
+              f"({failed} failed attempts retried from the outbox, {emails} digests)")
+    server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Ingestion latency benchmark: interval polling vs push (inotify on Maildir).
+
+Delivers messages into a local Maildir at random moments while the bot's
+runtime (bot_runtime.BotRuntime) runs, then reports the arrival ->
+assignment time the bot measured. Polling uses a shortened interval (POLL
+seconds instead of the production 60) so the run stays short - its latency
+scales with the interval (on average about half of it).
+
+    python benchmarks/bench_ingest_latency.py [messages]
+"""
+
+import contextlib
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+from common import load_subjects
+
+from bot_runtime import BotRuntime
+
+POLL = 5.0
+
+
+def run(distributor, session, pushing, subjects, n):
+    if pushing and not session.can_push():
+        return None
+    distributor.MAIL = session
+    distributor.INGEST_LATENCY.clear()
+
+    runtime = BotRuntime(
+        ingest=distributor.process_inbox,
+        sla_check=distributor.check_sla_breaches,
+        deliver=distributor.deliver_escalations,
+        flush=lambda: None,  # keep the latency samples for the report below
+        mail=session,
+        poll_interval=POLL,
+        sla_interval=POLL,
+        flush_interval=POLL,
+        push=pushing,
+    )
+    thread = threading.Thread(target=runtime.run, daemon=True)
+    thread.start()
+    for subject in subjects[:n]:
+        time.sleep(random.uniform(0, 2 * POLL / 3))
+        session.deliver(subject, "Please action.", "ward@hospital.org.au")
+    while len(distributor.INGEST_LATENCY) < n:
+        time.sleep(0.05)
+    runtime.stop()
+    thread.join()
+    return sorted(distributor.INGEST_LATENCY)
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    subjects = load_subjects()
+    random.seed(1)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        with open("staff.txt", "w") as f:
+            f.write("staff0@sa.gov.au\nstaff1@sa.gov.au\n")
+
+        with contextlib.redirect_stdout(open(os.devnull, "w", encoding="utf-8")):
+            import distributor
+            from mail_session import MaildirSession
+            distributor.ACTIVITY_LOG.start()
+            distributor.STATS.start()
+            distributor.JOURNAL.start()
+
+        print(f"Arrival -> assignment - {n} messages, polling every {POLL:.0f}s (production: 60s)")
+        for label, pushing in (("polling only", False), ("push (inotify)", True)):
+            session = MaildirSession(os.path.join(tmp, f"maildir_{pushing}"))
+            with contextlib.redirect_stdout(open(os.devnull, "w", encoding="utf-8")):
+                samples = run(distributor, session, pushing, subjects, n)
+            if samples is None:
+                print(f"  {label:<16} unavailable (install `watchdog`)")
+                continue
+            p50 = samples[len(samples) // 2]
+            p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+            print(f"  {label:<16} p50 {p50 * 1000:8.0f} ms   p95 {p95 * 1000:8.0f} ms   max {samples[-1] * 1000:8.0f} ms")
+
+        with contextlib.redirect_stdout(open(os.devnull, "w", encoding="utf-8")):
+            distributor.JOURNAL.stop()
+            distributor.STATS.stop()
+            distributor.WATCHDOG.close()
+            distributor.ACTIVITY_LOG.stop()
+        os.chdir(os.path.dirname(os.path.abspath(__file__)))
+
+
+if __name__ == "__main__":
+    main()
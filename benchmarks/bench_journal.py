@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Dispatch journal benchmark: batched fsync and checkpointed recovery.
+
+1. Journal N dispatches (assigned + forwarded + archived each) from 4
+   pipeline-like threads that wait for their intent to be on disk before
+   "forwarding" - fsync per record vs the background group commit.
+2. Restart time (recover()) after N dispatches, without checkpoints and
+   with the default checkpoint interval.
+
+    python benchmarks/bench_journal.py [N]
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import time
+
+import common  # noqa: F401  (puts the repo root on sys.path)
+
+from dispatch_journal import DispatchJournal
+
+THREADS = 4
+
+
+def dispatch(journal, ids):
+    for msg_id in ids:
+        seq = journal.record("assigned", msg_id, assigned_to="staff@sa.gov.au", subject="Printer jam",
+                             roster={"current_index": 1, "total_processed": 1})
+        journal.sync(seq)
+        journal.record("forwarded", msg_id)
+        journal.record("archived", msg_id, row=["2026-01-01", "09:00:00", "x", "staff@sa.gov.au", "w@h", "normal"])
+
+
+def write(path, n, background, checkpoint_every=None):
+    journal = DispatchJournal(path, checkpoint_every=checkpoint_every or 10**12)
+    if background:
+        journal.start()
+    chunks = [[f"MSG{i:09d}" for i in range(t, n, THREADS)] for t in range(THREADS)]
+    start = time.perf_counter()
+    if checkpoint_every:
+        # As in the bot: checkpoint between cycles, whenever one is due
+        for lo in range(0, n, 200):
+            dispatch(journal, [f"MSG{i:09d}" for i in range(lo, min(n, lo + 200))])
+            if journal.checkpoint_due():
+                journal.checkpoint({"roster": {}, "stats_offset": 0})
+    else:
+        threads = [threading.Thread(target=dispatch, args=(journal, ids)) for ids in chunks]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+    journal.stop()
+    return time.perf_counter() - start
+
+
+def recover(path):
+    start = time.perf_counter()
+    result = DispatchJournal(path).recover()
+    return time.perf_counter() - start, result["replayed"]
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 5_000
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"Dispatch journal - {n:,} dispatches (3 records each), {THREADS} threads")
+        base = None
+        for label, background in (("fsync per record", False), ("group commit", True)):
+            elapsed = write(os.path.join(tmp, f"{background}.log"), n, background)
+            base = base or elapsed
+            print(f"  {label:<20} {elapsed:7.2f} s  {n / elapsed:9,.0f} dispatches/s  {base / elapsed:5.1f}x")
+
+        restart_n = n * 20
+        print(f"\nRestart after {restart_n:,} dispatches")
+        for label, every in (("no checkpoints", None), ("checkpoint every 10k", 10_000)):
+            path = os.path.join(tmp, f"restart_{every}.log")
+            write(path, restart_n, True, every)
+            elapsed, replayed = recover(path)
+            size = os.path.getsize(path) / 1e6
+            print(f"  {label:<22} journal {size:7.1f} MB  replayed {replayed:9,}  recover {elapsed * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Dispatch index benchmark: lookup cost as forwarding history grows.
+
+Fills a MessageIndex with N past forwards and reopens it - after a crash
+(Bloom filter rebuilt from every row) and after a clean stop (saved filter
+loaded) - then times get() for unread messages that are new - nearly
+every lookup in practice - and for ones that were already forwarded.
+
+    python benchmarks/bench_message_index.py [N ...]
+"""
+
+import os
+import sys
+import tempfile
+import time
+
+import common  # noqa: F401  (puts the repo root on sys.path)
+
+from message_index import MessageIndex, digest
+
+LOOKUPS = 20_000
+
+
+def fill(path, n):
+    index = MessageIndex(path)
+    index.open()
+    rows = ((digest(f"PAST{i:012d}"), f"PAST{i:012d}", "staff@sa.gov.au", "[Assigned: staff@sa.gov.au] x",
+             "normal", "2026-01-01T00:00:00") for i in range(n))
+    with index._conn:
+        index._conn.executemany("INSERT INTO dispatched VALUES (?, ?, ?, ?, ?, ?)", rows)
+    index._conn.close()  # no close(), so no saved filter - as if the bot had crashed
+
+
+def per_lookup(index, ids):
+    start = time.perf_counter()
+    for msg_id in ids:
+        index.get(msg_id)
+    return (time.perf_counter() - start) / len(ids) * 1e6
+
+
+def main():
+    sizes = [int(a) for a in sys.argv[1:]] or [10_000, 100_000, 1_000_000]
+    print(f"Dispatch index - {LOOKUPS:,} lookups per case (µs per lookup)")
+    print(f"  {'history':>10}  {'crash restart':>13}  {'clean restart':>13}  {'new msg':>8}  {'forwarded':>9}"
+          f"  {'DB hits (new)':>13}")
+    for n in sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "dispatched.db")
+            fill(path, n)
+
+            reopen = []
+            for _ in range(2):
+                index = MessageIndex(path)
+                start = time.perf_counter()
+                index.open()
+                reopen.append(time.perf_counter() - start)
+                index.close()
+            index.open()
+
+            new = per_lookup(index, [f"NEW{i:012d}" for i in range(LOOKUPS)])
+            db_hits = index.db_lookups
+            seen = per_lookup(index, [f"PAST{i * (n // LOOKUPS or 1) % n:012d}" for i in range(LOOKUPS)])
+            index.close()
+        print(f"  {n:>10,}  {reopen[0]:12.2f}s  {reopen[1]:12.2f}s  {new:8.1f}  {seen:9.1f}  {db_hits / LOOKUPS:12.2%}")
+
+
+if __name__ == "__main__":
+    main()
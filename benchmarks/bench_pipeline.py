@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Full pipeline benchmark: classify -> assign -> forward -> tag -> archive.
+
+Runs distributor.process_inbox over N unread messages in a local mail
+source - the in-memory FakeSession and an on-disk Maildir - with the bot's
+background writers running, as in production. Console output is discarded.
+Runs in a scratch directory, so no repo files are touched.
+
+    python benchmarks/bench_pipeline.py [N]
+"""
+
+import contextlib
+import os
+import sys
+import tempfile
+import time
+from itertools import cycle, islice
+
+from common import SAMPLE_BODY, load_corpus
+
+
+def fill(session, n, corpus):
+    """Deliver n messages: corpus subjects, 1 in 10 a staff reply"""
+    for i, (subject, body, high, _, _) in enumerate(islice(cycle(corpus), n)):
+        if i % 10 == 9:
+            session.deliver(f"RE: [Assigned: staff{i % 5}@sa.gov.au] {subject}", "Done.", f"staff{i % 5}@sa.gov.au")
+        else:
+            session.deliver(subject, body or SAMPLE_BODY, f"ward{i % 40}@hospital.org.au", high)
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 2_000
+    corpus = load_corpus()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        with open("staff.txt", "w") as f:
+            f.write("\n".join(f"staff{i}@sa.gov.au" for i in range(5)))
+
+        with contextlib.redirect_stdout(open(os.devnull, "w", encoding="utf-8")):
+            import distributor
+            from mail_session import FakeSession, MaildirSession
+            distributor.ACTIVITY_LOG.start()
+            distributor.ROSTER.start()
+            distributor.STATS.start()
+            distributor.JOURNAL.start()
+            distributor.PIPELINE.start()
+
+        print(f"Pipeline - {n:,} unread messages, {len(corpus)} distinct subjects")
+        for label, session in (
+            ("FakeSession (in memory)", FakeSession()),
+            ("MaildirSession (disk)", MaildirSession(os.path.join(tmp, "maildir"))),
+        ):
+            fill(session, n, corpus)
+            distributor.MAIL = session
+            with contextlib.redirect_stdout(open(os.devnull, "w", encoding="utf-8")):
+                start = time.perf_counter()
+                distributor.process_inbox()
+                elapsed = time.perf_counter() - start
+            assert not session.unread(), f"{label}: messages left unread"
+            print(f"  {label:<26} {elapsed:7.2f} s  {n / elapsed * 60:10,.0f} msgs/min"
+                  f"  {elapsed / n * 1000:6.2f} ms/msg")
+
+        with contextlib.redirect_stdout(open(os.devnull, "w", encoding="utf-8")):
+            distributor.PIPELINE.stop()
+            distributor.JOURNAL.stop()
+            distributor.STATS.stop()
+            distributor.ROSTER.stop()
+            distributor.WATCHDOG.close()
+            distributor.ACTIVITY_LOG.stop()
+        os.chdir(os.path.dirname(os.path.abspath(__file__)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: compiled single-pass matcher vs the original per-word scans.
+
+Uses real subjects from daily_stats.csv, on their own and with a typical
+500-char body, and checks both implementations agree on every message.
+"""
+
+from common import SAMPLE_BODY, bench, load_subjects, report
+
+from risk_engine import RiskRules
+from risk_rules import DEFAULT_RULES
+
+# Copies of the shipped vocabulary (grow_dictionary() pads them)
+VOCAB = DEFAULT_RULES["vocabulary"]
+RISK_ACTIONS = list(VOCAB["actions"])
+RISK_CONTEXT = list(VOCAB["context"])
+URGENCY_WORDS = list(VOCAB["urgency"])
+FUZZY_EXCLUDE = list(VOCAB["fuzzy_exclude"])
+
+
+def build_rules(mode="substring", fuzzy=False):
+    """The default rules compiled over this module's word lists"""
+    return RiskRules(dict(
+        DEFAULT_RULES,
+        match_mode=mode,
+        fuzzy=fuzzy,
+        vocabulary={
+            "actions": RISK_ACTIONS,
+            "context": RISK_CONTEXT,
+            "urgency": URGENCY_WORDS,
+            "fuzzy_exclude": FUZZY_EXCLUDE,
+        },
+    ))
+
+
+RULES = build_rules()
+
+
+def _rules(found_actions, found_context, found_urgency, high_importance):
+    if high_importance:
+        return "critical", "Outlook High Importance Flag"
+    if found_actions and found_context:
+        return "critical", f"Action+Context: {found_actions[0]}+{found_context[0]}"
+    if found_urgency and found_actions:
+        return "critical", f"Urgency+Action: {found_urgency[0]}+{found_actions[0]}"
+    if found_urgency:
+        return "urgent", f"Urgency: {found_urgency[0]}"
+    if found_actions:
+        return "urgent", f"Action detected: {found_actions[0]}"
+    return "normal", None
+
+
+def detect_risk_legacy(subject, body="", high_importance=False):
+    """Original implementation: one substring scan per dictionary word"""
+    text = (subject + " " + body).lower()
+    found_actions = [a for a in RISK_ACTIONS if a in text]
+    found_context = [c for c in RISK_CONTEXT if c in text]
+    found_urgency = [u for u in URGENCY_WORDS if u in text]
+    return _rules(found_actions, found_context, found_urgency, high_importance)
+
+
+def detect_risk_compiled(subject, body="", high_importance=False):
+    """Compiled matcher: one pass for all three word lists"""
+    return RULES.classify(subject, body, high_importance)
+
+
+def grow_dictionary(factor):
+    """
+    Pad every word list with made-up site/modality terms (which never match)
+    to see how each implementation scales as the dictionary grows.
+    """
+    global RULES
+    for words in (RISK_ACTIONS, RISK_CONTEXT, URGENCY_WORDS):
+        base = list(words)
+        words.extend(f"{w}-site{i}" for i in range(1, factor) for w in base)
+    RULES = build_rules()
+
+
+def run(workloads):
+    words = len(RISK_ACTIONS) + len(RISK_CONTEXT) + len(URGENCY_WORDS)
+    for name, items in workloads.items():
+        mismatches = sum(
+            1 for item in items if detect_risk_legacy(*item) != detect_risk_compiled(*item)
+        )
+        print(f"\n{name}, {words} words  (mismatches: {mismatches})")
+        legacy, legacy_us = bench(detect_risk_legacy, items)
+        compiled, compiled_us = bench(detect_risk_compiled, items)
+        report("legacy (per-word scans)", legacy, legacy_us)
+        report("compiled (single pass)", compiled, compiled_us, baseline=legacy)
+
+
+def main():
+    subjects = load_subjects()
+    workloads = {
+        "subject only": [(s, "") for s in subjects],
+        "subject + 500-char body": [(s, SAMPLE_BODY) for s in subjects],
+    }
+
+    print(f"Risk detection benchmark - {len(subjects)} subjects from daily_stats.csv")
+    run(workloads)
+
+    grow_dictionary(5)
+    run(workloads)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Batch classification benchmark: replaying history through detect_risk_many.
+
+Compares a plain per-message loop with classify_many in-process and across
+a process pool, on daily_stats.csv subjects repeated up to N messages
+(typical of a stats replay), and on N distinct messages (every body unique,
+so classify_many's repeat cache never hits).
+
+    python benchmarks/bench_risk_batch.py [N]
+"""
+
+import os
+import sys
+import time
+from itertools import cycle, islice
+
+from common import SAMPLE_BODY, load_subjects
+
+from bench_risk import build_rules
+
+
+def replay(subjects, n):
+    """Generator of n (subject, body, high_importance) messages, subjects repeating"""
+    return ((s, SAMPLE_BODY, False) for s in islice(cycle(subjects), n))
+
+
+def unique(subjects, n):
+    """Generator of n messages that are all different"""
+    return ((s, f"Ref #{i}\n{SAMPLE_BODY}", False) for i, s in enumerate(islice(cycle(subjects), n)))
+
+
+def timed(label, fn, n):
+    start = time.perf_counter()
+    count = fn()
+    elapsed = time.perf_counter() - start
+    assert count == n, (label, count)
+    print(f"  {label:<30} {elapsed:7.2f} s  {n / elapsed:10,.0f} msgs/sec")
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    subjects = load_subjects()
+    rules = build_rules(mode="token")
+
+    print(f"Batch classification - {n:,} messages, {os.cpu_count()} CPU(s)")
+    for name, history in (("replayed subjects", replay), ("unique messages", unique)):
+        print(f"\n{name}")
+        timed("per-message loop", lambda: sum(1 for m in history(subjects, n) if rules.classify(*m)), n)
+        timed("classify_many (in-process)", lambda: sum(1 for _ in rules.classify_many(history(subjects, n))), n)
+        for workers in (2, 4):
+            timed(
+                f"classify_many (workers={workers})",
+                lambda: sum(1 for _ in rules.classify_many(history(subjects, n), workers=workers)),
+                n,
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Fuzzy (typo-tolerant) risk matching: per-message cost and burst timing.
+
+Shows token mode with and without fuzzy matching on:
+- real subjects, with and without a 500-char body
+- a worst case: 500 chars of distinct, never-seen words in the fuzzable
+  length range, so every token misses the memo and hits the index
+and the wall time to classify a 500-message unread burst.
+"""
+
+import random
+import string
+import time
+
+from common import SAMPLE_BODY, bench, load_subjects, report
+
+from bench_risk import build_rules
+
+
+def rules(fuzzy):
+    return build_rules(mode="token", fuzzy=fuzzy)
+
+
+def worst_case_bodies(n, seed=1):
+    """Bodies of random 5-10 letter words - nothing repeats, nothing matches exactly"""
+    rng = random.Random(seed)
+    bodies = []
+    for _ in range(n):
+        words, length = [], 0
+        while length < 500:
+            word = "".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(5, 10)))
+            words.append(word)
+            length += len(word) + 1
+        bodies.append(" ".join(words)[:500])
+    return bodies
+
+
+def main():
+    subjects = load_subjects()
+    workloads = {
+        "subject only": [(s, "") for s in subjects],
+        "subject + 500-char body": [(s, SAMPLE_BODY) for s in subjects],
+    }
+
+    print(f"Fuzzy risk matching - {len(subjects)} subjects from daily_stats.csv")
+    for name, items in workloads.items():
+        print(f"\n{name}")
+        exact, exact_us = bench(rules(False).classify, items)
+        report("token", exact, exact_us)
+        fuzzy, fuzzy_us = bench(rules(True).classify, items)
+        report("token + fuzzy", fuzzy, fuzzy_us, baseline=exact)
+
+    # Worst case: fresh rules per round so the memo is always cold
+    items = [(s, b) for s, b in zip(subjects, worst_case_bodies(len(subjects)))]
+    print("\nworst case: 500 chars of unseen words (cold memo)")
+    exact, exact_us = bench(rules(False).classify, items)
+    report("token", exact, exact_us)
+    best = float("inf")
+    for _ in range(5):
+        m = rules(True)
+        start = time.perf_counter()
+        for item in items:
+            m.classify(*item)
+        best = min(best, time.perf_counter() - start)
+    report("token + fuzzy", best, best / len(items) * 1e6, baseline=exact)
+
+    # A morning backlog arriving in one 60-second cycle
+    burst = [(s, b) for s, b in zip(subjects[:500], worst_case_bodies(500, seed=2))]
+    m = rules(True)
+    start = time.perf_counter()
+    for item in burst:
+        m.classify(*item)
+    print(f"\n500-message burst, worst case, fuzzy on: {(time.perf_counter() - start) * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
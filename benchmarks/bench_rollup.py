@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Dashboard aggregates benchmark: groupbys over raw rows vs rollup slices.
+
+With N rows of history and 50 rows arriving between refreshes, times the
+aggregates one dashboard refresh needs (hourly trend, day x hour heatmap,
+week-over-week, leaderboard / workload, staff totals, senders):
+
+1. computed with pandas groupbys over the raw rows (the old dashboard)
+2. taken as slices of StatsHistory.rollup(), which only counts the new rows
+3. the same with nothing new (every slice is memoized)
+
+    python benchmarks/bench_rollup.py [N ...]
+"""
+
+import csv
+import io
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+import common  # noqa: F401  (puts the repo root on sys.path)
+
+from stats_archive import StatsHistory
+from stats_writer import STATS_HEADER, stats_row
+
+NEW_ROWS = 50
+PER_DAY = 300
+
+
+def rows(n, end):
+    start = end - timedelta(days=n // PER_DAY)
+    for i in range(n):
+        when = start + timedelta(days=i // PER_DAY, hours=7, seconds=(i % PER_DAY) * 36_000 // PER_DAY)
+        yield stats_row(f"[Assigned: staff{i % 9}@sa.gov.au] CT transfer #{i}",
+                        "completed" if i % 5 == 0 else f"staff{i % 9}@sa.gov.au",
+                        f"ward{i % 40}@hospital.org.au", "urgent" if i % 11 == 0 else "normal", when)
+
+
+def append(path, batch):
+    buf = io.StringIO(newline='')
+    csv.writer(buf).writerows(batch)
+    with open(path, 'a', newline='', encoding='utf-8') as f:
+        f.write(buf.getvalue())
+
+
+def raw_aggregates(df, today, week, prev):
+    """The dashboard's aggregates before the rollup"""
+    today_df = df[df['Date'] == today].copy()
+    today_df['Hour'] = today_df['DateTime'].dt.hour
+    hourly = today_df.groupby('Hour').size()
+    assigned = today_df[today_df['Assigned To'] != 'completed']['Assigned To'].value_counts()
+    recent = df[df['Date'].isin(week)].copy()
+    recent['Hour'] = recent['DateTime'].dt.hour
+    recent['DayOfWeek'] = recent['DateTime'].dt.day_name()
+    heatmap = recent.groupby(['DayOfWeek', 'Hour']).size()
+    this_week = recent['Assigned To'].value_counts()
+    last_week = df[df['Date'].isin(prev)]['Assigned To'].value_counts()
+    staff_totals = df['Assigned To'].value_counts()
+    senders = df[df['Sender'].notna() & (df['Sender'] != 'unknown') & (df['Assigned To'] != 'completed')]
+    sender_summary = senders.groupby('Sender').agg({'Date': 'count', 'DateTime': ['min', 'max']})
+    return hourly, assigned, heatmap, this_week, last_week, staff_totals, sender_summary
+
+
+def rollup_aggregates(rollup, today, week, prev):
+    """The same aggregates as slices of the rollup"""
+    hourly = rollup.counts('Hour', start=today, end=today)
+    assigned = rollup.counts('Assigned To', start=today, end=today, assigned_only=True)
+    heatmap = rollup.counts(['Date', 'Hour'], start=week[0], end=week[-1])
+    this_week = rollup.counts('Assigned To', start=week[0], end=week[-1])
+    last_week = rollup.counts('Assigned To', start=prev[0], end=prev[-1])
+    staff_totals = rollup.counts('Assigned To')
+    senders = rollup.counts('Sender', assigned_only=True)
+    sender_span = rollup.span('Sender', assigned_only=True)
+    return hourly, assigned, heatmap, this_week, last_week, staff_totals, senders, sender_span
+
+
+def main():
+    sizes = [int(a) for a in sys.argv[1:]] or [10_000, 100_000, 1_000_000]
+    now = datetime.now()
+    today = pd.Timestamp(now).normalize()
+    week = pd.date_range(end=today, periods=7)
+    prev = week - pd.Timedelta(days=7)
+    print(f"Dashboard aggregates per refresh ({NEW_ROWS} new rows since the last one)")
+    print(f"  {'history':>10}  {'raw groupbys':>12}  {'rollup':>8}  {'speed-up':>8}  {'rollup, idle':>12}")
+    for n in sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "daily_stats.csv")
+            append(path, [STATS_HEADER])
+            append(path, list(rows(n, today.to_pydatetime())))
+            history = StatsHistory(path, os.path.join(tmp, "stats_archive"))
+            df = history.read()
+            history.rollup()
+
+            def refresh(counted, new=NEW_ROWS):
+                append(path, [stats_row("late", "staff1@sa.gov.au", when=now) for _ in range(new)])
+                frame = history.read()
+                start = time.perf_counter()
+                if counted:
+                    rollup_aggregates(history.rollup(), today, week, prev)
+                else:
+                    raw_aggregates(frame, today, week, prev)
+                return time.perf_counter() - start
+
+            raw = min(refresh(False) for _ in range(3))
+            fast = min(refresh(True) for _ in range(3))
+            idle = min(refresh(True, new=0) for _ in range(3))
+            totals = history.rollup().counts('Assigned To')
+            assert totals.sum() == len(history.read()) == len(df) + 6 * NEW_ROWS
+        print(f"  {n:>10,}  {raw * 1000:10.1f}ms  {fast * 1000:6.1f}ms  {raw / fast:7.1f}x  {idle * 1e6:10.0f}µs")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+SLA scheduler benchmark: breach-detection lateness and re-arm cost.
+
+1. A simulated shift (SimulatedClock): N urgent tickets over 8 hours, a
+   third closed before their deadline, the rest escalated and re-armed.
+   Breaches are checked when the watchdog says the next deadline passes,
+   vs every 60 s as the old schedule did. Reports how late each breach was
+   noticed (simulated time) and how long the whole run took (real time).
+2. Real time: the bot's runtime (BotRuntime) with deadlines a few seconds
+   out - how late the SLA task fires on the wall clock.
+3. Re-arm cost as the number of open tickets grows.
+
+    python benchmarks/bench_sla_scheduler.py [N]
+"""
+
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta
+
+import common  # noqa: F401  (puts the repo root on sys.path)
+
+from bot_runtime import BotRuntime
+from sla_watchdog import SimulatedClock, SlaWatchdog
+
+SLA_MINUTES = 20
+SHIFT = 8 * 3600
+
+
+def ticket(clock, i):
+    return {"subject": f"URGENT {i}", "assigned_to": "staff@sa.gov.au", "sender": "ward@h.org",
+            "risk_type": "urgent", "timestamp": clock().isoformat(), "escalation_count": 0}
+
+
+def simulate(tmp, n, poll):
+    """Run a shift; returns (sorted lateness of each breach in s, real seconds)"""
+    random.seed(7)
+    clock = SimulatedClock()
+    start = clock()
+    watchdog = SlaWatchdog(os.path.join(tmp, f"sim_{poll}.db"), SLA_MINUTES, synchronous="OFF", clock=clock)
+    watchdog.open()
+    arrivals = sorted(random.uniform(0, SHIFT) for _ in range(n))
+    closes = {i: arrivals[i] + random.uniform(60, SLA_MINUTES * 60 - 1) for i in range(0, n, 3)}
+    events = sorted([(t, "add", i) for i, t in enumerate(arrivals)] + [(t, "close", i) for i, t in closes.items()])
+    lateness = []
+
+    began = time.perf_counter()
+    pos = 0
+    end = start + timedelta(seconds=SHIFT + 3 * SLA_MINUTES * 60)
+    while clock() < end:
+        # Next thing to happen: a ticket event, or a breach check
+        next_event = start + timedelta(seconds=events[pos][0]) if pos < len(events) else end
+        if poll:
+            elapsed = (clock() - start).total_seconds()
+            next_check = start + timedelta(seconds=(elapsed // poll + 1) * poll)
+        else:
+            next_check = watchdog.next_deadline() or end
+        target = min(next_event, next_check, end)
+        clock.advance((target - clock()).total_seconds())
+        while pos < len(events) and start + timedelta(seconds=events[pos][0]) <= target:
+            _, kind, i = events[pos]
+            pos += 1
+            if kind == "add":
+                watchdog.add(f"m{i}", ticket(clock, i))
+            else:
+                watchdog.remove(f"m{i}")
+        if target == next_check:
+            now = clock()
+            for msg_id, t, elapsed in watchdog.breached(now):
+                lateness.append((elapsed - watchdog.sla).total_seconds())
+                if t["escalation_count"] >= 2:
+                    watchdog.remove(msg_id)
+                else:
+                    watchdog.rearm(msg_id, now, escalation_count=t["escalation_count"] + 1)
+    real = time.perf_counter() - began
+    watchdog.close()
+    return sorted(lateness), real
+
+
+def real_time(tmp, n=20):
+    """Wall-clock lateness of the runtime's SLA task for n deadlines 1-4 s out"""
+    watchdog = SlaWatchdog(os.path.join(tmp, "real.db"), 0.05, synchronous="OFF")  # 3 s SLA
+    watchdog.open()
+    lateness = []
+
+    def check():
+        now = datetime.now()
+        for msg_id, t, elapsed in watchdog.breached(now):
+            lateness.append((elapsed - watchdog.sla).total_seconds())
+            watchdog.remove(msg_id)
+
+    def next_check():
+        deadline = watchdog.next_deadline()
+        return None if deadline is None else (deadline - datetime.now()).total_seconds()
+
+    runtime = BotRuntime(ingest=lambda: None, sla_check=check, deliver=lambda timeout: time.sleep(timeout),
+                         flush=lambda: None, sla_interval=60, sla_next=next_check, push=False)
+    watchdog.on_schedule = runtime.wake_sla
+    thread = threading.Thread(target=runtime.run, daemon=True)
+    thread.start()
+    time.sleep(0.2)
+    for i in range(n):
+        t = ticket(datetime.now, i)
+        t["timestamp"] = (datetime.now() - timedelta(seconds=random.uniform(0, 2))).isoformat()
+        watchdog.add(f"r{i}", t)
+        time.sleep(0.05)
+    while len(lateness) < n:
+        time.sleep(0.1)
+    runtime.stop()
+    thread.join()
+    watchdog.close()
+    return sorted(lateness)
+
+
+def rearm_cost(tmp, size):
+    clock = SimulatedClock()
+    watchdog = SlaWatchdog(os.path.join(tmp, f"rearm_{size}.db"), SLA_MINUTES, synchronous="OFF", clock=clock)
+    watchdog._conn = None
+    watchdog._write = lambda msg_id: None  # time the scheduling only, not SQLite
+    watchdog.open = lambda: True
+    for i in range(size):
+        watchdog.add(f"m{i}", ticket(clock, i))
+        clock.advance(0.01)
+    ids = [f"m{random.randrange(size)}" for _ in range(20_000)]
+    start = time.perf_counter()
+    for msg_id in ids:
+        watchdog.rearm(msg_id, clock())
+    return (time.perf_counter() - start) / len(ids) * 1e6
+
+
+def pct(samples, p):
+    return samples[min(len(samples) - 1, int(len(samples) * p))]
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 2_000
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"Simulated 8 h shift - {n:,} urgent tickets, {SLA_MINUTES} min SLA")
+        for label, poll in (("check every 60 s", 60), ("deadline-driven", None)):
+            lateness, real = simulate(tmp, n, poll)
+            print(f"  {label:<18} {len(lateness):6,} breaches  late mean {sum(lateness) / len(lateness):6.2f} s"
+                  f"  p99 {pct(lateness, 0.99):6.2f} s  max {lateness[-1]:6.2f} s   run {real * 1000:6.0f} ms")
+
+        lateness = real_time(tmp)
+        print("\nReal time (BotRuntime, wall clock)")
+        print(f"  deadline-driven    {len(lateness):6,} breaches  late p50 {pct(lateness, 0.5) * 1000:6.0f} ms"
+              f" p99 {pct(lateness, 0.99) * 1000:6.0f} ms max {lateness[-1] * 1000:6.0f} ms")
+
+        print("\nRe-arm cost (µs)")
+        for size in (1_000, 10_000, 100_000):
+            print(f"  {size:>8,} open tickets  {rearm_cost(tmp, size):6.2f}")
+
+
+if __name__ == "__main__":
+    main()
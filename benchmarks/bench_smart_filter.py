@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Smart filter benchmark: staff membership + reply/bot-tag check per message.
+
+Compares the original list membership and repeated subject lowercasing with
+the StaffIndex (frozenset) and the single precompiled subject check, at
+growing roster sizes. Messages are a mix of staff replies, staff sending new
+requests and external senders.
+
+    python benchmarks/bench_smart_filter.py
+"""
+
+from itertools import cycle, islice
+
+from common import bench, load_subjects, report
+
+from distributor import is_internal_reply
+from roster import StaffIndex
+
+SIZES = (10, 100, 1_000, 10_000)
+MESSAGES = 20_000
+
+
+def is_internal_reply_legacy(sender_email, subject, staff_list):
+    """The original smart filter (list membership, subject lowercased 3 times)"""
+    is_staff = sender_email.lower() in staff_list
+
+    reply_prefixes = ('re:', 'accepted:', 'declined:', 'fw:', 'fwd:')
+    is_reply = subject.lower().strip().startswith(reply_prefixes)
+    is_bot_tagged = '[assigned:' in subject.lower() or '[completed:' in subject.lower()
+
+    return is_staff and (is_reply or is_bot_tagged)
+
+
+def make_messages(staff, subjects, n):
+    """(sender, subject) pairs: staff replies, staff new requests, external senders"""
+    messages = []
+    senders = cycle(staff)
+    for i, subject in enumerate(islice(cycle(subjects), n)):
+        kind = i % 4
+        if kind == 0:
+            messages.append((next(senders).upper(), f"RE: {subject}"))
+        elif kind == 1:
+            messages.append((next(senders), f"Accepted: [Assigned: {staff[0]}] {subject}"))
+        elif kind == 2:
+            messages.append((next(senders), subject))
+        else:
+            messages.append((f"radiology{i}@hospital.org.au", f"RE: {subject}"))
+    return messages
+
+
+def main():
+    subjects = load_subjects()
+    print(f"Smart filter - {MESSAGES:,} messages per run")
+
+    for size in SIZES:
+        # Realistic worst case for a list: most senders sit late in the file
+        staff = [f"staff.member{i}@sa.gov.au" for i in range(size)]
+        staff_late = staff[size // 2:]
+        messages = make_messages(staff_late, subjects, MESSAGES)
+        index = StaffIndex(staff)
+
+        legacy = [(s, subj, staff) for s, subj in messages]
+        indexed = [(s, subj, index) for s, subj in messages]
+        assert [is_internal_reply_legacy(*m) for m in legacy] == [is_internal_reply(*m) for m in indexed]
+
+        print(f"\n{size:,} staff")
+        base, per = bench(is_internal_reply_legacy, legacy)
+        report("list + lowercased subject", base, per)
+        seconds, per = bench(is_internal_reply, indexed)
+        report("StaffIndex + compiled check", seconds, per, base)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Staged pipeline benchmark: sequential process_inbox vs forward/archive workers.
+
+Clears a morning backlog of N unread messages from a FakeSession that
+simulates COM cost - every property read/write or call sleeps LATENCY
+seconds, as a cross-process round trip to Outlook would. Round-robin
+assignment stays sequential in both runs; the check at the end confirms
+the rotation handed out the same assignees in the same order.
+
+    python benchmarks/bench_staged_pipeline.py [N] [latency_ms]
+"""
+
+import contextlib
+import os
+import sys
+import tempfile
+import time
+from itertools import cycle, islice
+
+from common import SAMPLE_BODY, load_corpus
+
+STAFF = 5
+
+
+def run(distributor, FakeSession, corpus, n, latency, workers):
+    session = FakeSession(latency=latency)
+    for i, (subject, body, high, _, _) in enumerate(islice(cycle(corpus), n)):
+        session.deliver(f"{subject} #{i}", body or SAMPLE_BODY, f"ward{i % 40}@hospital.org.au", high)
+    distributor.MAIL = session
+    distributor.PIPELINE.stop()
+    if workers:
+        distributor.PIPELINE.workers = workers
+        distributor.PIPELINE.start()
+
+    with contextlib.redirect_stdout(open(os.devnull, "w", encoding="utf-8")):
+        start = time.perf_counter()
+        distributor.process_inbox()
+        elapsed = time.perf_counter() - start
+    assert not session.unread() and len(session.processed.messages) == n, "messages left behind"
+
+    # Forwards complete in any order - the "#i" suffix gives the arrival order back
+    sent = sorted(session.sent, key=lambda m: int(m.Subject.rsplit("#", 1)[1]))
+    return elapsed, [m.Recipients.addresses[0] for m in sent]
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    latency = (float(sys.argv[2]) if len(sys.argv) > 2 else 2.0) / 1000
+    corpus = load_corpus()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        with open("staff.txt", "w") as f:
+            f.write("\n".join(f"staff{i}@sa.gov.au" for i in range(STAFF)))
+
+        with contextlib.redirect_stdout(open(os.devnull, "w", encoding="utf-8")):
+            import distributor
+            from mail_session import FakeSession
+            distributor.ACTIVITY_LOG.start()
+            distributor.ROSTER.start()
+            distributor.STATS.start()
+            distributor.JOURNAL.start()
+
+        print(f"Staged pipeline - {n:,} unread messages, {latency * 1000:.1f} ms per simulated COM round trip")
+        base = None
+        for label, workers in (("sequential", 0), ("2 workers/stage", 2), ("4 workers/stage", 4),
+                               ("8 workers/stage", 8)):
+            elapsed, order = run(distributor, FakeSession, corpus, n, latency, workers)
+            fair = len(set(order[:STAFF])) == STAFF and all(a == order[i % STAFF] for i, a in enumerate(order))
+            base = base or elapsed
+            print(f"  {label:<18} {elapsed:7.2f} s  {n / elapsed * 60:8,.0f} msgs/min  {base / elapsed:5.1f}x"
+                  f"  round-robin {'in order' if fair else 'BROKEN'}")
+
+        with contextlib.redirect_stdout(open(os.devnull, "w", encoding="utf-8")):
+            distributor.PIPELINE.stop()
+            distributor.JOURNAL.stop()
+            distributor.STATS.stop()
+            distributor.ROSTER.stop()
+            distributor.WATCHDOG.close()
+            distributor.ACTIVITY_LOG.stop()
+        os.chdir(os.path.dirname(os.path.abspath(__file__)))
+
+
+if __name__ == "__main__":
+    main()
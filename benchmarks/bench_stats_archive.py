@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Stats archive benchmark: one growing CSV vs date-partitioned Parquet.
+
+Builds D days of history (R rows a day) as one daily_stats.csv, then
+compacts it into the archive, and compares for a dashboard that has just
+started (nothing cached):
+
+1. loading all history
+2. loading the last 7 days (Date, DateTime, Assigned To) - the CSV has to
+   be read whole; the archive opens 7 partitions and 3 columns
+3. size on disk, and the nightly compaction of one closed day
+
+    python benchmarks/bench_stats_archive.py [DAYS] [ROWS_PER_DAY]
+"""
+
+import csv
+import io
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+import common  # noqa: F401  (puts the repo root on sys.path)
+
+from stats_archive import ARROW_AVAILABLE, StatsArchive, StatsHistory
+from stats_writer import STATS_HEADER, stats_row
+
+RECENT = ['Date', 'DateTime', 'Assigned To']
+
+
+def write_history(path, days, per_day, end):
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(STATS_HEADER)
+        for d in range(days, -1, -1):
+            day = end - timedelta(days=d)
+            for i in range(per_day):
+                when = day.replace(hour=7) + timedelta(seconds=i * 36_000 // per_day)
+                writer.writerow(stats_row(f"[Assigned: staff{i % 9}@sa.gov.au] CT transfer #{i}",
+                                          f"staff{i % 9}@sa.gov.au", f"ward{i % 40}@hospital.org.au",
+                                          "urgent" if i % 11 == 0 else "normal", when))
+
+
+def folder_size(root):
+    return sum(os.path.getsize(os.path.join(d, f)) for d, _, files in os.walk(root) for f in files)
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - start, result
+
+
+def main():
+    if not ARROW_AVAILABLE:
+        print("pyarrow is not installed - pip install pyarrow")
+        return
+    days = int(sys.argv[1]) if len(sys.argv) > 1 else 730
+    per_day = int(sys.argv[2]) if len(sys.argv) > 2 else 300
+    today = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+    since = pd.Timestamp(today) - pd.Timedelta(days=6)
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, "daily_stats.csv")
+        archive_root = os.path.join(tmp, "stats_archive")
+        write_history(csv_path, days, per_day, today)
+        csv_size = os.path.getsize(csv_path)
+        print(f"Stats history - {days} closed days x {per_day} rows ({days * per_day:,} rows), cold dashboard start")
+
+        # CSV only: every view starts from parsing the whole file
+        csv_all, frame = timed(lambda: StatsHistory(csv_path, os.path.join(tmp, "none")).read())
+        csv_recent, _ = timed(lambda: StatsHistory(csv_path, os.path.join(tmp, "none")).read(since=since, columns=RECENT))
+
+        compact, moved = timed(lambda: StatsArchive(archive_root).compact(csv_path, today))
+        assert moved == days * per_day
+
+        history = StatsHistory(csv_path, archive_root)
+        arch_recent, recent = timed(lambda: history.read(since=since, columns=RECENT))
+        parts = history.archive.parts_read
+        arch_all, everything = timed(lambda: StatsHistory(csv_path, archive_root).read())
+        warm, _ = timed(lambda: history.read(since=since, columns=RECENT))
+        assert len(everything) == len(frame) and len(recent) == 7 * per_day
+
+        # Nightly compaction: yesterday's rows move out of an otherwise empty CSV
+        buf = io.StringIO(newline='')
+        csv.writer(buf).writerows(stats_row("late", "staff@sa.gov.au", when=today + timedelta(days=1, hours=h % 10))
+                                  for h in range(per_day))
+        with open(csv_path, 'a', newline='', encoding='utf-8') as f:
+            f.write(buf.getvalue())
+        nightly, _ = timed(lambda: StatsArchive(archive_root).compact(csv_path, today + timedelta(days=2)))
+
+        print(f"  {'':<22} {'CSV only':>10} {'archive':>10}")
+        print(f"  {'all history':<22} {csv_all * 1000:8.0f}ms {arch_all * 1000:8.0f}ms")
+        print(f"  {'last 7 days':<22} {csv_recent * 1000:8.0f}ms {arch_recent * 1000:8.0f}ms"
+              f"   ({parts} partitions opened; {warm * 1e6:.0f} µs when cached)")
+        print(f"  {'size on disk':<22} {csv_size / 1e6:8.1f}MB {folder_size(archive_root) / 1e6:8.1f}MB")
+        print(f"\n  first compaction {compact:.1f} s, nightly compaction of one day {nightly * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    main()
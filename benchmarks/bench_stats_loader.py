@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Dashboard stats loading benchmark: full re-read vs incremental tail.
+
+The dashboard reloads daily_stats.csv on every refresh. With N rows of
+history, times one refresh when:
+
+1. the whole CSV is parsed and normalized again (the old load_data)
+2. StatsTail finds nothing new
+3. StatsTail finds 50 newly appended rows
+
+    python benchmarks/bench_stats_loader.py [N ...]
+"""
+
+import csv
+import io
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+import common  # noqa: F401  (puts the repo root on sys.path)
+
+from stats_loader import StatsTail, normalize_stats
+from stats_writer import STATS_HEADER, stats_row
+
+NEW_ROWS = 50
+
+
+def rows(n, start):
+    for i in range(n):
+        when = start + timedelta(seconds=i * 37)
+        yield stats_row(f"[Assigned: staff{i % 9}@sa.gov.au] CT transfer #{i}", f"Staff{i % 9}@sa.gov.au",
+                        f"ward{i % 40}@hospital.org.au", "urgent" if i % 11 == 0 else "normal", when)
+
+
+def append(path, batch):
+    buf = io.StringIO(newline='')
+    csv.writer(buf).writerows(batch)
+    with open(path, 'a', newline='', encoding='utf-8') as f:
+        f.write(buf.getvalue())
+
+
+def best_of(fn, repeat=3, setup=None):
+    best = float("inf")
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    sizes = [int(a) for a in sys.argv[1:]] or [10_000, 100_000]
+    print(f"Dashboard refresh - loading daily_stats.csv (ms per refresh, {NEW_ROWS} new rows)")
+    print(f"  {'history':>10}  {'full re-read':>12}  {'tail, idle':>10}  {'tail, +new':>10}  {'speed-up':>8}")
+    start = datetime(2024, 1, 1, 7, 0)
+    for n in sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, "daily_stats.csv")
+            append(path, [STATS_HEADER])
+            append(path, list(rows(n, start)))
+            later = rows(NEW_ROWS * 10, start + timedelta(seconds=n * 37))
+
+            full = best_of(lambda: normalize_stats(pd.read_csv(path)), repeat=1 if n > 50_000 else 3)
+            tail = StatsTail(path)
+            tail.read()
+            idle = best_of(tail.read, repeat=20)
+            grown = best_of(tail.read, setup=lambda: append(path, [next(later) for _ in range(NEW_ROWS)]))
+            assert len(tail.read()) == n + 3 * NEW_ROWS and tail.full_loads == 1
+        print(f"  {n:>10,}  {full * 1000:12.1f}  {idle * 1000:10.3f}  {grown * 1000:10.2f}  {full / grown:7.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Stats writer benchmark: per-row append vs batched StatsWriter.
+
+Writes N rows to a scratch CSV with the original append_stats behaviour
+(exists check + open/append/close per row) and with StatsWriter at each
+durability level, with and without its background thread.
+
+    python benchmarks/bench_stats_writer.py [N]
+"""
+
+import csv
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime
+from itertools import cycle, islice
+
+from common import load_subjects
+
+from stats_writer import STATS_HEADER, StatsWriter
+
+
+def append_stats_legacy(path, subject, assigned_to, sender="unknown", risk_level="normal"):
+    """The original append_stats: one open/write/close per row"""
+    file_exists = os.path.isfile(path)
+    with open(path, 'a', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        if not file_exists:
+            writer.writerow(STATS_HEADER)
+        now = datetime.now()
+        writer.writerow([
+            now.strftime('%Y-%m-%d'),
+            now.strftime('%H:%M:%S'),
+            subject,
+            assigned_to,
+            sender,
+            risk_level
+        ])
+
+
+def timed(label, path, n, fn, baseline=None):
+    if os.path.exists(path):
+        os.remove(path)
+    start = time.perf_counter()
+    fn()
+    elapsed = time.perf_counter() - start
+    with open(path, newline='', encoding='utf-8') as f:
+        rows = sum(1 for _ in csv.reader(f)) - 1
+    assert rows == n, (label, rows)
+    line = f"  {label:<34} {elapsed * 1000:9.1f} ms  {n / elapsed:10,.0f} rows/sec"
+    if baseline:
+        line += f"  ({baseline / elapsed:6.1f}x)"
+    print(line)
+    return elapsed
+
+
+def main():
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 5_000
+    rows = [(s, "staff.member@sa.gov.au", "sender@hospital.org.au", "normal")
+            for s in islice(cycle(load_subjects()), n)]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "daily_stats.csv")
+        print(f"Stats writer - {n:,} rows")
+
+        base = timed("per-row open/append/close", path, n,
+                     lambda: [append_stats_legacy(path, *r) for r in rows])
+
+        def per_row_fsync():
+            for r in rows:
+                append_stats_legacy(path, *r)
+                fd = os.open(path, os.O_RDONLY)
+                os.fsync(fd)
+                os.close(fd)
+        fsync_base = timed("per-row + fsync", path, n, per_row_fsync)
+
+        for durability, baseline in (("flush", base), ("fsync", fsync_base)):
+            def unthreaded():
+                writer = StatsWriter(path, durability=durability)
+                for r in rows:
+                    writer.append(*r)
+                writer.stop()
+
+            def batched():
+                writer = StatsWriter(path, batch_size=50, flush_interval=1.0, durability=durability)
+                writer.start()
+                for r in rows:
+                    writer.append(*r)
+                writer.stop()
+
+            timed(f"StatsWriter {durability} (no thread)", path, n, unthreaded, baseline)
+            timed(f"StatsWriter {durability} (batch 50)", path, n, batched, baseline)
+
+
+if __name__ == "__main__":
+    main()
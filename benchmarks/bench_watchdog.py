@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+SLA watchdog benchmark: full JSON rescan vs deadline-ordered SlaWatchdog.
+
+One breach check with N open urgent tickets, when none / 1% have breached.
+The original check loads urgent_watchdog.json, parses every timestamp and
+rewrites the file; SlaWatchdog only pops the breached tickets off its timer wheel
+and updates their rows in urgent_watchdog.db.
+
+    python benchmarks/bench_watchdog.py
+"""
+
+import json
+import os
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+import common  # noqa: F401  (puts the repo root on sys.path)
+
+from sla_watchdog import SlaWatchdog
+
+SIZES = (10, 100, 500, 2_000)
+SLA = timedelta(minutes=20)
+
+
+def check_legacy(path, now):
+    """The original check_sla_breaches, minus the escalation side effects"""
+    with open(path, 'r') as f:
+        watchdog = json.load(f)
+    breached = 0
+    for msg_id, ticket in list(watchdog.items()):
+        elapsed = now - datetime.fromisoformat(ticket["timestamp"])
+        if elapsed > SLA:
+            breached += 1
+            watchdog[msg_id]["timestamp"] = now.isoformat()
+            watchdog[msg_id]["escalation_count"] = ticket.get("escalation_count", 0) + 1
+    with open(path, 'w') as f:
+        json.dump(watchdog, f, indent=4, default=str)
+    return breached
+
+
+def check_wheel(watchdog, now):
+    breached = 0
+    for msg_id, ticket, elapsed in watchdog.breached(now):
+        breached += 1
+        watchdog.rearm(msg_id, now, escalation_count=ticket.get("escalation_count", 0) + 1)
+    return breached
+
+
+def tickets(n, now, breached_pct):
+    """n open tickets, breached_pct% of them past the SLA"""
+    late = n * breached_pct // 100
+    return {
+        f"msg{i}": {
+            "subject": f"URGENT delete patient scan #{i}",
+            "assigned_to": "staff.member@sa.gov.au",
+            "sender": "ward@hospital.org.au",
+            "risk_type": "Action+Context: delete+patient",
+            "timestamp": (now - (SLA + timedelta(minutes=1) if i < late else timedelta(minutes=i % 19))).isoformat(),
+            "escalation_count": 0,
+        }
+        for i in range(n)
+    }
+
+
+def best_of(fn, repeat=20):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    now = datetime.now()
+    print("SLA breach check - one cycle")
+    with tempfile.TemporaryDirectory() as tmp:
+        for breached_pct in (0, 1):
+            print(f"\n{breached_pct}% breached")
+            for n in SIZES:
+                path = os.path.join(tmp, f"watchdog_{n}.json")
+                data = tickets(n, now, breached_pct)
+
+                def legacy():
+                    with open(path, 'w') as f:
+                        json.dump(data, f)
+                    check_legacy(path, now)
+
+                def wheel():
+                    with open(path, 'w') as f:
+                        json.dump(data, f)
+                    db = path.replace(".json", ".db")
+                    for suffix in ("", "-wal", "-shm"):
+                        if os.path.exists(db + suffix):
+                            os.remove(db + suffix)
+                    watchdog = SlaWatchdog(db, 20)
+                    watchdog.migrate_json(path)
+                    start = time.perf_counter()
+                    check_wheel(watchdog, now)
+                    elapsed = time.perf_counter() - start
+                    watchdog.close()
+                    return elapsed
+
+                base = best_of(legacy)
+                check = min(wheel() for _ in range(20))
+                print(f"  {n:>6,} tickets   rescan {base * 1000:8.2f} ms   "
+                      f"wheel {check * 1e6:8.1f} µs   ({base / check:7.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
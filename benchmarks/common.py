@@ -0,0 +1,80 @@
+"""
+Shared helpers for the benchmark scripts.
+
+Run any benchmark from the repo root, e.g.:
+    python benchmarks/bench_risk.py
+"""
+
+import csv
+import os
+import re
+import sys
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)
+
+STATS_FILE = os.path.join(REPO_ROOT, "daily_stats.csv")
+
+# Strips the bot's own tags so subjects look like they did on arrival
+_BOT_TAGS = re.compile(r"^(?:🚨\s*)?(?:\[[^\]]*\]\s*)+")
+
+# A typical email body, trimmed to the 500 chars process_inbox reads
+SAMPLE_BODY = (
+    "Hi team,\n\n"
+    "Could you please arrange the transfer of the imaging below to our site. "
+    "The patient is being reviewed in clinic on Thursday and the consultant "
+    "would like the prior studies available for comparison before then.\n\n"
+    "Thanks in advance for your help.\n\n"
+    "Kind regards,\n"
+    "Medical Imaging Administration\n"
+    "Phone: 08 8222 0000 | Fax: 08 8222 0001\n"
+    "This email and any attachments are confidential and may contain "
+    "personal information. If you have received this email in error please "
+    "notify the sender and delete all copies. Do not use, copy or disclose."
+)[:500]
+
+
+def load_subjects(path=STATS_FILE):
+    """Incoming-style subjects from daily_stats.csv (bot tags removed)"""
+    subjects = []
+    with open(path, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            if row.get("Assigned To") == "completed":
+                continue
+            subject = _BOT_TAGS.sub("", row.get("Subject") or "").strip()
+            if subject:
+                subjects.append(subject)
+    return subjects
+
+
+def bench(fn, items, repeat=5):
+    """Best-of-N wall time for fn(item) over all items. Returns (seconds, per-call µs)"""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for item in items:
+            fn(*item)
+        best = min(best, time.perf_counter() - start)
+    return best, best / max(len(items), 1) * 1e6
+
+
+def report(label, seconds, per_call_us, baseline=None):
+    """Print one benchmark row"""
+    line = f"  {label:<32} {seconds * 1000:9.2f} ms  {per_call_us:8.2f} µs/msg"
+    if baseline:
+        line += f"  ({baseline / seconds:5.2f}x)"
+    print(line)
+
+
+CORPUS_FILE = os.path.join(REPO_ROOT, "benchmarks", "risk_corpus.csv")
+
+
+def load_corpus(path=CORPUS_FILE):
+    """Labelled risk corpus: [(subject, body, high_importance, expected, note)]"""
+    with open(path, newline="", encoding="utf-8") as f:
+        return [
+            (row["Subject"], row["Body"], row["High Importance"] == "1", row["Expected"], row["Note"])
+            for row in csv.DictReader(f)
+        ]
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Risk regression corpus: false-positive rates and throughput per match mode.
+
+risk_corpus.csv holds every distinct subject from daily_stats.csv plus
+hand-labelled edge cases (substring traps like "emergency" -> "merge",
+"know" -> "now", typos for fuzzy mode, and real deletion/merge requests
+that must stay critical).
+
+    python benchmarks/risk_regression.py            # summary
+    python benchmarks/risk_regression.py --verbose  # list every miss
+"""
+
+import sys
+import time
+
+from common import load_corpus
+
+from bench_risk import build_rules
+from risk_engine import RISK_LEVELS
+
+# (label, mode, fuzzy)
+CONFIGS = [
+    ("substring", "substring", False),
+    ("token", "token", False),
+    ("token+fuzzy", "token", True),
+]
+
+SEVERITY = {level: i for i, level in enumerate(RISK_LEVELS)}
+
+
+def evaluate(rules, corpus):
+    """Compare each prediction with its label. Returns (over, under, critical_fp, misses)"""
+    over = under = critical_fp = 0
+    misses = []
+    for subject, body, high_importance, expected, note in corpus:
+        level, reason = rules.classify(subject, body, high_importance)
+        if level == expected:
+            continue
+        if SEVERITY[level] > SEVERITY[expected]:
+            over += 1
+            if level == "critical":
+                critical_fp += 1
+        else:
+            under += 1
+        misses.append((expected, level, reason, subject, note))
+    return over, under, critical_fp, misses
+
+
+def throughput(rules, corpus, rounds=20):
+    """Messages classified per second (best of 3)"""
+    best = float("inf")
+    for _ in range(3):
+        start = time.perf_counter()
+        for _ in range(rounds):
+            for subject, body, high_importance, _, _ in corpus:
+                rules.classify(subject, body, high_importance)
+        best = min(best, time.perf_counter() - start)
+    return rounds * len(corpus) / best
+
+
+def main():
+    verbose = "--verbose" in sys.argv
+    corpus = load_corpus()
+    flaggable = sum(1 for row in corpus if row[3] != "critical")
+
+    print(f"Risk regression corpus - {len(corpus)} messages")
+    print(f"  {'mode':<12} {'over-flagged':>13} {'critical FP rate':>17} {'under-flagged':>14} {'msgs/sec':>10}")
+    for label, mode, fuzzy in CONFIGS:
+        rules = build_rules(mode=mode, fuzzy=fuzzy)
+        over, under, critical_fp, misses = evaluate(rules, corpus)
+        rate = critical_fp / flaggable * 100 if flaggable else 0.0
+        print(f"  {label:<12} {over:>13} {rate:>16.1f}% {under:>14} {throughput(rules, corpus):>10,.0f}")
+        if verbose:
+            for expected, level, reason, subject, note in misses:
+                print(f"      expected {expected:<8} got {level:<8} {subject[:45]!r:<48} {reason}  ({note})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+"""
+Bot Runtime - asyncio event loop running the bot's independent jobs
+
+Each job is its own task, so a slow Outlook call no longer holds up SLA
+breach detection:
+
+- ingestion    processes the inbox on new-mail events, and every
+               poll_interval seconds as a fallback
+- SLA checks   the moment the next deadline passes (sla_next() says when;
+               wake_sla() re-plans after a new deadline is armed), and at
+               least every sla_interval seconds
+- escalations  delivered as soon as the SLA check queues them
+- flush        periodic state flushing (rule stats, latency report, ...)
+
+Blocking work runs in executors. All mail-source work goes through one
+dedicated thread - COM objects must stay on the thread that created them.
+Everything else shares a small pool.
+
+stop() (or Ctrl+C / SIGTERM) lets in-flight work finish, delivers queued
+escalations and runs a final flush before run() returns.
+"""
+
+import asyncio
+import signal
+from concurrent.futures import ThreadPoolExecutor
+
+
+class BotRuntime:
+    """Runs ingestion, SLA checks, escalation delivery and flushing as asyncio tasks"""
+
+    def __init__(self, ingest, sla_check, deliver, flush, mail=None, poll_interval=60.0,
+                 sla_interval=60.0, flush_interval=60.0, push=True, sla_next=None, sla_retry=5.0,
+                 on_error=None):
+        self.ingest = ingest
+        self.sla_check = sla_check
+        self.sla_next = sla_next    # sla_next(): seconds until the next deadline (<= 0: overdue), or None
+        self.sla_retry = sla_retry  # wait before re-checking tickets that are still overdue
+        self.deliver = deliver      # deliver(timeout): blocks up to timeout for work, returns count
+        self.flush = flush
+        self.mail = mail
+        self.poll_interval = poll_interval
+        self.sla_interval = sla_interval
+        self.flush_interval = flush_interval
+        self.push = push
+        self.on_error = on_error
+
+        self.pushing = False
+        self._loop = None
+        self._stop = None
+        self._new_mail = None
+        self._sla_wake = None
+        self._mail_executor = None
+        self._executor = None
+
+    # ---------- helpers ----------
+    async def _in_mail_thread(self, fn, *args):
+        return await self._loop.run_in_executor(self._mail_executor, fn, *args)
+
+    async def _in_pool(self, fn, *args):
+        return await self._loop.run_in_executor(self._executor, fn, *args)
+
+    async def _sleep(self, seconds, wake=None):
+        """Sleep until timeout, stop() or (optionally) the wake event. True if stopping."""
+        waiters = [asyncio.ensure_future(self._stop.wait())]
+        if wake is not None:
+            waiters.append(asyncio.ensure_future(wake.wait()))
+        done, pending = await asyncio.wait(waiters, timeout=seconds, return_when=asyncio.FIRST_COMPLETED)
+        for w in pending:
+            w.cancel()
+        return self._stop.is_set()
+
+    async def _guard(self, name, coro):
+        """Run one job step; errors are reported, never fatal"""
+        try:
+            return await coro
+        except Exception as e:
+            if self.on_error:
+                self.on_error(f"Error in {name}: {e}")
+
+    def _notify_new_mail(self):
+        """Called by the mail source (any thread) when mail arrives"""
+        self._loop.call_soon_threadsafe(self._new_mail.set)
+
+    def wake_sla(self):
+        """A deadline was (re)armed - re-plan the SLA task's sleep (any thread)"""
+        if self._loop is not None and self._sla_wake is not None:
+            self._loop.call_soon_threadsafe(self._sla_wake.set)
+
+    # ---------- tasks ----------
+    async def _ingestion(self):
+        if self.push and self.mail is not None:
+            self.pushing = bool(await self._guard("push setup", self._in_mail_thread(self.mail.watch, self._notify_new_mail)))
+        next_poll = self._loop.time()
+        while not self._stop.is_set():
+            if self.pushing:
+                await self._guard("mail events", self._in_mail_thread(self.mail.pump))
+            now = self._loop.time()
+            if self._new_mail.is_set() or now >= next_poll:
+                self._new_mail.clear()
+                if now >= next_poll:
+                    next_poll = now + self.poll_interval
+                await self._guard("process_inbox", self._in_mail_thread(self.ingest))
+                continue
+            # Outlook events only arrive while the mail thread pumps - wake often
+            timeout = min(0.25 if self.pushing else 1.0, next_poll - now)
+            await self._sleep(timeout, self._new_mail)
+        if self.pushing:
+            await self._guard("push teardown", self._in_mail_thread(self.mail.unwatch))
+
+    async def _periodic(self, name, fn, interval):
+        while not self._stop.is_set():
+            await self._guard(name, self._in_pool(fn))
+            if await self._sleep(interval):
+                break
+
+    async def _sla(self):
+        while not self._stop.is_set():
+            self._sla_wake.clear()
+            await self._guard("check_sla_breaches", self._in_pool(self.sla_check))
+            delay = self.sla_interval
+            wait = self.sla_next() if self.sla_next else None
+            if wait is not None:
+                # Still overdue right after a check means escalating failed - retry later
+                delay = min(delay, wait if wait > 0 else self.sla_retry)
+            if await self._sleep(delay, self._sla_wake):
+                break
+
+    async def _escalations(self):
+        while not self._stop.is_set():
+            await self._guard("escalation delivery", self._in_pool(self.deliver, 0.5))
+
+    # ---------- lifecycle ----------
+    async def main(self):
+        self._loop = asyncio.get_running_loop()
+        self._stop = asyncio.Event()
+        self._new_mail = asyncio.Event()
+        self._sla_wake = asyncio.Event()
+        init = getattr(self.mail, "thread_init", None)
+        self._mail_executor = ThreadPoolExecutor(1, thread_name_prefix="mail", initializer=init)
+        self._executor = ThreadPoolExecutor(4, thread_name_prefix="bot")
+
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            try:
+                self._loop.add_signal_handler(sig, self._stop.set)
+            except (NotImplementedError, RuntimeError, ValueError):
+                pass  # Windows: Ctrl+C arrives as KeyboardInterrupt / cancellation instead
+
+        tasks = [
+            asyncio.create_task(self._ingestion(), name="ingestion"),
+            asyncio.create_task(self._sla(), name="sla"),
+            asyncio.create_task(self._escalations(), name="escalations"),
+            asyncio.create_task(self._periodic("flush", self.flush, self.flush_interval), name="flush"),
+        ]
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            self._stop.set()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            # Drain: in-flight executor work finishes, queued escalations go out, state is flushed
+            self._mail_executor.shutdown(wait=True)
+            self._executor.shutdown(wait=True)
+            self.deliver(0)
+            self.flush()
+
+    def stop(self):
+        """Ask the runtime to shut down (thread-safe)"""
+        if self._loop is not None:
+            self._loop.call_soon_threadsafe(self._stop.set)
+
+    def run(self):
+        """Run until stop(), Ctrl+C or SIGTERM"""
+        try:
+            asyncio.run(self.main())
+        except KeyboardInterrupt:
+            pass
@@ -6,6 +6,10 @@ from datetime import datetime, timedelta
 import json
 import os
 
+from sla_watchdog import read_tickets
+from stats_archive import StatsHistory
+from stats_loader import normalize_stats
+
 # ==================== DEMO MODE CONFIG ====================
 try:
     from config import DEMO_MODE, DEMO_AUTO_REFRESH
@@ -21,13 +25,6 @@ st.set_page_config(
     initial_sidebar_state="collapsed"
 )
 
-# Auto-refresh every 5 seconds using HTML meta refresh (reliable method)
-if not DEMO_MODE or DEMO_AUTO_REFRESH:
-    st.markdown(
-        '<meta http-equiv="refresh" content="5">',
-        unsafe_allow_html=True
-    )
-
 
 # ==================== THEME TOGGLE ====================
 if 'theme' not in st.session_state:
@@ -192,70 +189,135 @@ st.markdown(f"""
 
 # ==================== DATA LOADING ====================
 LOG_FILE = "daily_stats.csv"
+ARCHIVE_DIR = "stats_archive"
 STATE_FILE = "roster_state.json"
 STAFF_FILE = "staff.txt"
 
-@st.cache_data(ttl=5)  # Cache for 5 seconds for real-time feel
-def load_data():
-    """Load and process all data sources"""
+STATS_COLUMNS = ['Date', 'Time', 'Subject', 'Assigned To', 'Sender', 'Risk Level']
+TODAY_COLUMNS = ['Date', 'Time', 'DateTime', 'Subject', 'Assigned To']  # what the views of today show
+RAW_COLUMNS = ['Date', 'Time', 'Assigned To', 'Sender', 'Subject']      # raw data viewer
+
+@st.cache_resource
+def stats_history():
+    """
+    One reader of the stats history per dashboard process: closed days from
+    the Parquet archive, today from the live CSV (stats_archive.py)
+    """
+    return StatsHistory(LOG_FILE, ARCHIVE_DIR)
+
+def load_history(since=None, until=None, columns=None):
+    """
+    Stats rows dated since..until (None: unbounded), only the given columns -
+    archived days outside the range are never opened. Empty if there are none.
+    """
+    df = stats_history().read(since=since, until=until, columns=columns)
+    if df is None:
+        df = normalize_stats(pd.DataFrame(columns=STATS_COLUMNS))
+        df = df.reindex(columns=columns) if columns else df
+    return df
+
+def load_today(today):
+    """Today's rows (an empty frame with the same columns and types if there are none yet)"""
+    # Charts over longer ranges are rollup slices: earlier days' archive
+    # partitions stay closed, and only rows appended to the CSV since the
+    # last refresh are parsed
+    return load_history(since=today, until=today, columns=TODAY_COLUMNS)
+
+def load_roster():
+    """Round-robin state written by the bot"""
     try:
-        # Load CSV with flexible date parsing
-        df = pd.read_csv(LOG_FILE)
-        
-        # Normalize date format - handle mixed formats
-        def parse_date(date_str):
-            """Parse date from multiple formats"""
-            if pd.isna(date_str):
-                return None
-            
-            date_str = str(date_str).strip()
-            
-            # Try YYYY-MM-DD format first
-            try:
-                return pd.to_datetime(date_str, format='%Y-%m-%d').strftime('%Y-%m-%d')
-            except:
-                pass
-            
-            # Try DD/MM/YYYY format
-            try:
-                return pd.to_datetime(date_str, format='%d/%m/%Y').strftime('%Y-%m-%d')
-            except:
-                pass
-            
-            # Fallback to pandas auto-parse with dayfirst
-            try:
-                return pd.to_datetime(date_str, dayfirst=True).strftime('%Y-%m-%d')
-            except:
-                return None
-        
-        df['Date'] = df['Date'].apply(parse_date)
-        
-        # Remove rows where date parsing failed
-        df = df[df['Date'].notna()].copy()
-        
-        # Normalize email addresses to lowercase to prevent duplicates
-        df['Assigned To'] = df['Assigned To'].str.lower()
-        
-        # Add datetime column for time-based analysis
-        df['DateTime'] = pd.to_datetime(df['Date'] + ' ' + df['Time'], errors='coerce')
-        
-        # Load roster state
         with open(STATE_FILE, 'r') as f:
-            roster_state = json.load(f)
-        
-        # Load staff list and normalize to lowercase
+            return json.load(f)
+    except FileNotFoundError:
+        return {"current_index": 0, "total_processed": 0}
+
+def load_staff():
+    """Staff list, normalized to lowercase"""
+    try:
         with open(STAFF_FILE, 'r') as f:
-            staff_list = [line.strip().lower() for line in f if line.strip()]
-        
-        return df, roster_state, staff_list
+            return [line.strip().lower() for line in f if line.strip()]
     except FileNotFoundError:
-        return None, None, None
+        return []
+
+def load_rollup():
+    """
+    Row counts by date, hour, staff, sender and risk level over all history
+    (stats_rollup.py) - only rows that arrived since the last refresh are counted
+    """
+    return stats_history().rollup()
+
+# ==================== CHANGE-DRIVEN REFRESH ====================
+# No page reloads and no whole-page reruns: every section is a fragment that reruns
+# on its own every WATCH_SECONDS and checks the versions (mtime + size - a few stat
+# calls) of the files it shows. A fragment has to redraw whatever it shows on each
+# run, so what a section builds from those files (today's rows, Plotly figures) is
+# kept in the session and rebuilt only when one of them changed: new stats rows
+# rebuild the stats sections, a roster edit only the System Status card. The Control
+# Tower reruns every TOWER_SECONDS, since its SLA countdowns move with the clock.
+LIVE_UPDATES = not DEMO_MODE or DEMO_AUTO_REFRESH
+WATCH_SECONDS = 2
+TOWER_SECONDS = 10
+LIVE_SECONDS = WATCH_SECONDS if LIVE_UPDATES else None  # None: sections only rerun with the page
+STATS_FILES = [LOG_FILE, ARCHIVE_DIR]
+ROSTER_FILES = [STATE_FILE]
+STAFF_FILES = [STAFF_FILE]
+
+def files_version(paths):
+    """Changes whenever one of the files changes (or the date rolls over)"""
+    version = [datetime.now().date()]
+    for path in paths:
+        try:
+            info = os.stat(path)
+            version.append((info.st_mtime_ns, info.st_size))
+        except OSError:
+            version.append(None)
+    return tuple(version)
+
+def unless_changed(key, paths, build, *args):
+    """
+    build(*args) - or, if neither the files, the args nor the theme changed since
+    this session last built key, what it returned then
+    """
+    version = (files_version(paths), args, st.session_state.theme)
+    built = st.session_state.setdefault('built', {})
+    if key not in built or built[key][0] != version:
+        built[key] = (version, build(*args))
+    return built[key][1]
+
+def load_stats():
+    """Today's date, today's rows and the rollup of all history"""
+    today = pd.Timestamp.now().normalize()  # Date is a datetime64 column (midnight)
+    return today, load_today(today), load_rollup()
+
+def stats():
+    """load_stats() as of the stats files' current version - shared by the sections"""
+    return unless_changed('stats', STATS_FILES, load_stats)
+
+def roster():
+    """load_roster() as of roster_state.json's current version"""
+    return unless_changed('roster', ROSTER_FILES, load_roster)
+
+def staff():
+    """load_staff() as of staff.txt's current version"""
+    return unless_changed('staff', STAFF_FILES, load_staff)
+
+def todays_assignments(rollup, today):
+    """Today's assignments per staff member (replies excluded), busiest first"""
+    return rollup.counts('Assigned To', start=today, end=today, assigned_only=True).sort_values(ascending=False)
+
+def workload_balance(assignments):
+    """100 when the assignments are spread evenly, lower the further apart they are"""
+    if len(assignments) == 0 or assignments.max() <= 0:
+        return 100
+    return 100 - ((assignments.max() - assignments.min()) / assignments.max() * 100)
 
 # ==================== HEADER ====================
 col1, col2, col3, col4 = st.columns([3, 1, 0.4, 0.4])
 with col1:
     st.markdown("<h1>🚀 SAMI Transfer Bot - Live Operations Center</h1>", unsafe_allow_html=True)
-with col2:
+@st.fragment(run_every=LIVE_SECONDS)
+def live_status():
+    """Header status indicator and clock"""
     if DEMO_MODE:
         if DEMO_AUTO_REFRESH:
             # Demo with live updates - green pulsing indicator
@@ -264,17 +326,17 @@ with col2:
                 <span class='live-indicator'></span>
                 <span style='color: #10b981; font-weight: 600;'>DEMO LIVE</span>
                 <br>
-                <span style='color: #a0aec0; font-size: 0.8rem;'>Auto-refresh: ON</span>
+                <span style='color: #a0aec0; font-size: 0.8rem;'>Live updates: ON</span>
             </div>
             """, unsafe_allow_html=True)
         else:
-            # Demo without auto-refresh - yellow static indicator
+            # Demo without live updates - yellow static indicator
             st.markdown(f"""
             <div style='text-align: right; padding-top: 1rem;'>
                 <span style='display: inline-block; width: 10px; height: 10px; background: #fbbf24; border-radius: 50%; margin-right: 8px;'></span>
                 <span style='color: #fbbf24; font-weight: 600;'>DEMO MODE</span>
                 <br>
-                <span style='color: #a0aec0; font-size: 0.8rem;'>Auto-refresh: OFF</span>
+                <span style='color: #a0aec0; font-size: 0.8rem;'>Live updates: OFF</span>
             </div>
             """, unsafe_allow_html=True)
     else:
@@ -286,6 +348,9 @@ with col2:
             <span style='color: #a0aec0; font-size: 0.8rem;'>{datetime.now().strftime('%d %b %Y, %H:%M:%S')}</span>
         </div>
         """, unsafe_allow_html=True)
+
+with col2:
+    live_status()
 with col3:
     st.markdown("<div style='padding-top: 1.5rem;'></div>", unsafe_allow_html=True)
     # Theme toggle button
@@ -299,312 +364,316 @@ with col4:
         st.rerun()
 
 # ==================== LOAD DATA ====================
-df, roster_state, staff_list = load_data()
-
-# Handle missing data gracefully - don't stop, show what we have
-if df is None:
-    # Create empty dataframe with expected columns
-    df = pd.DataFrame(columns=['Date', 'Time', 'Subject', 'Assigned To', 'Sender', 'Risk Level'])
-    st.info("📭 **No data yet.** Start the bot or simulator to see live metrics.")
-
-if roster_state is None:
-    roster_state = {"current_index": 0, "total_processed": 0}
+# Each section loads what it shows (stats(), roster(), staff()); charts are slices
+# of the rollup rather than groupbys over raw rows
+@st.fragment(run_every=LIVE_SECONDS)
+def no_data_notice():
+    """Handle missing data gracefully - don't stop, show what we have"""
+    today, df_today, rollup = stats()
+    if rollup.counts('Date').sum() == 0:
+        st.info("📭 **No data yet.** Start the bot or simulator to see live metrics.")
 
-if staff_list is None:
-    staff_list = []
-
-# ==================== TODAY'S DATA ====================
-today = datetime.now().strftime('%Y-%m-%d')
-df_today = df[df['Date'] == today].copy() if len(df) > 0 else df.copy()
+no_data_notice()
 
 # ==================== CLINICAL CONTROL TOWER ====================
 st.markdown("---")
 
 # Load SLA Watchdog data
 def load_watchdog():
-    """Load urgent watchdog data"""
-    try:
-        watchdog_file = os.path.join(os.path.dirname(__file__), 'urgent_watchdog.json')
-        if os.path.exists(watchdog_file):
-            with open(watchdog_file, 'r') as f:
-                return json.load(f)
-    except:
-        pass
-    return {}
-
-watchdog_data = load_watchdog()
-sla_limit_minutes = 20
-
-# Calculate SLA statuses
-active_risks = []
-breached_risks = []
-now = datetime.now()
-
-for msg_id, ticket in watchdog_data.items():
-    try:
-        ticket_time = datetime.fromisoformat(ticket['timestamp'])
-        elapsed = now - ticket_time
-        elapsed_minutes = elapsed.total_seconds() / 60
-        remaining = sla_limit_minutes - elapsed_minutes
-        
-        ticket_info = {
-            'id': msg_id[:8] + '...',
-            'subject': ticket.get('subject', 'Unknown')[:40],
-            'assignee': ticket.get('assigned_to', 'Unknown').split('@')[0],
-            'risk_type': ticket.get('risk_type', 'Unknown'),
-            'elapsed': int(elapsed_minutes),
-            'remaining': max(0, int(remaining)),
-            'escalations': ticket.get('escalation_count', 0)
-        }
-        
-        if elapsed_minutes > sla_limit_minutes:
-            breached_risks.append(ticket_info)
-        else:
-            active_risks.append(ticket_info)
-    except:
-        continue
-
-# Determine overall status
-if breached_risks:
-    tower_status = "BREACH"
-    banner_color = "#ef4444"  # Red
-    banner_icon = "🚨"
-    banner_text = f"SLA BREACH - {len(breached_risks)} ticket(s) exceeded {sla_limit_minutes}min limit!"
-elif active_risks:
-    tower_status = "ACTIVE"
-    banner_color = "#f59e0b"  # Amber
-    banner_icon = "⚠️"
-    banner_text = f"Active Risks - {len(active_risks)} urgent ticket(s) being monitored"
-else:
-    tower_status = "NORMAL"
-    banner_color = "#10b981"  # Green
-    banner_icon = "✅"
-    banner_text = "System Normal - No urgent tickets pending"
-
-# Display Clinical Control Tower
-col_tower_title, col_tower_info = st.columns([6, 1])
-with col_tower_title:
-    st.markdown("### 🏥 Clinical Control Tower")
-    st.caption("*Real-time SLA monitoring for critical requests*")
-with col_tower_info:
-    with st.expander("ℹ️ Info"):
-        st.caption("Monitors urgent tickets with 20-minute SLA. Red = Breach, Yellow = Active, Green = Normal.")
-
-# Status Banner
-st.markdown(f"""
-<div style='
-    background: linear-gradient(135deg, {banner_color}20 0%, {banner_color}10 100%);
-    border-left: 4px solid {banner_color};
-    border-radius: 8px;
-    padding: 1rem 1.5rem;
-    margin-bottom: 1rem;
-'>
-    <div style='display: flex; align-items: center; gap: 1rem;'>
-        <span style='font-size: 2rem;'>{banner_icon}</span>
-        <div>
-            <div style='font-size: 1.2rem; font-weight: 700; color: {banner_color};'>{tower_status}</div>
-            <div style='font-size: 0.9rem; color: {text_color};'>{banner_text}</div>
+    """Load urgent watchdog data (read-only - never blocks the bot)"""
+    base_dir = os.path.dirname(__file__)
+    return read_tickets(
+        os.path.join(base_dir, 'urgent_watchdog.db'),
+        json_fallback=os.path.join(base_dir, 'urgent_watchdog.json')
+    )
+
+@st.fragment(run_every=TOWER_SECONDS if LIVE_UPDATES else None)
+def clinical_control_tower():
+    """SLA status of open urgent tickets - reruns on its own, the countdowns move with the clock"""
+    watchdog_data = load_watchdog()
+    sla_limit_minutes = 20
+
+    # Calculate SLA statuses
+    active_risks = []
+    breached_risks = []
+    now = datetime.now()
+
+    for msg_id, ticket in watchdog_data.items():
+        try:
+            ticket_time = datetime.fromisoformat(ticket['timestamp'])
+            elapsed = now - ticket_time
+            elapsed_minutes = elapsed.total_seconds() / 60
+            remaining = sla_limit_minutes - elapsed_minutes
+            
+            ticket_info = {
+                'id': msg_id[:8] + '...',
+                'subject': ticket.get('subject', 'Unknown')[:40],
+                'assignee': ticket.get('assigned_to', 'Unknown').split('@')[0],
+                'risk_type': ticket.get('risk_type', 'Unknown'),
+                'elapsed': int(elapsed_minutes),
+                'remaining': max(0, int(remaining)),
+                'escalations': ticket.get('escalation_count', 0)
+            }
+            
+            if elapsed_minutes > sla_limit_minutes:
+                breached_risks.append(ticket_info)
+            else:
+                active_risks.append(ticket_info)
+        except:
+            continue
+
+    # Determine overall status
+    if breached_risks:
+        tower_status = "BREACH"
+        banner_color = "#ef4444"  # Red
+        banner_icon = "🚨"
+        banner_text = f"SLA BREACH - {len(breached_risks)} ticket(s) exceeded {sla_limit_minutes}min limit!"
+    elif active_risks:
+        tower_status = "ACTIVE"
+        banner_color = "#f59e0b"  # Amber
+        banner_icon = "⚠️"
+        banner_text = f"Active Risks - {len(active_risks)} urgent ticket(s) being monitored"
+    else:
+        tower_status = "NORMAL"
+        banner_color = "#10b981"  # Green
+        banner_icon = "✅"
+        banner_text = "System Normal - No urgent tickets pending"
+
+    # Display Clinical Control Tower
+    col_tower_title, col_tower_info = st.columns([6, 1])
+    with col_tower_title:
+        st.markdown("### 🏥 Clinical Control Tower")
+        st.caption("*Real-time SLA monitoring for critical requests*")
+    with col_tower_info:
+        with st.expander("ℹ️ Info"):
+            st.caption("Monitors urgent tickets with 20-minute SLA. Red = Breach, Yellow = Active, Green = Normal.")
+
+    # Status Banner
+    st.markdown(f"""
+    <div style='
+        background: linear-gradient(135deg, {banner_color}20 0%, {banner_color}10 100%);
+        border-left: 4px solid {banner_color};
+        border-radius: 8px;
+        padding: 1rem 1.5rem;
+        margin-bottom: 1rem;
+    '>
+        <div style='display: flex; align-items: center; gap: 1rem;'>
+            <span style='font-size: 2rem;'>{banner_icon}</span>
+            <div>
+                <div style='font-size: 1.2rem; font-weight: 700; color: {banner_color};'>{tower_status}</div>
+                <div style='font-size: 0.9rem; color: {text_color};'>{banner_text}</div>
+            </div>
         </div>
     </div>
-</div>
-""", unsafe_allow_html=True)
+    """, unsafe_allow_html=True)
 
-# Show urgent tickets table if any exist
-if active_risks or breached_risks:
-    col_metrics1, col_metrics2, col_metrics3, col_metrics4 = st.columns(4)
-    
-    with col_metrics1:
-        st.metric("Active Risks", len(active_risks), delta=None)
-    with col_metrics2:
-        st.metric("SLA Breaches", len(breached_risks), delta_color="inverse" if breached_risks else "off")
-    with col_metrics3:
-        total_escalations = sum(t.get('escalations', 0) for t in breached_risks + active_risks)
-        st.metric("Escalations", total_escalations)
-    with col_metrics4:
-        if 'Risk Level' in df_today.columns:
-            critical_today = len(df_today[df_today['Risk Level'].isin(['critical', 'urgent'])])
-        else:
-            critical_today = 0
-        st.metric("Critical Today", critical_today)
-    
-    # Tickets table
-    if breached_risks:
-        st.markdown("#### 🚨 SLA Breached Tickets")
-        breach_df = pd.DataFrame(breached_risks)
-        breach_df = breach_df.rename(columns={
-            'assignee': 'Assigned To',
-            'subject': 'Subject',
-            'risk_type': 'Risk Type',
-            'elapsed': 'Elapsed (min)',
-            'escalations': 'Escalations'
-        })
+    # Show urgent tickets table if any exist
+    if active_risks or breached_risks:
+        col_metrics1, col_metrics2, col_metrics3, col_metrics4 = st.columns(4)
         
-        # Highlight breached rows
-        def highlight_breach(row):
-            return ['background-color: rgba(239, 68, 68, 0.2)'] * len(row)
+        with col_metrics1:
+            st.metric("Active Risks", len(active_risks), delta=None)
+        with col_metrics2:
+            st.metric("SLA Breaches", len(breached_risks), delta_color="inverse" if breached_risks else "off")
+        with col_metrics3:
+            total_escalations = sum(t.get('escalations', 0) for t in breached_risks + active_risks)
+            st.metric("Escalations", total_escalations)
+        with col_metrics4:
+            today, df_today, rollup = stats()
+            risk_today = rollup.counts('Risk Level', start=today, end=today)
+            critical_today = int(risk_today[risk_today.index.isin(['critical', 'urgent'])].sum())
+            st.metric("Critical Today", critical_today)
         
-        st.dataframe(
-            breach_df[['Subject', 'Assigned To', 'Risk Type', 'Elapsed (min)', 'Escalations']].style.apply(highlight_breach, axis=1),
-            use_container_width=True,
-            height=150
-        )
-    
-    if active_risks:
-        st.markdown("#### ⏱️ Active Urgent Tickets")
-        active_df = pd.DataFrame(active_risks)
-        active_df = active_df.rename(columns={
-            'assignee': 'Assigned To',
-            'subject': 'Subject',
-            'risk_type': 'Risk Type',
-            'remaining': 'Time Left (min)',
-            'elapsed': 'Elapsed (min)'
-        })
-        
-        # Highlight based on remaining time
-        def highlight_urgency(row):
-            remaining = row.get('Time Left (min)', 20)
-            if remaining < 5:
+        # Tickets table
+        if breached_risks:
+            st.markdown("#### 🚨 SLA Breached Tickets")
+            breach_df = pd.DataFrame(breached_risks)
+            breach_df = breach_df.rename(columns={
+                'assignee': 'Assigned To',
+                'subject': 'Subject',
+                'risk_type': 'Risk Type',
+                'elapsed': 'Elapsed (min)',
+                'escalations': 'Escalations'
+            })
+            
+            # Highlight breached rows
+            def highlight_breach(row):
                 return ['background-color: rgba(239, 68, 68, 0.2)'] * len(row)
-            elif remaining < 10:
-                return ['background-color: rgba(245, 158, 11, 0.2)'] * len(row)
-            return [''] * len(row)
+            
+            st.dataframe(
+                breach_df[['Subject', 'Assigned To', 'Risk Type', 'Elapsed (min)', 'Escalations']].style.apply(highlight_breach, axis=1),
+                use_container_width=True,
+                height=150
+            )
         
-        st.dataframe(
-            active_df[['Subject', 'Assigned To', 'Risk Type', 'Time Left (min)']].style.apply(highlight_urgency, axis=1),
-            use_container_width=True,
-            height=200
-        )
+        if active_risks:
+            st.markdown("#### ⏱️ Active Urgent Tickets")
+            active_df = pd.DataFrame(active_risks)
+            active_df = active_df.rename(columns={
+                'assignee': 'Assigned To',
+                'subject': 'Subject',
+                'risk_type': 'Risk Type',
+                'remaining': 'Time Left (min)',
+                'elapsed': 'Elapsed (min)'
+            })
+            
+            # Highlight based on remaining time
+            def highlight_urgency(row):
+                remaining = row.get('Time Left (min)', 20)
+                if remaining < 5:
+                    return ['background-color: rgba(239, 68, 68, 0.2)'] * len(row)
+                elif remaining < 10:
+                    return ['background-color: rgba(245, 158, 11, 0.2)'] * len(row)
+                return [''] * len(row)
+            
+            st.dataframe(
+                active_df[['Subject', 'Assigned To', 'Risk Type', 'Time Left (min)']].style.apply(highlight_urgency, axis=1),
+                use_container_width=True,
+                height=200
+            )
+
+clinical_control_tower()
 
 # ==================== EXECUTIVE SUMMARY & HEALTH STATUS ====================
 st.markdown("---")
 
-# Calculate health metrics
-total_today = len(df_today)
-active_staff = df_today[df_today['Assigned To'] != 'completed']['Assigned To'].nunique()
-completed_today = len(df_today[df_today['Assigned To'] == 'completed'])
-
-# Calculate balance score
-if total_today > 0:
-    assignment_data = df_today[df_today['Assigned To'] != 'completed']['Assigned To'].value_counts()
-    if len(assignment_data) > 0:
-        max_load = assignment_data.max()
-        min_load = assignment_data.min()
-        balance_score = 100 - ((max_load - min_load) / max_load * 100) if max_load > 0 else 100
+@st.fragment(run_every=LIVE_SECONDS)
+def executive_summary():
+    """Health status, today vs the same day last week, top source and an insight"""
+    today, df_today, rollup = stats()
+    today_assignments = todays_assignments(rollup, today)
+
+    # Calculate health metrics
+    total_today = len(df_today)
+    active_staff = len(today_assignments)
+    completed_today = int(rollup.counts('Assigned To', start=today, end=today).get('completed', 0))
+
+    # Calculate balance score
+    balance_score = workload_balance(today_assignments)
+
+    # Determine health status
+    if balance_score >= 80 and total_today >= 0:
+        health_status = "🟢 Healthy"
+        health_color = "#10b981"
+        status_emoji = "✅"
+    elif balance_score >= 60:
+        health_status = "🟡 Minor Issues"
+        health_color = "#fbbf24"
+        status_emoji = "⚠️"
     else:
-        balance_score = 100
-else:
-    balance_score = 100
-
-# Determine health status
-if balance_score >= 80 and total_today >= 0:
-    health_status = "🟢 Healthy"
-    health_color = "#10b981"
-    status_emoji = "✅"
-elif balance_score >= 60:
-    health_status = "🟡 Minor Issues"
-    health_color = "#fbbf24"
-    status_emoji = "⚠️"
-else:
-    health_status = "🔴 Needs Attention"
-    health_color = "#ef4444"
-    status_emoji = "❌"
-
-# Get week-over-week comparison
-yesterday = (datetime.now() - timedelta(days=1)).strftime('%Y-%m-%d')
-last_week_today = (datetime.now() - timedelta(days=7)).strftime('%Y-%m-%d')
-df_yesterday = df[df['Date'] == yesterday]
-df_last_week = df[df['Date'] == last_week_today]
-
-wow_requests = total_today - len(df_last_week)
-wow_trend = "↑" if wow_requests > 0 else "↓" if wow_requests < 0 else "→"
-
-# Get top sender
-top_sender = "N/A"
-if 'Sender' in df_today.columns and len(df_today) > 0:
-    sender_data = df_today[df_today['Sender'].notna() & (df_today['Sender'] != 'unknown')]['Sender'].value_counts()
-    if len(sender_data) > 0:
-        top_sender = sender_data.index[0].split('@')[0]
-        top_sender_count = sender_data.iloc[0]
-        top_sender = f"{top_sender} ({top_sender_count} requests)"
-
-# Generate insight
-if total_today > len(df_last_week) * 1.5:
-    insight = f"📈 High volume alert: +{((total_today/len(df_last_week) - 1)*100):.0f}% vs last week" if len(df_last_week) > 0 else "📈 Activity increasing"
-elif total_today < len(df_last_week) * 0.5 and len(df_last_week) > 0:
-    insight = "📉 Unusually quiet - below normal volume"
-elif balance_score < 70:
-    insight = "⚖️ Workload imbalance detected - check distribution"
-else:
-    insight = "✨ All systems operating normally"
-
-# Executive Summary Box
-st.markdown(f"""
-<div style='background: linear-gradient(135deg, {health_color}22 0%, {health_color}11 100%); 
-            border-left: 4px solid {health_color}; 
-            padding: 1.5rem; 
-            border-radius: 8px; 
-            margin-bottom: 1rem;'>
-    <h2 style='margin: 0 0 1rem 0; color: #fff;'>📊 EXECUTIVE SUMMARY</h2>
-    <div style='display: grid; grid-template-columns: repeat(auto-fit, minmax(200px, 1fr)); gap: 1rem;'>
-        <div>
-            <p style='margin: 0; color: #a0aec0; font-size: 0.9rem;'>System Status</p>
-            <p style='margin: 0.25rem 0 0 0; font-size: 1.3rem; font-weight: 700; color: {health_color};'>{health_status}</p>
-        </div>
-        <div>
-            <p style='margin: 0; color: #a0aec0; font-size: 0.9rem;'>Today's Activity</p>
-            <p style='margin: 0.25rem 0 0 0; font-size: 1.3rem; font-weight: 700; color: #fff;'>{total_today} requests {wow_trend}</p>
-        </div>
-        <div>
-            <p style='margin: 0; color: #a0aec0; font-size: 0.9rem;'>Team Balance</p>
-            <p style='margin: 0.25rem 0 0 0; font-size: 1.3rem; font-weight: 700; color: #fff;'>{balance_score:.0f}% {status_emoji}</p>
+        health_status = "🔴 Needs Attention"
+        health_color = "#ef4444"
+        status_emoji = "❌"
+
+    # Get week-over-week comparison
+    last_week_today = today - pd.Timedelta(days=7)
+    last_week_total = int(rollup.counts('Date', start=last_week_today, end=last_week_today).sum())
+
+    wow_requests = total_today - last_week_total
+    wow_trend = "↑" if wow_requests > 0 else "↓" if wow_requests < 0 else "→"
+
+    # Get top sender
+    top_sender = "N/A"
+    if len(df_today) > 0:
+        sender_data = rollup.counts('Sender', start=today, end=today).drop('unknown', errors='ignore').sort_values(ascending=False)
+        if len(sender_data) > 0:
+            top_sender = sender_data.index[0].split('@')[0]
+            top_sender_count = sender_data.iloc[0]
+            top_sender = f"{top_sender} ({top_sender_count} requests)"
+
+    # Generate insight
+    if total_today > last_week_total * 1.5:
+        insight = f"📈 High volume alert: +{((total_today/last_week_total - 1)*100):.0f}% vs last week" if last_week_total > 0 else "📈 Activity increasing"
+    elif total_today < last_week_total * 0.5 and last_week_total > 0:
+        insight = "📉 Unusually quiet - below normal volume"
+    elif balance_score < 70:
+        insight = "⚖️ Workload imbalance detected - check distribution"
+    else:
+        insight = "✨ All systems operating normally"
+
+    # Executive Summary Box
+    st.markdown(f"""
+    <div style='background: linear-gradient(135deg, {health_color}22 0%, {health_color}11 100%); 
+                border-left: 4px solid {health_color}; 
+                padding: 1.5rem; 
+                border-radius: 8px; 
+                margin-bottom: 1rem;'>
+        <h2 style='margin: 0 0 1rem 0; color: #fff;'>📊 EXECUTIVE SUMMARY</h2>
+        <div style='display: grid; grid-template-columns: repeat(auto-fit, minmax(200px, 1fr)); gap: 1rem;'>
+            <div>
+                <p style='margin: 0; color: #a0aec0; font-size: 0.9rem;'>System Status</p>
+                <p style='margin: 0.25rem 0 0 0; font-size: 1.3rem; font-weight: 700; color: {health_color};'>{health_status}</p>
+            </div>
+            <div>
+                <p style='margin: 0; color: #a0aec0; font-size: 0.9rem;'>Today's Activity</p>
+                <p style='margin: 0.25rem 0 0 0; font-size: 1.3rem; font-weight: 700; color: #fff;'>{total_today} requests {wow_trend}</p>
+            </div>
+            <div>
+                <p style='margin: 0; color: #a0aec0; font-size: 0.9rem;'>Team Balance</p>
+                <p style='margin: 0.25rem 0 0 0; font-size: 1.3rem; font-weight: 700; color: #fff;'>{balance_score:.0f}% {status_emoji}</p>
+            </div>
+            <div>
+                <p style='margin: 0; color: #a0aec0; font-size: 0.9rem;'>Top Source</p>
+                <p style='margin: 0.25rem 0 0 0; font-size: 1.3rem; font-weight: 700; color: #fff;'>{top_sender}</p>
+            </div>
         </div>
-        <div>
-            <p style='margin: 0; color: #a0aec0; font-size: 0.9rem;'>Top Source</p>
-            <p style='margin: 0.25rem 0 0 0; font-size: 1.3rem; font-weight: 700; color: #fff;'>{top_sender}</p>
+        <div style='margin-top: 1rem; padding: 0.75rem; background: rgba(0,0,0,0.2); border-radius: 6px;'>
+            <p style='margin: 0; color: #fff; font-size: 0.95rem;'><strong>💡 Insight:</strong> {insight}</p>
         </div>
     </div>
-    <div style='margin-top: 1rem; padding: 0.75rem; background: rgba(0,0,0,0.2); border-radius: 6px;'>
-        <p style='margin: 0; color: #fff; font-size: 0.95rem;'><strong>💡 Insight:</strong> {insight}</p>
-    </div>
-</div>
-""", unsafe_allow_html=True)
+    """, unsafe_allow_html=True)
 
-# DEBUG: Show what dates we have in the data
-with st.expander("🔍 Debug Info (Click to expand)", expanded=False):
-    st.write(f"**Current Date:** {today}")
-    st.write(f"**Total records in CSV:** {len(df)}")
-    st.write(f"**Records for today:** {len(df_today)}")
-    st.write("**Unique dates in data:**")
-    st.write(df['Date'].value_counts().sort_index(ascending=False))
+    # DEBUG: Show what dates we have in the data
+    with st.expander("🔍 Debug Info (Click to expand)", expanded=False):
+        day_counts = rollup.counts('Date')  # rows per day, all history
+        st.write(f"**Current Date:** {today:%Y-%m-%d}")
+        st.write(f"**Total records:** {int(day_counts.sum())}")
+        st.write(f"**Records for today:** {len(df_today)}")
+        st.write("**Unique dates in data:**")
+        st.write(day_counts.sort_index(ascending=False))
+
+executive_summary()
 
 # ==================== EXPORT FUNCTIONALITY ====================
-col_export1, col_export2, col_export3 = st.columns([2, 1, 2])
-with col_export2:
-    csv_data = df.to_csv(index=False).encode('utf-8')
-    st.download_button(
-        label="📥 Export Full Data (CSV)",
-        data=csv_data,
-        file_name=f"helpdesk_transfer_bot_{datetime.now().strftime('%Y%m%d_%H%M')}.csv",
-        mime="text/csv",
-        use_container_width=True,
-        help="Download complete dataset for external analysis"
-    )
+@st.fragment
+def export_data():
+    """Full-history CSV export - no timer: it only reruns when its button is pressed"""
+    col_export1, col_export2, col_export3 = st.columns([2, 1, 2])
+    with col_export2:
+        # All history is only read (and encoded) when someone asks for it
+        if st.button("📥 Export Full Data (CSV)", use_container_width=True, help="Prepare the complete dataset for download"):
+            st.download_button(
+                label="💾 Download Full Data (CSV)",
+                data=load_history().to_csv(index=False).encode('utf-8'),
+                file_name=f"helpdesk_transfer_bot_{datetime.now().strftime('%Y%m%d_%H%M')}.csv",
+                mime="text/csv",
+                use_container_width=True,
+                help="Download complete dataset for external analysis"
+            )
+
+export_data()
 
 # ==================== SHAME JOHN BUTTON (Easter Egg) ====================
-# Show button if workload is imbalanced and John exists in staff
-if balance_score < 70 and 'staff2@example.com' in staff_list:
-    john_assignments = len(df_today[df_today['Assigned To'] == 'staff2@example.com'])
-    avg_assignments = total_today / len(staff_list) if len(staff_list) > 0 else 0
-    
-    if john_assignments < avg_assignments * 0.5:  # John is doing less than half the average
-        st.markdown("---")
-        col_shame1, col_shame2, col_shame3 = st.columns([1, 1, 1])
-        with col_shame2:
-            import urllib.parse
+@st.fragment(run_every=LIVE_SECONDS)
+def shame_john():
+    """Show button if workload is imbalanced and John exists in staff"""
+    today, df_today, rollup = stats()
+    staff_list = staff()
+    balance_score = workload_balance(todays_assignments(rollup, today))
+    total_today = len(df_today)
+    if balance_score < 70 and 'staff2@example.com' in staff_list:
+        john_assignments = len(df_today[df_today['Assigned To'] == 'staff2@example.com'])
+        avg_assignments = total_today / len(staff_list) if len(staff_list) > 0 else 0
+    
+        if john_assignments < avg_assignments * 0.5:  # John is doing less than half the average
+            st.markdown("---")
+            col_shame1, col_shame2, col_shame3 = st.columns([1, 1, 1])
+            with col_shame2:
+                import urllib.parse
             
-            chuck_count = len(df_today[df_today['Assigned To'] == 'staff4@example.com'])
-            email_subject = "RE: Your Outstanding Workload Performance"
-            email_body = f"""Hi John,
+                chuck_count = len(df_today[df_today['Assigned To'] == 'staff4@example.com'])
+                email_subject = "RE: Your Outstanding Workload Performance"
+                email_body = f"""Hi John,
 
 I hope this email finds you well and not napping at your desk!
 
@@ -624,174 +693,198 @@ The Dashboard That Never Sleeps
 
 P.S. Chuck Norris has done {chuck_count} requests today. Just saying.
 """
-            # Properly encode the mailto URL
-            mailto_link = f"mailto:staff2@example.com?subject={urllib.parse.quote(email_subject)}&body={urllib.parse.quote(email_body)}"
+                # Properly encode the mailto URL
+                mailto_link = f"mailto:staff2@example.com?subject={urllib.parse.quote(email_subject)}&body={urllib.parse.quote(email_body)}"
             
-            if st.button("📧 Email John", use_container_width=True, type="primary"):
-                st.markdown(f'<meta http-equiv="refresh" content="0;url={mailto_link}">', unsafe_allow_html=True)
-                st.success("📧 Opening email client...")
+                if st.button("📧 Email John", use_container_width=True, type="primary"):
+                    st.markdown(f'<meta http-equiv="refresh" content="0;url={mailto_link}">', unsafe_allow_html=True)
+                    st.success("📧 Opening email client...")
+
+shame_john()
 
 st.markdown("---")
 
 # ==================== KEY METRICS ROW ====================
-st.markdown("### 📊 Real-Time Metrics")
-col1, col2, col3, col4, col5 = st.columns(5)
+@st.fragment(run_every=LIVE_SECONDS)
+def key_metrics():
+    """Today's totals - and, while there are none, the notice standing in for today's sections"""
+    today, df_today, rollup = stats()
+    staff_list = staff()
+    st.markdown("### 📊 Real-Time Metrics")
+    col1, col2, col3, col4, col5 = st.columns(5)
 
-with col1:
-    total_today = len(df_today)
-    st.metric("📬 Requests Today", total_today, delta="+0" if total_today == 0 else f"+{len(df_today.tail(1))}")
+    with col1:
+        total_today = len(df_today)
+        st.metric("📬 Requests Today", total_today, delta="+0" if total_today == 0 else f"+{len(df_today.tail(1))}")
 
-with col2:
-    active_staff = df_today[df_today['Assigned To'] != 'completed']['Assigned To'].nunique()
-    st.metric("👥 Staff Active", active_staff, delta=f"{len(staff_list)} total")
+    with col2:
+        active_staff = df_today[df_today['Assigned To'] != 'completed']['Assigned To'].nunique()
+        st.metric("👥 Staff Active", active_staff, delta=f"{len(staff_list)} total")
 
-with col3:
-    completed = len(df_today[df_today['Assigned To'] == 'completed'])
-    st.metric("✅ Completed", completed, delta=f"{(completed/total_today*100):.0f}%" if total_today > 0 else "0%")
+    with col3:
+        completed = len(df_today[df_today['Assigned To'] == 'completed'])
+        st.metric("✅ Completed", completed, delta=f"{(completed/total_today*100):.0f}%" if total_today > 0 else "0%")
 
-with col4:
-    avg_per_staff = total_today / len(staff_list) if len(staff_list) > 0 else 0
-    st.metric("⚖️ Avg per Staff", f"{avg_per_staff:.1f}", delta="Balanced")
-
-with col5:
-    if not df_today.empty:
-        last_action = df_today['DateTime'].max()
-        mins_ago = int((datetime.now() - last_action).total_seconds() / 60)
-        st.metric("🕐 Last Activity", f"{mins_ago}m ago" if mins_ago > 0 else "Just now")
-    else:
-        st.metric("🕐 Last Activity", "N/A")
+    with col4:
+        avg_per_staff = total_today / len(staff_list) if len(staff_list) > 0 else 0
+        st.metric("⚖️ Avg per Staff", f"{avg_per_staff:.1f}", delta="Balanced")
 
-st.markdown("---")
+    with col5:
+        if not df_today.empty:
+            # A clock time, not "Xm ago" - the page only reruns when there is new data
+            last_action = df_today['DateTime'].max()
+            st.metric("🕐 Last Activity", last_action.strftime('%H:%M') if pd.notna(last_action) else "N/A")
+        else:
+            st.metric("🕐 Last Activity", "N/A")
+
+    st.markdown("---")
+    if df_today.empty:
+        # Today's sections below stay empty until the first request
+        st.info("📭 **No requests processed today yet.** System is monitoring and ready!")
+
+key_metrics()
 
 # ==================== MAIN CONTENT ====================
-if not df_today.empty:
-    # Row 1: Charts
-    col1, col2 = st.columns([2, 1])
-    
-    with col1:
-        st.markdown("### 📈 Workload Distribution")
+# Each section draws nothing while there are no rows today (key_metrics says so)
+def workload_figure(today_assignments):
+    """Today's assignments per staff member as horizontal bars, a colour each"""
+    # Get assignment counts (excluding staff replies)
+    assignment_data = today_assignments.reset_index()
+    assignment_data.columns = ['Staff', 'Assignments']
         
-        # Get assignment counts (excluding staff replies)
-        assignment_data = df_today[df_today['Assigned To'] != 'completed']['Assigned To'].value_counts().reset_index()
-        assignment_data.columns = ['Staff', 'Assignments']
+    # Unique colors for each staff member (vibrant and distinct)
+    staff_colors = {
+        'brian.shaw@sa.gov.au': '#667eea',           # Purple
+        'jason.quinn2@sa.gov.au': '#f093fb',         # Pink (Manager)
+        'john.drousas@sa.gov.au': '#ff6b6b',         # Red
+        'betty.spaghetti@sa.gov.au': '#feca57',      # Yellow
+        'chuck.norris@sa.gov.au': '#48dbfb',         # Cyan
+        'diana.wonderwoman@sa.gov.au': '#ff9ff3',    # Hot Pink
+        'tony.baloney@sa.gov.au': '#54a0ff',         # Blue
+        'frank.beans@sa.gov.au': '#00d2d3',          # Teal
+        'stella.artois@sa.gov.au': '#5f27cd',        # Deep Purple
+        'max.power@sa.gov.au': '#ee5a6f'             # Coral
+    }
         
-        # Unique colors for each staff member (vibrant and distinct)
-        staff_colors = {
-            'brian.shaw@sa.gov.au': '#667eea',           # Purple
-            'jason.quinn2@sa.gov.au': '#f093fb',         # Pink (Manager)
-            'john.drousas@sa.gov.au': '#ff6b6b',         # Red
-            'betty.spaghetti@sa.gov.au': '#feca57',      # Yellow
-            'chuck.norris@sa.gov.au': '#48dbfb',         # Cyan
-            'diana.wonderwoman@sa.gov.au': '#ff9ff3',    # Hot Pink
-            'tony.baloney@sa.gov.au': '#54a0ff',         # Blue
-            'frank.beans@sa.gov.au': '#00d2d3',          # Teal
-            'stella.artois@sa.gov.au': '#5f27cd',        # Deep Purple
-            'max.power@sa.gov.au': '#ee5a6f'             # Coral
-        }
-        
-        # Map colors to staff in the data (fallback to cycling through colors)
-        vibrant_colors = ['#667eea', '#f093fb', '#ff6b6b', '#feca57', '#48dbfb', 
-                          '#ff9ff3', '#54a0ff', '#00d2d3', '#5f27cd', '#ee5a6f']
-        colors = []
-        for i, email in enumerate(assignment_data['Staff']):
-            if email in staff_colors:
-                colors.append(staff_colors[email])
-            else:
-                colors.append(vibrant_colors[i % len(vibrant_colors)])
+    # Map colors to staff in the data (fallback to cycling through colors)
+    vibrant_colors = ['#667eea', '#f093fb', '#ff6b6b', '#feca57', '#48dbfb', 
+                      '#ff9ff3', '#54a0ff', '#00d2d3', '#5f27cd', '#ee5a6f']
+    colors = []
+    for i, email in enumerate(assignment_data['Staff']):
+        if email in staff_colors:
+            colors.append(staff_colors[email])
+        else:
+            colors.append(vibrant_colors[i % len(vibrant_colors)])
         
-        # Create horizontal bar chart with unique colors
-        fig = go.Figure()
-        fig.add_trace(go.Bar(
-            y=assignment_data['Staff'],
-            x=assignment_data['Assignments'],
-            orientation='h',
-            marker=dict(
-                color=colors,
-                line=dict(color='rgba(255, 255, 255, 0.2)', width=1)
-            ),
-            text=assignment_data['Assignments'],
-            textposition='auto',
-        ))
+    # Create horizontal bar chart with unique colors
+    fig = go.Figure()
+    fig.add_trace(go.Bar(
+        y=assignment_data['Staff'],
+        x=assignment_data['Assignments'],
+        orientation='h',
+        marker=dict(
+            color=colors,
+            line=dict(color='rgba(255, 255, 255, 0.2)', width=1)
+        ),
+        text=assignment_data['Assignments'],
+        textposition='auto',
+    ))
         
-        fig.update_layout(
-            plot_bgcolor='rgba(0,0,0,0)',
-            paper_bgcolor='rgba(0,0,0,0)',
-            font=dict(color=chart_text_color),
-            xaxis=dict(
-                showgrid=True, 
-                gridcolor=chart_grid_color,
-                tickfont=dict(color=chart_text_color)
-            ),
-            yaxis=dict(
-                showgrid=False,
-                tickfont=dict(color=chart_text_color)
-            ),
-            margin=dict(l=0, r=0, t=0, b=0),
-            height=300
-        )
+    fig.update_layout(
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)',
+        font=dict(color=chart_text_color),
+        xaxis=dict(
+            showgrid=True, 
+            gridcolor=chart_grid_color,
+            tickfont=dict(color=chart_text_color)
+        ),
+        yaxis=dict(
+            showgrid=False,
+            tickfont=dict(color=chart_text_color)
+        ),
+        margin=dict(l=0, r=0, t=0, b=0),
+        height=300
+    )
         
-        # Debug theme (temporary)
-        # st.write(f"Debug: Theme={st.session_state.theme}, TextColor={chart_text_color}")
+    # Debug theme (temporary)
+    # st.write(f"Debug: Theme={st.session_state.theme}, TextColor={chart_text_color}")
+    return fig
+
+@st.fragment(run_every=LIVE_SECONDS)
+def workload_distribution():
+    """Today's assignments per staff member"""
+    today, df_today, rollup = stats()
+    if df_today.empty:
+        return
+    st.markdown("### 📈 Workload Distribution")
+    fig = unless_changed('workload_distribution', STATS_FILES,
+                         lambda: workload_figure(todays_assignments(rollup, today)))
+    st.plotly_chart(fig, use_container_width=True, key="workload_distribution")
+
+@st.fragment(run_every=LIVE_SECONDS)
+def system_status():
+    """Round-robin state and today's balance - the only section roster_state.json changes"""
+    today, df_today, rollup = stats()
+    if df_today.empty:
+        return
+    roster_state = roster()
+    staff_list = staff()
+    st.markdown("### 🎯 System Status")
         
-        st.plotly_chart(fig, use_container_width=True, key="workload_distribution")
-    
-    with col2:
-        st.markdown("### 🎯 System Status")
+    # Calculate next in rotation
+    next_idx = roster_state.get('current_index', 0) % len(staff_list) if staff_list else 0
+    next_staff = staff_list[next_idx] if staff_list else "N/A"
+    total_processed = roster_state.get('total_processed', int(rollup.counts('Date', assigned_only=True).sum()))
         
-        # Calculate next in rotation
-        next_idx = roster_state.get('current_index', 0) % len(staff_list) if staff_list else 0
-        next_staff = staff_list[next_idx] if staff_list else "N/A"
-        total_processed = roster_state.get('total_processed', len(df[df['Assigned To'] != 'completed']))
+    st.markdown(f"""
+    <div class='glass-card'>
+        <h4 style='color: #667eea; margin-bottom: 1rem;'>🔄 Round-Robin State</h4>
+        <p style='font-size: 0.9rem; color: #a0aec0;'>Next Assignment:</p>
+        <p style='font-size: 1.2rem; font-weight: 600; color: #10b981;'>{next_staff.split('@')[0]}</p>
+        <hr style='border-color: rgba(255,255,255,0.1);'>
+        <p style='font-size: 0.9rem; color: #a0aec0;'>Total Processed:</p>
+        <p style='font-size: 1.5rem; font-weight: 700; color: #667eea;'>{total_processed}</p>
+    </div>
+    """, unsafe_allow_html=True)
         
+    # Fairness Check
+    today_assignments = todays_assignments(rollup, today)
+    if not today_assignments.empty:
+        balance_score = workload_balance(today_assignments)
+            
+        if balance_score > 80:
+            badge_class = "badge-success"
+            status_icon = "✅"
+        elif balance_score > 60:
+            badge_class = "badge-warning"
+            status_icon = "⚠️"
+        else:
+            badge_class = "badge-warning"
+            status_icon = "⚠️"
+            
         st.markdown(f"""
-        <div class='glass-card'>
-            <h4 style='color: #667eea; margin-bottom: 1rem;'>🔄 Round-Robin State</h4>
-            <p style='font-size: 0.9rem; color: #a0aec0;'>Next Assignment:</p>
-            <p style='font-size: 1.2rem; font-weight: 600; color: #10b981;'>{next_staff.split('@')[0]}</p>
-            <hr style='border-color: rgba(255,255,255,0.1);'>
-            <p style='font-size: 0.9rem; color: #a0aec0;'>Total Processed:</p>
-            <p style='font-size: 1.5rem; font-weight: 700; color: #667eea;'>{total_processed}</p>
+        <div class='glass-card' style='margin-top: 1rem;'>
+            <h4 style='color: #667eea;'>⚖️ Balance Score</h4>
+            <p style='font-size: 2rem; font-weight: 700;'>{status_icon} {balance_score:.0f}%</p>
+            <span class='status-badge {badge_class}'>
+                {['Unbalanced', 'Fair', 'Excellent'][int(balance_score/40)]}
+            </span>
         </div>
         """, unsafe_allow_html=True)
-        
-        # Fairness Check
-        if not assignment_data.empty:
-            max_load = assignment_data['Assignments'].max()
-            min_load = assignment_data['Assignments'].min()
-            balance_score = 100 - ((max_load - min_load) / max_load * 100) if max_load > 0 else 100
-            
-            if balance_score > 80:
-                badge_class = "badge-success"
-                status_icon = "✅"
-            elif balance_score > 60:
-                badge_class = "badge-warning"
-                status_icon = "⚠️"
-            else:
-                badge_class = "badge-warning"
-                status_icon = "⚠️"
-            
-            st.markdown(f"""
-            <div class='glass-card' style='margin-top: 1rem;'>
-                <h4 style='color: #667eea;'>⚖️ Balance Score</h4>
-                <p style='font-size: 2rem; font-weight: 700;'>{status_icon} {balance_score:.0f}%</p>
-                <span class='status-badge {badge_class}'>
-                    {['Unbalanced', 'Fair', 'Excellent'][int(balance_score/40)]}
-                </span>
-            </div>
-            """, unsafe_allow_html=True)
-    
-    # Row 2: Activity Timeline
-    # Hourly Activity section with info
-    col_hourly_title, col_hourly_info = st.columns([6, 1])
-    with col_hourly_title:
-        st.markdown("### 🕒 Hourly Activity Trend")
-    with col_hourly_info:
-        with st.expander("ℹ️ Info"):
-            st.caption("Shows when requests arrive throughout the day. Helps identify busy periods for staffing optimization.")
-    
-    # Group by hour
-    df_today['Hour'] = df_today['DateTime'].dt.hour
-    hourly_data = df_today.groupby('Hour').size().reset_index(name='Count')
+
+# Row 1: Charts
+col1, col2 = st.columns([2, 1])
+with col1:
+    workload_distribution()
+with col2:
+    system_status()
+
+# Row 2: Activity Timeline
+def hourly_figure(rollup, today):
+    """Requests per hour today as an area chart"""
+    # Requests by hour
+    hourly_data = rollup.counts('Hour', start=today, end=today).reset_index(name='Count')
     
     # Format hours as time (HH:00)
     hourly_data['Time'] = hourly_data['Hour'].apply(lambda x: f"{x:02d}:00")
@@ -828,10 +921,35 @@ if not df_today.empty:
         margin=dict(l=0, r=0, t=0, b=0),
         height=250
     )
+    return fig_timeline
+
+@st.fragment(run_every=LIVE_SECONDS)
+def hourly_activity():
+    """When requests arrive throughout the day"""
+    today, df_today, rollup = stats()
+    if df_today.empty:
+        return
+    col_hourly_title, col_hourly_info = st.columns([6, 1])
+    with col_hourly_title:
+        st.markdown("### 🕒 Hourly Activity Trend")
+    with col_hourly_info:
+        with st.expander("ℹ️ Info"):
+            st.caption("Shows when requests arrive throughout the day. Helps identify busy periods for staffing optimization.")
     
+    fig_timeline = unless_changed('hourly_timeline', STATS_FILES, lambda: hourly_figure(rollup, today))
     st.plotly_chart(fig_timeline, use_container_width=True, key="hourly_timeline")
-    
-    # ==================== WEEK-OVER-WEEK COMPARISON ====================
+
+hourly_activity()
+
+# ==================== WEEK-OVER-WEEK COMPARISON ====================
+@st.fragment(run_every=LIVE_SECONDS)
+def week_over_week():
+    """Last 7 days vs the 7 before"""
+    today, df_today, rollup = stats()
+    if df_today.empty:
+        return
+    last_7_days = pd.date_range(end=today, periods=7)
+    prev_7_days = last_7_days - pd.Timedelta(days=7)
     col_wow_title, col_wow_info = st.columns([6, 1])
     with col_wow_title:
         st.markdown("### 📊 Week-over-Week Performance")
@@ -844,15 +962,12 @@ if not df_today.empty:
     last_week_start = (datetime.now() - timedelta(days=datetime.now().weekday() + 7)).strftime('%Y-%m-%d')
     last_week_end = (datetime.now() - timedelta(days=datetime.now().weekday() + 1)).strftime('%Y-%m-%d')
     
-    # Get last 7 days for proper week comparison
-    last_7_days = [(datetime.now() - timedelta(days=i)).strftime('%Y-%m-%d') for i in range(6, -1, -1)]
-    prev_7_days = [(datetime.now() - timedelta(days=i+7)).strftime('%Y-%m-%d') for i in range(6, -1, -1)]
-    
-    this_week_df = df[df['Date'].isin(last_7_days)]
-    last_week_df = df[df['Date'].isin(prev_7_days)]
+    # Last 7 days vs the 7 before, per assignee ('completed' = staff replies)
+    this_week_staff = rollup.counts('Assigned To', start=last_7_days[0], end=last_7_days[-1])
+    last_week_staff = rollup.counts('Assigned To', start=prev_7_days[0], end=prev_7_days[-1])
     
-    this_week_count = len(this_week_df)
-    last_week_count = len(last_week_df)
+    this_week_count = int(this_week_staff.sum())
+    last_week_count = int(last_week_staff.sum())
     
     # Calculate changes
     volume_change = ((this_week_count - last_week_count) / last_week_count * 100) if last_week_count > 0 else 0
@@ -868,10 +983,10 @@ if not df_today.empty:
         )
     
     # Calculate completion metrics
-    this_week_completed = len(this_week_df[this_week_df['Assigned To'] == 'completed'])
-    this_week_requests = len(this_week_df[this_week_df['Assigned To'] != 'completed'])
-    last_week_completed = len(last_week_df[last_week_df['Assigned To'] == 'completed'])
-    last_week_requests = len(last_week_df[last_week_df['Assigned To'] != 'completed'])
+    this_week_completed = int(this_week_staff.get('completed', 0))
+    this_week_requests = this_week_count - this_week_completed
+    last_week_completed = int(last_week_staff.get('completed', 0))
+    last_week_requests = last_week_count - last_week_completed
     
     completion_rate_this = (this_week_completed / this_week_requests * 100) if this_week_requests > 0 else 0
     completion_rate_last = (last_week_completed / last_week_requests * 100) if last_week_requests > 0 else 0
@@ -903,66 +1018,82 @@ if not df_today.empty:
         else:
             trend = "➡️ Stable"
         st.metric("Trend", trend)
-    
-    # ==================== PEAK HOURS HEATMAP ====================
-    col_heat_title, col_heat_info = st.columns([6, 1])
-    with col_heat_title:
-        st.markdown("### 🔥 Peak Hours Heatmap")
-        st.caption("*Identify busiest times to optimize staffing*")
-    with col_heat_info:
-        with st.expander("ℹ️ Info"):
-            st.caption("Visual heatmap showing request volume by day and time. Darker = busier. Use this to plan staffing levels.")
+
+week_over_week()
+
+# ==================== PEAK HOURS HEATMAP ====================
+def heatmap_figure(rollup, today):
+    """Requests by weekday and hour over the last 7 days: the heatmap and its counts (None if there are none)"""
+    last_7_days = pd.date_range(end=today, periods=7)
     
     # Prepare data for heatmap (last 7 days)
-    df_heatmap = df[df['Date'].isin(last_7_days)].copy()
+    df_heatmap = rollup.counts(['Date', 'Hour'], start=last_7_days[0], end=last_7_days[-1]).reset_index(name='Count')
+    if len(df_heatmap) == 0:
+        return None
     
-    if len(df_heatmap) > 0:
-        df_heatmap['Hour'] = df_heatmap['DateTime'].dt.hour
-        df_heatmap['DayOfWeek'] = df_heatmap['DateTime'].dt.day_name()
+    df_heatmap['DayOfWeek'] = df_heatmap['Date'].dt.day_name()
         
-        # Create pivot table for heatmap
-        heatmap_data = df_heatmap.groupby(['DayOfWeek', 'Hour']).size().reset_index(name='Count')
+    # Create pivot table for heatmap
+    heatmap_data = df_heatmap.groupby(['DayOfWeek', 'Hour'])['Count'].sum().reset_index()
         
-        # Pivot for heatmap
-        heatmap_pivot = heatmap_data.pivot(index='Hour', columns='DayOfWeek', values='Count').fillna(0)
+    # Pivot for heatmap
+    heatmap_pivot = heatmap_data.pivot(index='Hour', columns='DayOfWeek', values='Count').fillna(0)
         
-        # Reorder columns to weekday order
-        day_order = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
-        heatmap_pivot = heatmap_pivot.reindex(columns=[d for d in day_order if d in heatmap_pivot.columns])
+    # Reorder columns to weekday order
+    day_order = ['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday']
+    heatmap_pivot = heatmap_pivot.reindex(columns=[d for d in day_order if d in heatmap_pivot.columns])
         
-        # Format y-axis as time (HH:00)
-        time_labels = [f"{int(h):02d}:00" for h in heatmap_pivot.index]
+    # Format y-axis as time (HH:00)
+    time_labels = [f"{int(h):02d}:00" for h in heatmap_pivot.index]
         
-        # Create heatmap
-        fig_heatmap = go.Figure(data=go.Heatmap(
-            z=heatmap_pivot.values,
-            x=heatmap_pivot.columns,
-            y=time_labels,
-            colorscale='Viridis',
-            text=heatmap_pivot.values,
-            texttemplate='%{text}',
-            textfont={"size": 10},
-            colorbar=dict(title="Requests"),
-            hovertemplate='<b>%{x}</b><br>Time: %{y}<br>Requests: %{text}<extra></extra>'
-        ))
-        
-        fig_heatmap.update_layout(
-            plot_bgcolor='rgba(0,0,0,0)',
-            paper_bgcolor='rgba(0,0,0,0)',
-            font=dict(color=chart_text_color),
-            xaxis=dict(
-                title=dict(text="Day of Week", font=dict(color=chart_text_color)),
-                side="bottom",
-                tickfont=dict(color=chart_text_color)
-            ),
-            yaxis=dict(
-                title=dict(text="Time of Day", font=dict(color=chart_text_color)),
-                tickfont=dict(color=chart_text_color)
-            ),
-            margin=dict(l=0, r=0, t=0, b=0),
-            height=400
-        )
+    # Create heatmap
+    fig_heatmap = go.Figure(data=go.Heatmap(
+        z=heatmap_pivot.values,
+        x=heatmap_pivot.columns,
+        y=time_labels,
+        colorscale='Viridis',
+        text=heatmap_pivot.values,
+        texttemplate='%{text}',
+        textfont={"size": 10},
+        colorbar=dict(title="Requests"),
+        hovertemplate='<b>%{x}</b><br>Time: %{y}<br>Requests: %{text}<extra></extra>'
+    ))
         
+    fig_heatmap.update_layout(
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)',
+        font=dict(color=chart_text_color),
+        xaxis=dict(
+            title=dict(text="Day of Week", font=dict(color=chart_text_color)),
+            side="bottom",
+            tickfont=dict(color=chart_text_color)
+        ),
+        yaxis=dict(
+            title=dict(text="Time of Day", font=dict(color=chart_text_color)),
+            tickfont=dict(color=chart_text_color)
+        ),
+        margin=dict(l=0, r=0, t=0, b=0),
+        height=400
+    )
+    return fig_heatmap, heatmap_data
+
+@st.fragment(run_every=LIVE_SECONDS)
+def peak_hours_heatmap():
+    """Identify busiest times to optimize staffing"""
+    today, df_today, rollup = stats()
+    if df_today.empty:
+        return
+    col_heat_title, col_heat_info = st.columns([6, 1])
+    with col_heat_title:
+        st.markdown("### 🔥 Peak Hours Heatmap")
+        st.caption("*Identify busiest times to optimize staffing*")
+    with col_heat_info:
+        with st.expander("ℹ️ Info"):
+            st.caption("Visual heatmap showing request volume by day and time. Darker = busier. Use this to plan staffing levels.")
+    
+    heatmap = unless_changed('activity_heatmap', STATS_FILES, lambda: heatmap_figure(rollup, today))
+    if heatmap is not None:
+        fig_heatmap, heatmap_data = heatmap
         st.plotly_chart(fig_heatmap, use_container_width=True, key="activity_heatmap")
         
         # Find peak hour
@@ -972,56 +1103,78 @@ if not df_today.empty:
             st.info(f"🔥 **Peak Time:** {peak_row['DayOfWeek']} at {peak_time} ({int(peak_row['Count'])} requests)")
     else:
         st.info("Not enough data yet for heatmap analysis. Need at least 1 week of activity.")
-    
-    # Row 3: Recent Activity Feed
-    col1, col2 = st.columns([2, 1])
-    
-    with col1:
-        st.markdown("### 📜 Live Activity Feed")
+
+peak_hours_heatmap()
+
+# Row 3: Recent Activity Feed
+@st.fragment(run_every=LIVE_SECONDS)
+def activity_feed():
+    """Today's last 10 activities, newest first"""
+    today, df_today, rollup = stats()
+    if df_today.empty:
+        return
+    st.markdown("### 📜 Live Activity Feed")
         
-        # Show last 10 activities
-        recent = df_today.sort_values('DateTime', ascending=False).head(10)
+    # Show last 10 activities
+    recent = df_today.sort_values('DateTime', ascending=False).head(10)
         
-        for _, row in recent.iterrows():
-            time_str = row['DateTime'].strftime('%H:%M:%S')
-            subject_short = row['Subject'][:60] + "..." if len(row['Subject']) > 60 else row['Subject']
-            assigned = row['Assigned To']
+    for _, row in recent.iterrows():
+        time_str = row['DateTime'].strftime('%H:%M:%S')
+        subject_short = row['Subject'][:60] + "..." if len(row['Subject']) > 60 else row['Subject']
+        assigned = row['Assigned To']
             
-            if assigned == 'completed':
-                icon = "✅"
-                color = "#10b981"
-                label_text = "Completed"
-            else:
-                icon = "📨"
-                color = "#3b82f6"
-                label_text = assigned.split('@')[0]
+        if assigned == 'completed':
+            icon = "✅"
+            color = "#10b981"
+            label_text = "Completed"
+        else:
+            icon = "📨"
+            color = "#3b82f6"
+            label_text = assigned.split('@')[0]
             
-            # Use columns for better layout (avoids HTML escaping issues)
-            with st.container():
-                col_feed1, col_feed2 = st.columns([4, 1])
-                with col_feed1:
-                    st.markdown(f"{icon} **:blue[{label_text}]**")
-                    st.caption(subject_short)
-                with col_feed2:
-                    st.caption(time_str)
-    
-    with col2:
-        st.markdown("### 🏆 Staff Leaderboard")
+        # Use columns for better layout (avoids HTML escaping issues)
+        with st.container():
+            col_feed1, col_feed2 = st.columns([4, 1])
+            with col_feed1:
+                st.markdown(f"{icon} **:blue[{label_text}]**")
+                st.caption(subject_short)
+            with col_feed2:
+                st.caption(time_str)
+
+@st.fragment(run_every=LIVE_SECONDS)
+def staff_leaderboard():
+    """Today's top 5 by assignments"""
+    today, df_today, rollup = stats()
+    if df_today.empty:
+        return
+    st.markdown("### 🏆 Staff Leaderboard")
         
-        leaderboard_data = df_today[df_today['Assigned To'] != 'completed']['Assigned To'].value_counts().head(5)
+    leaderboard_data = todays_assignments(rollup, today).head(5)
         
-        medals = ["🥇", "🥈", "🥉", "4️⃣", "5️⃣"]
-        for idx, (staff, count) in enumerate(leaderboard_data.items()):
-            staff_name = staff.split('@')[0]
+    medals = ["🥇", "🥈", "🥉", "4️⃣", "5️⃣"]
+    for idx, (staff, count) in enumerate(leaderboard_data.items()):
+        staff_name = staff.split('@')[0]
             
-            with st.container():
-                col_lb1, col_lb2 = st.columns([3, 1])
-                with col_lb1:
-                    st.markdown(f"{medals[idx]} **{staff_name}**")
-                with col_lb2:
-                    st.markdown(f"**:violet[{count}]**")
-    
-    # Row 4: Full Audit Log
+        with st.container():
+            col_lb1, col_lb2 = st.columns([3, 1])
+            with col_lb1:
+                st.markdown(f"{medals[idx]} **{staff_name}**")
+            with col_lb2:
+                st.markdown(f"**:violet[{count}]**")
+
+col1, col2 = st.columns([2, 1])
+with col1:
+    activity_feed()
+with col2:
+    staff_leaderboard()
+
+# Row 4: Full Audit Log
+@st.fragment(run_every=LIVE_SECONDS)
+def audit_log():
+    """All of today's rows, newest first"""
+    today, df_today, rollup = stats()
+    if df_today.empty:
+        return
     st.markdown("### 📋 Complete Audit Log")
     
     # Format dataframe for display
@@ -1033,31 +1186,100 @@ if not df_today.empty:
         use_container_width=True,
         height=300
     )
+
+audit_log()
+
+# ==================== STAFF KPI SECTION ====================
+def staff_hourly_figure(hourly_counts):
+    """One staff member's requests per hour today as bars"""
+    hourly_counts = hourly_counts.reset_index(name='Count')
+    
+    fig_staff_hourly = go.Figure()
+    fig_staff_hourly.add_trace(go.Bar(
+        x=hourly_counts['Hour'],
+        y=hourly_counts['Count'],
+        marker=dict(
+            color=hourly_counts['Count'],
+            colorscale='Purples',
+            line=dict(color='rgba(255, 255, 255, 0.2)', width=1)
+        ),
+        text=hourly_counts['Count'],
+        textposition='auto',
+    ))
     
-    # ==================== STAFF KPI SECTION ====================
+    fig_staff_hourly.update_layout(
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)',
+        font=dict(color=chart_text_color, size=10),
+        xaxis=dict(showgrid=False, title=dict(text="Hour", font=dict(color=chart_text_color))),
+        yaxis=dict(showgrid=True, gridcolor=chart_grid_color, title=dict(text="Requests", font=dict(color=chart_text_color))),
+        margin=dict(l=0, r=0, t=0, b=0),
+        height=200
+    )
+    return fig_staff_hourly
+
+def staff_weekly_figure(daily_counts):
+    """One staff member's requests per day over the last 7 days (missing days filled with 0)"""
+    daily_counts_full = daily_counts.rename_axis('Date').reset_index(name='Count')
+    
+    fig_staff_weekly = go.Figure()
+    fig_staff_weekly.add_trace(go.Scatter(
+        x=daily_counts_full['Date'],
+        y=daily_counts_full['Count'],
+        mode='lines+markers',
+        fill='tozeroy',
+        line=dict(color='#667eea', width=2),
+        marker=dict(size=6, color='#764ba2'),
+        fillcolor='rgba(102, 126, 234, 0.2)'
+    ))
+    
+    fig_staff_weekly.update_layout(
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)',
+        font=dict(color=chart_text_color, size=10),
+        xaxis=dict(showgrid=False, title=dict(text="Date", font=dict(color=chart_text_color))),
+        yaxis=dict(showgrid=True, gridcolor=chart_grid_color, title=dict(text="Requests", font=dict(color=chart_text_color))),
+        margin=dict(l=0, r=0, t=0, b=0),
+        height=200
+    )
+    return fig_staff_weekly
+
+@st.fragment(run_every=LIVE_SECONDS)
+def staff_performance():
+    """A collapsed KPI panel per staff member"""
+    today, df_today, rollup = stats()
+    if df_today.empty:
+        return
+    staff_list = staff()
+    today_assignments = todays_assignments(rollup, today)
+    last_7_days = pd.date_range(end=today, periods=7)
     st.markdown("---")
     st.markdown("### 👥 Individual Staff Performance Dashboard")
     
     # Get all staff members (excluding COMPLETED)
     all_staff = set(staff_list)
-    assigned_staff = set(df_today[df_today['Assigned To'] != 'completed']['Assigned To'].unique())
+    assigned_staff = set(today_assignments.index)
     all_staff.update(assigned_staff)
     
     # Explicitly remove COMPLETED if it somehow got included
     all_staff.discard('completed')
     all_staff.discard('staff-reply')
     
+    # Per-staff counts: all time, per day this week, per hour today
+    staff_totals = rollup.counts('Assigned To')
+    staff_daily = rollup.counts(['Assigned To', 'Date'], start=last_7_days[0], end=last_7_days[-1])
+    staff_hourly_today = rollup.counts(['Assigned To', 'Hour'], start=today, end=today)
+    
     # Calculate KPIs for each staff member
     for staff_email in sorted(all_staff):
         staff_name = staff_email.split('@')[0].title().replace('.', ' ')
         
         # Filter data for this staff member
         staff_data_today = df_today[df_today['Assigned To'] == staff_email]
-        staff_data_all = df[df['Assigned To'] == staff_email]
         
         # Calculate metrics
         total_today = len(staff_data_today)
-        total_all_time = len(staff_data_all)
+        total_all_time = int(staff_totals.get(staff_email, 0))
         
         # Calculate completion-related metrics (approximation based on COMPLETED entries)
         # Note: Completions are tracked when staff replies, so we check for patterns
@@ -1073,9 +1295,8 @@ if not df_today.empty:
             avg_gap_mins = 0
         
         # 7-day trend
-        last_7_days = [(datetime.now() - timedelta(days=i)).strftime('%Y-%m-%d') for i in range(6, -1, -1)]
-        staff_7day = staff_data_all[staff_data_all['Date'].isin(last_7_days)]
-        weekly_total = len(staff_7day)
+        staff_7day = staff_daily.get(staff_email, pd.Series(0, index=last_7_days))
+        weekly_total = int(staff_7day.sum())
         daily_avg = weekly_total / 7
         
         # Create expandable section for each staff member (collapsed by default)
@@ -1107,7 +1328,7 @@ if not df_today.empty:
             
             with kpi4:
                 # Calculate workload percentage (vs average)
-                avg_per_staff_today = len(df_today[df_today['Assigned To'] != 'completed']) / len(staff_list) if len(staff_list) > 0 else 0
+                avg_per_staff_today = today_assignments.sum() / len(staff_list) if len(staff_list) > 0 else 0
                 workload_pct = (total_today / avg_per_staff_today * 100) if avg_per_staff_today > 0 else 100
                 
                 if workload_pct > 110:
@@ -1134,33 +1355,8 @@ if not df_today.empty:
                     # Hourly distribution for this staff member
                     st.markdown("**📅 Today's Hourly Distribution**")
                     if total_today > 0:
-                        staff_hourly = staff_data_today.copy()
-                        staff_hourly['Hour'] = staff_hourly['DateTime'].dt.hour
-                        hourly_counts = staff_hourly.groupby('Hour').size().reset_index(name='Count')
-                        
-                        fig_staff_hourly = go.Figure()
-                        fig_staff_hourly.add_trace(go.Bar(
-                            x=hourly_counts['Hour'],
-                            y=hourly_counts['Count'],
-                            marker=dict(
-                                color=hourly_counts['Count'],
-                                colorscale='Purples',
-                                line=dict(color='rgba(255, 255, 255, 0.2)', width=1)
-                            ),
-                            text=hourly_counts['Count'],
-                            textposition='auto',
-                        ))
-                        
-                        fig_staff_hourly.update_layout(
-                            plot_bgcolor='rgba(0,0,0,0)',
-                            paper_bgcolor='rgba(0,0,0,0)',
-                            font=dict(color=chart_text_color, size=10),
-                            xaxis=dict(showgrid=False, title=dict(text="Hour", font=dict(color=chart_text_color))),
-                            yaxis=dict(showgrid=True, gridcolor=chart_grid_color, title=dict(text="Requests", font=dict(color=chart_text_color))),
-                            margin=dict(l=0, r=0, t=0, b=0),
-                            height=200
-                        )
-                        
+                        fig_staff_hourly = unless_changed(f"staff_hourly_{staff_email}", STATS_FILES,
+                                                          lambda: staff_hourly_figure(staff_hourly_today.get(staff_email, pd.Series(dtype='int64', index=pd.Index([], name='Hour')))))
                         st.plotly_chart(fig_staff_hourly, use_container_width=True, key=f"staff_hourly_{staff_email}")
                     else:
                         st.info("No activity today")
@@ -1169,32 +1365,9 @@ if not df_today.empty:
                     # 7-day trend for this staff member
                     st.markdown("**📈 7-Day Trend**")
                     if weekly_total > 0:
-                        daily_counts = staff_7day.groupby('Date').size().reset_index(name='Count')
                         # Fill in missing days with 0
-                        daily_counts_full = pd.DataFrame({'Date': last_7_days})
-                        daily_counts_full = daily_counts_full.merge(daily_counts, on='Date', how='left').fillna(0)
-                        
-                        fig_staff_weekly = go.Figure()
-                        fig_staff_weekly.add_trace(go.Scatter(
-                            x=daily_counts_full['Date'],
-                            y=daily_counts_full['Count'],
-                            mode='lines+markers',
-                            fill='tozeroy',
-                            line=dict(color='#667eea', width=2),
-                            marker=dict(size=6, color='#764ba2'),
-                            fillcolor='rgba(102, 126, 234, 0.2)'
-                        ))
-                        
-                        fig_staff_weekly.update_layout(
-                            plot_bgcolor='rgba(0,0,0,0)',
-                            paper_bgcolor='rgba(0,0,0,0)',
-                            font=dict(color=chart_text_color, size=10),
-                            xaxis=dict(showgrid=False, title=dict(text="Date", font=dict(color=chart_text_color))),
-                            yaxis=dict(showgrid=True, gridcolor=chart_grid_color, title=dict(text="Requests", font=dict(color=chart_text_color))),
-                            margin=dict(l=0, r=0, t=0, b=0),
-                            height=200
-                        )
-                        
+                        fig_staff_weekly = unless_changed(f"staff_weekly_{staff_email}", STATS_FILES,
+                                                          lambda: staff_weekly_figure(staff_7day.reindex(last_7_days, fill_value=0)))
                         st.plotly_chart(fig_staff_weekly, use_container_width=True, key=f"staff_weekly_{staff_email}")
                     else:
                         st.info("No activity this week")
@@ -1210,126 +1383,140 @@ if not df_today.empty:
             else:
                 st.info(f"💤 **{staff_name}** hasn't received any assignments yet today.")
 
-else:
-    st.info("📭 **No requests processed today yet.** System is monitoring and ready!")
+staff_performance()
 
 # ==================== HISTORICAL TRENDS (7 DAYS) ====================
 st.markdown("---")
-st.markdown("### 📅 7-Day Trend Analysis")
-
-# Get last 7 days
-last_7_days = [(datetime.now() - timedelta(days=i)).strftime('%Y-%m-%d') for i in range(6, -1, -1)]
-weekly_data = df[df['Date'].isin(last_7_days)].groupby('Date').size().reset_index(name='Count')
-
-fig_weekly = go.Figure()
-fig_weekly.add_trace(go.Bar(
-    x=weekly_data['Date'],
-    y=weekly_data['Count'],
-    marker=dict(
-        color=weekly_data['Count'],
-        colorscale='Plasma',
-        line=dict(color='rgba(255, 255, 255, 0.2)', width=1)
-    ),
-    text=weekly_data['Count'],
-    textposition='auto',
-))
-
-fig_weekly.update_layout(
-    plot_bgcolor='rgba(0,0,0,0)',
-    paper_bgcolor='rgba(0,0,0,0)',
-    font=dict(color=chart_text_color),
-    xaxis=dict(
-        showgrid=False, 
-        title=dict(text="Date", font=dict(color=chart_text_color)),
-        tickfont=dict(color=chart_text_color)
-    ),
-    yaxis=dict(
-        showgrid=True, 
-        gridcolor=chart_grid_color, 
-        title=dict(text="Requests", font=dict(color=chart_text_color)),
-        tickfont=dict(color=chart_text_color)
-    ),
-    margin=dict(l=0, r=0, t=0, b=0),
-    height=250
-)
 
-st.plotly_chart(fig_weekly, use_container_width=True, key="weekly_trend")
+def weekly_figure(rollup, today):
+    """Requests per day over the last 7 days as bars"""
+    # Requests per day, last 7 days
+    last_7_days = pd.date_range(end=today, periods=7)
+    weekly_data = rollup.counts('Date', start=last_7_days[0], end=last_7_days[-1]).reset_index(name='Count')
+
+    fig_weekly = go.Figure()
+    fig_weekly.add_trace(go.Bar(
+        x=weekly_data['Date'],
+        y=weekly_data['Count'],
+        marker=dict(
+            color=weekly_data['Count'],
+            colorscale='Plasma',
+            line=dict(color='rgba(255, 255, 255, 0.2)', width=1)
+        ),
+        text=weekly_data['Count'],
+        textposition='auto',
+    ))
+
+    fig_weekly.update_layout(
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)',
+        font=dict(color=chart_text_color),
+        xaxis=dict(
+            showgrid=False, 
+            title=dict(text="Date", font=dict(color=chart_text_color)),
+            tickfont=dict(color=chart_text_color)
+        ),
+        yaxis=dict(
+            showgrid=True, 
+            gridcolor=chart_grid_color, 
+            title=dict(text="Requests", font=dict(color=chart_text_color)),
+            tickfont=dict(color=chart_text_color)
+        ),
+        margin=dict(l=0, r=0, t=0, b=0),
+        height=250
+    )
+    return fig_weekly
+
+@st.fragment(run_every=LIVE_SECONDS)
+def weekly_trend():
+    """Requests per day over the last 7 days"""
+    today, df_today, rollup = stats()
+    st.markdown("### 📅 7-Day Trend Analysis")
+    fig_weekly = unless_changed('weekly_trend', STATS_FILES, lambda: weekly_figure(rollup, today))
+    st.plotly_chart(fig_weekly, use_container_width=True, key="weekly_trend")
+
+weekly_trend()
 
 # ==================== EXTERNAL REQUEST SOURCES ====================
 st.markdown("---")
-col_ext_title, col_ext_info = st.columns([6, 1])
-with col_ext_title:
-    st.markdown("### 📧 External Request Sources")
-    st.markdown("*Who is sending us requests?*")
-with col_ext_info:
-    with st.expander("ℹ️ Info"):
-        st.caption("Shows which external sources (hospitals, clinics, departments) send the most requests. Helps identify key partners and service demand.")
-
-# Check if Sender column exists
-if 'Sender' in df.columns:
-    # Clean sender data (exclude staff replies from sender analysis)
-    df_with_sender = df[(df['Sender'].notna()) & (df['Sender'] != 'unknown') & (df['Assigned To'] != 'completed')].copy()
-    df_today_sender = df_today[(df_today['Sender'].notna()) & (df_today['Sender'] != 'unknown') & (df_today['Assigned To'] != 'completed')].copy()
+
+def senders_figure(top_senders):
+    """Requests per sender as horizontal bars"""
+    fig_senders = go.Figure()
+    fig_senders.add_trace(go.Bar(
+        y=top_senders.index,
+        x=top_senders.values,
+        orientation='h',
+        marker=dict(
+            color=top_senders.values,
+            colorscale='Teal',
+            line=dict(color='rgba(255, 255, 255, 0.2)', width=1)
+        ),
+        text=top_senders.values,
+        textposition='auto',
+    ))
     
-    if len(df_with_sender) > 0:
+    fig_senders.update_layout(
+        plot_bgcolor='rgba(0,0,0,0)',
+        paper_bgcolor='rgba(0,0,0,0)',
+        font=dict(color=chart_text_color, size=10),
+        xaxis=dict(
+            showgrid=True, 
+            gridcolor=chart_grid_color, 
+            title=dict(text="Total Requests", font=dict(color=chart_text_color)),
+            tickfont=dict(color=chart_text_color)
+        ),
+        yaxis=dict(
+            showgrid=False,
+            tickfont=dict(color=chart_text_color)
+        ),
+        margin=dict(l=0, r=0, t=0, b=0),
+        height=350
+    )
+    return fig_senders
+
+@st.fragment(run_every=LIVE_SECONDS)
+def external_sources():
+    """Who is sending us requests?"""
+    today, df_today, rollup = stats()
+    col_ext_title, col_ext_info = st.columns([6, 1])
+    with col_ext_title:
+        st.markdown("### 📧 External Request Sources")
+        st.markdown("*Who is sending us requests?*")
+    with col_ext_info:
+        with st.expander("ℹ️ Info"):
+            st.caption("Shows which external sources (hospitals, clinics, departments) send the most requests. Helps identify key partners and service demand.")
+
+    # Requests per sender, all time (staff replies excluded from sender analysis;
+    # empty for CSVs from before senders were recorded)
+    sender_totals = rollup.counts('Sender', assigned_only=True).drop('unknown', errors='ignore')
+
+    if len(sender_totals) > 0:
         col_src1, col_src2 = st.columns(2)
-        
+    
         with col_src1:
             st.markdown("#### 📊 Top 10 Request Sources (All Time)")
-            
+        
             # Get top senders
-            top_senders = df_with_sender['Sender'].value_counts().head(10)
-            
-            fig_senders = go.Figure()
-            fig_senders.add_trace(go.Bar(
-                y=top_senders.index,
-                x=top_senders.values,
-                orientation='h',
-                marker=dict(
-                    color=top_senders.values,
-                    colorscale='Teal',
-                    line=dict(color='rgba(255, 255, 255, 0.2)', width=1)
-                ),
-                text=top_senders.values,
-                textposition='auto',
-            ))
-            
-            fig_senders.update_layout(
-                plot_bgcolor='rgba(0,0,0,0)',
-                paper_bgcolor='rgba(0,0,0,0)',
-                font=dict(color=chart_text_color, size=10),
-                xaxis=dict(
-                    showgrid=True, 
-                    gridcolor=chart_grid_color, 
-                    title=dict(text="Total Requests", font=dict(color=chart_text_color)),
-                    tickfont=dict(color=chart_text_color)
-                ),
-                yaxis=dict(
-                    showgrid=False,
-                    tickfont=dict(color=chart_text_color)
-                ),
-                margin=dict(l=0, r=0, t=0, b=0),
-                height=350
-            )
-            
-            st.plotly_chart(fig_senders, use_container_width=True, key="top_senders")
+            top_senders = sender_totals.sort_values(ascending=False).head(10)
         
+            fig_senders = unless_changed('top_senders', STATS_FILES, lambda: senders_figure(top_senders))
+            st.plotly_chart(fig_senders, use_container_width=True, key="top_senders")
+    
         with col_src2:
             st.markdown("#### � Sender Details")
-            
+        
             # Create sender summary
-            sender_summary = df_with_sender.groupby('Sender').agg({
-                'Date': 'count',
-                'DateTime': ['min', 'max']
-            }).reset_index()
-            
+            sender_summary = rollup.span('Sender', assigned_only=True).join(sender_totals, how='inner').reset_index()
+        
+            sender_summary = sender_summary[['Sender', 'Count', 'First', 'Last']]
             sender_summary.columns = ['Sender', 'Total Requests', 'First Request', 'Last Request']
             sender_summary = sender_summary.sort_values('Total Requests', ascending=False).head(10)
-            
+        
             # Format datetime columns
             sender_summary['First Request'] = pd.to_datetime(sender_summary['First Request']).dt.strftime('%Y-%m-%d')
             sender_summary['Last Request'] = pd.to_datetime(sender_summary['Last Request']).dt.strftime('%Y-%m-%d')
-            
+        
             st.dataframe(
                 sender_summary,
                 use_container_width=True,
@@ -1338,105 +1525,136 @@ if 'Sender' in df.columns:
     else:
         st.info("📭 No external sender data available yet. New requests will be tracked with sender information.")
 
+external_sources()
+
 # ==================== RAW DATA VIEWER ====================
 st.markdown("---")
-col_data_title, col_data_info = st.columns([6, 1])
-with col_data_title:
-    st.markdown("### 📂 Raw Data Viewer")
-    st.markdown("*Live view of underlying CSV data*")
-with col_data_info:
-    with st.expander("ℹ️ Info"):
-        st.caption("Shows the actual data being processed. All dashboard metrics are calculated from this data in real-time.")
-
-with st.expander("🔍 **Click to View Raw Data**", expanded=False):
-    # Data stats
-    col_stat1, col_stat2, col_stat3, col_stat4 = st.columns(4)
-    with col_stat1:
-        st.metric("Total Records", len(df))
-    with col_stat2:
-        st.metric("Assignments", len(df[df['Assigned To'] != 'completed']))
-    with col_stat3:
-        st.metric("Completions", len(df[df['Assigned To'] == 'completed']))
-    with col_stat4:
-        st.metric("Unique Staff", df[df['Assigned To'] != 'completed']['Assigned To'].nunique())
-    
-    st.markdown("---")
-    
-    # Filtering options
-    col_filter1, col_filter2, col_filter3 = st.columns(3)
-    
-    with col_filter1:
-        show_type = st.selectbox(
-            "Filter by Type",
-            ["All", "Assignments Only", "Completions Only"],
-            key="data_type_filter"
-        )
-    
-    with col_filter2:
-        date_options = ["All Dates"] + sorted(df['Date'].unique().tolist(), reverse=True)
-        selected_date = st.selectbox(
-            "Filter by Date",
-            date_options,
-            key="data_date_filter"
-        )
-    
-    with col_filter3:
-        staff_options = ["All Staff"] + sorted([s for s in df['Assigned To'].unique() if s != 'completed'])
-        selected_staff = st.selectbox(
-            "Filter by Staff",
-            staff_options,
-            key="data_staff_filter"
-        )
-    
-    # Apply filters
-    filtered_df = df.copy()
+
+def raw_data(show_type, selected_date, selected_staff):
+    """The rows the raw data viewer's filters select: as read, as displayed and as CSV"""
+    # Apply filters - the date one by reading only that day
+    if selected_date != "All Dates":
+        filtered_df = load_history(since=selected_date, until=selected_date, columns=RAW_COLUMNS)
+    else:
+        filtered_df = load_history(columns=RAW_COLUMNS)
     
     if show_type == "Assignments Only":
         filtered_df = filtered_df[filtered_df['Assigned To'] != 'completed']
     elif show_type == "Completions Only":
         filtered_df = filtered_df[filtered_df['Assigned To'] == 'completed']
     
-    if selected_date != "All Dates":
-        filtered_df = filtered_df[filtered_df['Date'] == selected_date]
-    
     if selected_staff != "All Staff":
         filtered_df = filtered_df[filtered_df['Assigned To'] == selected_staff]
     
-    # Display count after filtering
-    st.caption(f"Showing {len(filtered_df)} of {len(df)} records")
-    
     # Display the data
-    display_df = filtered_df[['Date', 'Time', 'Assigned To', 'Sender', 'Subject']].copy()
+    display_df = filtered_df[RAW_COLUMNS].copy()
     display_df = display_df.sort_values(['Date', 'Time'], ascending=[False, False])
+    display_df['Date'] = display_df['Date'].dt.strftime('%Y-%m-%d')
     
     # Truncate subject for display
     display_df['Subject'] = display_df['Subject'].apply(lambda x: x[:60] + "..." if len(str(x)) > 60 else x)
     
-    # Colour code rows
-    def highlight_completed(row):
-        if row['Assigned To'] == 'completed':
-            return ['background-color: rgba(16, 185, 129, 0.2)'] * len(row)
-        return [''] * len(row)
+    return filtered_df, display_df, filtered_df.to_csv(index=False).encode('utf-8')
+
+# Colour code rows
+def highlight_completed(frame):
+    """Completions in green - one vectorized pass, since the viewer redraws every few seconds"""
+    styles = pd.DataFrame('', index=frame.index, columns=frame.columns)
+    styles.loc[frame['Assigned To'] == 'completed', :] = 'background-color: rgba(16, 185, 129, 0.2)'
+    return styles
+
+@st.fragment(run_every=LIVE_SECONDS)
+def raw_data_viewer():
+    """Live view of underlying CSV data"""
+    today, df_today, rollup = stats()
+    day_counts = rollup.counts('Date')  # rows per day, all history
+    total_records = int(day_counts.sum())
+    col_data_title, col_data_info = st.columns([6, 1])
+    with col_data_title:
+        st.markdown("### 📂 Raw Data Viewer")
+        st.markdown("*Live view of underlying CSV data*")
+    with col_data_info:
+        with st.expander("ℹ️ Info"):
+            st.caption("Shows the actual data being processed. All dashboard metrics are calculated from this data in real-time.")
+
+    with st.expander("🔍 **Click to View Raw Data**", expanded=False):
+        # Data stats (from the rollup - no rows read)
+        total_completions = int(rollup.counts('Assigned To').get('completed', 0))
+        col_stat1, col_stat2, col_stat3, col_stat4 = st.columns(4)
+        with col_stat1:
+            st.metric("Total Records", total_records)
+        with col_stat2:
+            st.metric("Assignments", total_records - total_completions)
+        with col_stat3:
+            st.metric("Completions", total_completions)
+        with col_stat4:
+            st.metric("Unique Staff", len(rollup.counts('Assigned To', assigned_only=True)))
     
-    st.dataframe(
-        display_df.style.apply(highlight_completed, axis=1),
-        use_container_width=True,
-        height=400
-    )
+        st.markdown("---")
     
-    # CSV download
-    st.download_button(
-        label="📥 Download Filtered Data",
-        data=filtered_df.to_csv(index=False).encode('utf-8'),
-        file_name=f"transfer_data_filtered_{datetime.now().strftime('%Y%m%d_%H%M')}.csv",
-        mime="text/csv",
-        use_container_width=True
-    )
+        # Filtering options
+        col_filter1, col_filter2, col_filter3 = st.columns(3)
+    
+        with col_filter1:
+            show_type = st.selectbox(
+                "Filter by Type",
+                ["All", "Assignments Only", "Completions Only"],
+                key="data_type_filter"
+            )
+    
+        with col_filter2:
+            # Newest day first and selected - all history is only read for "All Dates"
+            date_options = ["All Dates"] + pd.DatetimeIndex(day_counts.index).sort_values(ascending=False).strftime('%Y-%m-%d').tolist()
+            selected_date = st.selectbox(
+                "Filter by Date",
+                date_options,
+                index=1 if len(date_options) > 1 else 0,
+                key="data_date_filter"
+            )
+    
+        with col_filter3:
+            staff_options = ["All Staff"] + sorted([s for s in rollup.counts('Assigned To').index if s != 'completed'])
+            selected_staff = st.selectbox(
+                "Filter by Staff",
+                staff_options,
+                key="data_staff_filter"
+            )
+    
+        filtered_df, display_df, filtered_csv = unless_changed('raw_data', STATS_FILES, raw_data, show_type, selected_date, selected_staff)
+        
+        # Display count after filtering
+        st.caption(f"Showing {len(filtered_df)} of {total_records} records")
+    
+        # Display the data
+        st.dataframe(
+            display_df.style.apply(highlight_completed, axis=None),
+            use_container_width=True,
+            height=400
+        )
+    
+        # CSV download
+        st.download_button(
+            label="📥 Download Filtered Data",
+            data=filtered_csv,
+            file_name=f"transfer_data_filtered_{datetime.now().strftime('%Y%m%d_%H%M')}.csv",
+            mime="text/csv",
+            use_container_width=True
+        )
+
+raw_data_viewer()
 
 # ==================== FOOTER ====================
+refresh_note = f"Updates as new data arrives (checked every {WATCH_SECONDS} seconds)" if LIVE_UPDATES else "Live updates off"
 st.markdown("---")
-st.markdown(f"""
-<div style='text-align: center; color: #718096; font-size: 0.85rem;'>
-    <p>🤖 Automated Transfer Bot v2.0 | Last refresh: {datetime.now().strftime('%H:%M:%S')} | Auto-refreshes every 5 seconds</p>
-</div>
-""", unsafe_allow_html=True)
\ No newline at end of file
+
+@st.fragment(run_every=LIVE_SECONDS)
+def footer():
+    """Version, when the data last changed and how the page keeps up"""
+    last_update = unless_changed('footer', STATS_FILES + ROSTER_FILES + STAFF_FILES, datetime.now)
+    st.markdown(f"""
+    <div style='text-align: center; color: #718096; font-size: 0.85rem;'>
+        <p>🤖 Automated Transfer Bot v2.0 | Last update: {last_update.strftime('%H:%M:%S')} | {refresh_note}</p>
+    </div>
+    """, unsafe_allow_html=True)
+
+footer()
\ No newline at end of file
@@ -0,0 +1,256 @@
+"""
+Dispatch Journal - Write-ahead log of every dispatch, with crash recovery
+
+Each message the bot dispatches goes through several stores and mailbox
+calls that can each be interrupted by a crash. The journal records every
+step, in order, so a restart can tell how far each dispatch got:
+
+- assigned        intent: who gets it, plus the roster position after the
+                  assignment - written (and synced) before anything else
+- watchdog-added  an urgent ticket went into the SLA watchdog, with the time
+                  its SLA started (sla_started) so recovery keeps the clock
+- forwarded       the forward was sent
+- archived        tagged, counted in the stats, moved - dispatch complete
+- rolled-back     recovery undid a dispatch that never got forwarded
+- rolled-forward  recovery handed a forwarded dispatch over to be archived
+
+Records are JSON lines, appended by a background thread and fsynced once
+per batch: whatever was recorded while the previous fsync ran goes out in
+the next write (group commit). sync(seq) waits until a record is on disk.
+checkpoint() saves the open dispatches plus the caller's state next to
+the journal and truncates it, so recovery only replays the records written
+since - restart time does not grow with the bot's history. A torn last
+line (crash mid-write) is ignored.
+"""
+
+import json
+import os
+import threading
+from datetime import datetime
+
+OPS = ("assigned", "watchdog-added", "forwarded", "archived", "rolled-back", "rolled-forward")
+CLOSING_OPS = ("archived", "rolled-back", "rolled-forward")
+
+
+class DispatchJournal:
+    """Append-only dispatch journal with batched fsync and checkpoints"""
+
+    def __init__(self, path, checkpoint_path=None, checkpoint_every=10_000, on_error=None):
+        self.path = path
+        self.checkpoint_path = checkpoint_path or path + ".checkpoint"
+        self.checkpoint_every = checkpoint_every  # records between checkpoints
+        self.on_error = on_error
+
+        self._lock = threading.Lock()        # guards the queue and sequence numbers
+        self._write_lock = threading.Lock()  # one batch written at a time
+        self._synced = threading.Condition(self._lock)
+        self._pending = []
+        self._seq = 0           # last sequence number handed out
+        self._durable = 0       # last sequence number on disk
+        self._since_checkpoint = 0
+        self._open = {}         # msg_id -> merged record of a dispatch not yet archived
+        self._file = None
+
+        self._wake = threading.Event()
+        self._stopping = False
+        self._thread = None
+
+    # ---------- recording ----------
+    def record(self, op, msg_id, **fields):
+        """Queue one record; returns its sequence number (see sync())"""
+        if op not in OPS:
+            raise ValueError(f"op must be one of {OPS}, got {op!r}")
+        with self._lock:
+            self._seq += 1
+            entry = {"seq": self._seq, "op": op, "msg_id": msg_id, "at": datetime.now().isoformat(), **fields}
+            self._pending.append(entry)
+            self._apply(entry)
+            first = len(self._pending) == 1
+
+        if self._thread is None:
+            self.flush()  # no background writer running - write now
+        elif first:
+            self._wake.set()
+        return entry["seq"]
+
+    def sync(self, seq, timeout=None):
+        """Wait until record seq is on disk. False on timeout."""
+        with self._synced:
+            if self._durable < seq:
+                self._wake.set()
+            return self._synced.wait_for(lambda: self._durable >= seq, timeout)
+
+    def _apply(self, entry):
+        """Track which dispatches are still open (under _lock)"""
+        self._since_checkpoint += 1
+        op, msg_id = entry["op"], entry["msg_id"]
+        if op in CLOSING_OPS:
+            self._open.pop(msg_id, None)
+        elif op == "assigned":
+            self._open[msg_id] = {k: v for k, v in entry.items() if k not in ("seq", "op")}
+        elif msg_id in self._open:
+            self._open[msg_id][op] = entry["at"]
+            self._open[msg_id].update((k, v) for k, v in entry.items() if k not in ("seq", "op", "msg_id", "at"))
+
+    def open_dispatches(self):
+        """Copy of the dispatches not yet archived ({msg_id: record})"""
+        with self._lock:
+            return {msg_id: dict(r) for msg_id, r in self._open.items()}
+
+    def checkpoint_due(self):
+        return self._since_checkpoint >= self.checkpoint_every
+
+    # ---------- writing ----------
+    def _get_file(self):
+        if self._file is None:
+            self._file = open(self.path, "a", encoding="utf-8")
+        return self._file
+
+    def flush(self):
+        """Write and fsync all queued records now (one write, one fsync)"""
+        with self._write_lock:
+            with self._lock:
+                if not self._pending:
+                    return 0
+                batch, self._pending = self._pending, []
+            try:
+                f = self._get_file()
+                f.write("".join(json.dumps(e, ensure_ascii=False) + "\n" for e in batch))
+                f.flush()
+                os.fsync(f.fileno())
+            except Exception as e:
+                if self._file is not None:
+                    try:
+                        self._file.close()
+                    except Exception:
+                        pass
+                    self._file = None
+                with self._lock:  # keep the records for the next attempt
+                    self._pending[:0] = batch
+                self._error(f"Error writing dispatch journal: {e}")
+                return 0
+            with self._synced:
+                self._durable = batch[-1]["seq"]
+                self._synced.notify_all()
+            return len(batch)
+
+    def _run(self):
+        while not self._stopping:
+            self._wake.wait(1.0 if self._pending else None)  # retry a failed write every second
+            self._wake.clear()
+            while self.flush():
+                pass  # records queued during the fsync form the next batch
+
+    def start(self):
+        """Start the background batch writer"""
+        if self._thread is None:
+            self._stopping = False
+            self._thread = threading.Thread(target=self._run, name="journal-writer", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """Stop the background writer, write any queued records and close the journal"""
+        if self._thread is not None:
+            self._stopping = True
+            self._wake.set()
+            self._thread.join(timeout=5)
+            self._thread = None
+        self.flush()
+        with self._write_lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    # ---------- checkpoints ----------
+    def checkpoint(self, state=None):
+        """
+        Save the open dispatches and state (the caller's own, e.g. roster
+        position and stats file size - it must match everything recorded so
+        far), then truncate the journal.
+        """
+        with self._write_lock:
+            with self._lock:
+                batch, self._pending = self._pending, []  # covered by the checkpoint
+                snapshot = {
+                    "seq": self._seq,
+                    "at": datetime.now().isoformat(),
+                    "state": state or {},
+                    "open": {msg_id: dict(r) for msg_id, r in self._open.items()},
+                }
+            try:
+                f = self._get_file()
+                tmp = self.checkpoint_path + ".tmp"
+                with open(tmp, "w", encoding="utf-8") as ck:
+                    json.dump(snapshot, ck, ensure_ascii=False)
+                    ck.flush()
+                    os.fsync(ck.fileno())
+                os.replace(tmp, self.checkpoint_path)
+                f.seek(0)
+                f.truncate()
+                f.flush()
+                os.fsync(f.fileno())
+            except Exception as e:
+                with self._lock:  # still to be written to the journal
+                    self._pending[:0] = batch
+                self._error(f"Error writing journal checkpoint: {e}")
+                return False
+            with self._synced:
+                self._durable = max(self._durable, snapshot["seq"])
+                self._since_checkpoint = 0
+                self._synced.notify_all()
+            return True
+
+    # ---------- recovery ----------
+    def recover(self):
+        """
+        Load the last checkpoint and replay the journal written since.
+
+        Returns {"state": checkpoint state, "open": {msg_id: record} of
+        dispatches that never completed, "roster": roster position of the
+        newest assignment (or None), "archived": [archived records since the
+        checkpoint], "replayed": records read}. Call before start().
+        """
+        checkpoint = {}
+        try:
+            if os.path.exists(self.checkpoint_path):
+                with open(self.checkpoint_path, "r", encoding="utf-8") as f:
+                    checkpoint = json.load(f)
+        except Exception as e:
+            self._error(f"Error reading journal checkpoint (replaying the whole journal): {e}")
+
+        with self._lock:
+            base = self._seq = checkpoint.get("seq", 0)
+            self._open = checkpoint.get("open", {})
+            roster, archived, replayed = None, [], 0
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    for line in f:
+                        try:
+                            entry = json.loads(line)
+                        except ValueError:
+                            continue  # torn write
+                        if entry.get("seq", 0) <= base:
+                            continue  # already in the checkpoint
+                        self._seq = max(self._seq, entry["seq"])
+                        self._apply(entry)
+                        replayed += 1
+                        if entry["op"] == "assigned" and entry.get("roster"):
+                            roster = entry["roster"]
+                        elif entry["op"] == "archived":
+                            archived.append(entry)
+            except FileNotFoundError:
+                pass
+            except Exception as e:
+                self._error(f"Error replaying dispatch journal: {e}")
+            self._durable = self._seq
+            return {
+                "state": checkpoint.get("state", {}),
+                "open": {msg_id: dict(r) for msg_id, r in self._open.items()},
+                "roster": roster,
+                "archived": archived,
+                "replayed": replayed,
+            }
+
+    def _error(self, msg):
+        if self.on_error:
+            self.on_error(msg)
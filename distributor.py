@@ -14,372 +14,531 @@ import os
 import sys
 import time
 import json
-import csv
-import schedule
-from datetime import datetime, timedelta
-
-# Windows-specific imports (graceful fallback for Linux/Mac)
-try:
-    import win32com.client
-    OUTLOOK_AVAILABLE = True
-except ImportError:
-    OUTLOOK_AVAILABLE = False
+import re
+from collections import Counter, deque
+from datetime import datetime
+
+from activity_log import ActivityLog
+from bot_runtime import BotRuntime
+from dispatch_journal import DispatchJournal
+from escalation_outbox import EscalationOutbox
+from mail_session import OUTLOOK_AVAILABLE, MaildirSession, OutlookSession
+from message_index import MessageIndex
+from pipeline import StagedPipeline
+from risk_rules import DEFAULT_RULES, RulesWatcher, save_rules
+from risk_rules import detect_risk_many as classify_batch
+from roster import Roster
+from sla_watchdog import SlaWatchdog
+from smtp_pool import DebugSmtpServer, SmtpPool
+from stats_archive import ARROW_AVAILABLE, StatsArchive
+from stats_writer import StatsWriter, read_rows, stats_row
+
+# Outlook needs pywin32 (graceful fallback for Linux/Mac)
+if not OUTLOOK_AVAILABLE:
     print("⚠️ pywin32 not available - running in demo mode")
 
 # ==================== CONFIGURATION ====================
 CONFIG = {
+    "mail_source": "outlook",       # "outlook", or "maildir" (local Maildir at FILES["maildir"])
     "mailbox": "Health:HelpdeskSupportTeam",
     "manager": "manager@example.com",
     "sla_minutes": 20,
-    "check_interval_seconds": 60,
-    "processed_folder": "Done"
+    "check_interval_seconds": 60,   # inbox poll (fallback when push is on) and state flush
+    "sla_check_seconds": 30,        # safety-net SLA check - breaches fire the moment a deadline passes
+    "push_ingestion": True,         # process new mail as it arrives (polling stays as fallback)
+    "pipeline_workers": 4,          # threads per stage forwarding / archiving assigned mail
+    "journal_checkpoint_every": 10000,  # dispatch journal records between checkpoints
+    "journal_sync_seconds": 10,     # longest a forward waits for its journal record to reach disk
+    "smtp_host": None,              # escalation mail server; None: escalations.log only, "debug": local stand-in
+    "smtp_port": 25,
+    "smtp_user": None,
+    "smtp_password": None,
+    "smtp_starttls": False,
+    "smtp_from": "helpdesk-bot@example.com",
+    "smtp_pool_size": 4,            # SMTP connections kept open for escalations
+    "escalation_coalesce_seconds": 5,   # a manager's escalations within this window go out as one digest
+    "processed_folder": "Done",
+    "stats_batch_size": 50,         # write daily_stats.csv every N rows...
+    "stats_flush_seconds": 1.0,     # ...or N seconds after the first queued row
+    "stats_durability": "flush",    # "flush" (OS buffers) or "fsync" (on disk per batch)
+    "log_rotate": "daily",          # start a new bot_activity.log "daily", "hourly" or None...
+    "log_max_mb": 10,               # ...or when it passes this size
+    "log_backups": 14,              # rotated logs to keep (gzipped)
+    "log_json": False               # also write bot_activity.jsonl (one JSON object per line)
 }
 
 FILES = {
     "staff": "staff.txt",
+    "staff_aliases": "staff_aliases.txt",
     "state": "roster_state.json",
     "log": "daily_stats.csv",
-    "watchdog": "urgent_watchdog.json"
+    "stats_archive": "stats_archive",     # closed days of daily_stats.csv (Parquet, one folder per day)
+    "watchdog": "urgent_watchdog.db",
+    "watchdog_json": "urgent_watchdog.json",  # pre-SQLite watchdog, migrated on start
+    "dispatched": "dispatched_messages.db",
+    "journal": "dispatch_journal.log",
+    "escalations": "escalations.log",
+    "outbox": "escalation_outbox.db",
+    "rules": "risk_rules.json",
+    "rule_stats": "risk_rule_stats.json",
+    "activity_log": "bot_activity.log",
+    "activity_json": "bot_activity.jsonl",
+    "maildir": "maildir"
 }
 
-# ==================== SEMANTIC DICTIONARY ====================
-# Risk Detection: (Action + Context) OR (Urgency + Action) OR (High Importance)
-
-RISK_ACTIONS = [
-    "delete", "deletion", "remove", "unlink", "purge", "erase", "destroy",
-    "cancel", "void", "nullify", "terminate", 
-    "merge", "merging", "merged", "split", "splitting",
-    "combine", "duplicate", "dedupe", "dedup"
-]
-
-RISK_CONTEXT = [
-    "patient", "scan", "accession", "study", "exam", "report",
-    "imaging", "dicom", "mri", "ct", "ultrasound", "xray", "x-ray",
-    "record", "data", "file", "prior", "comparison"
-]
-
-URGENCY_WORDS = [
-    "stat", "asap", "urgent", "emergency", "critical", "immediate",
-    "now", "rush", "priority", "life-threatening", "code"
-]
-
 # ==================== LOGGING ====================
-def log(msg, level="INFO"):
-    """Timestamped logging"""
+# Log lines are queued and written (and rotated) by a background thread (activity_log.py)
+ACTIVITY_LOG = ActivityLog(
+    FILES["activity_log"],
+    json_path=FILES["activity_json"] if CONFIG["log_json"] else None,
+    max_bytes=CONFIG["log_max_mb"] * 1024 * 1024,
+    when=CONFIG["log_rotate"],
+    backups=CONFIG["log_backups"]
+)
+
+def log(msg, level="INFO", **fields):
+    """Timestamped logging (extra fields go to the JSON lines log only)"""
     timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
     symbol = {"INFO": "ℹ️", "WARN": "⚠️", "ERROR": "❌", "CRITICAL": "🚨", "SUCCESS": "✅"}.get(level, "📝")
     print(f"[{timestamp}] {symbol} {msg}")
     
     # Also append to log file
     try:
-        with open("bot_activity.log", "a", encoding="utf-8") as f:
-            f.write(f"[{timestamp}] [{level}] {msg}\n")
+        ACTIVITY_LOG.write(level, msg, **fields)
     except:
         pass
 
-# ==================== FILE OPERATIONS ====================
+# ==================== ROSTER ====================
+# Staff list and rotation index are held in memory: staff.txt is only re-read
+# when it changes, roster_state.json is written in the background (roster.py)
+ROSTER = Roster(FILES["staff"], FILES["state"], FILES["staff_aliases"], on_error=lambda msg: log(msg, "ERROR"))
+
 def get_staff_list():
-    """Load staff list from file"""
-    try:
-        if not os.path.exists(FILES["staff"]):
-            return []
-        with open(FILES["staff"], 'r') as f:
-            return [line.strip().lower() for line in f if line.strip() and not line.startswith('#')]
-    except Exception as e:
-        log(f"Error loading staff list: {e}", "ERROR")
-        return []
+    """Current staff list (cached until staff.txt changes)"""
+    return ROSTER.staff()
 
 def get_roster_state():
-    """Load roster state from JSON"""
-    try:
-        if os.path.exists(FILES["state"]):
-            with open(FILES["state"], 'r') as f:
-                return json.load(f)
-    except:
-        pass
-    return {"current_index": 0, "total_processed": 0}
-
-def save_roster_state(state):
-    """Save roster state to JSON"""
-    try:
-        with open(FILES["state"], 'w') as f:
-            json.dump(state, f, indent=4)
-    except Exception as e:
-        log(f"Error saving roster state: {e}", "ERROR")
+    """Current roster state"""
+    return ROSTER.state()
 
 def get_next_staff():
     """Get next staff member in rotation"""
-    staff = get_staff_list()
-    if not staff:
-        return None
-    
-    state = get_roster_state()
-    idx = state.get("current_index", 0)
-    
-    person = staff[idx % len(staff)]
-    
-    # Update state
-    state["current_index"] = idx + 1
-    state["total_processed"] = state.get("total_processed", 0) + 1
-    save_roster_state(state)
-    
-    return person
+    return ROSTER.next_staff()
+
+# ==================== FILE OPERATIONS ====================
+# Stats rows are queued and written to daily_stats.csv in batches (stats_writer.py)
+STATS = StatsWriter(
+    FILES["log"],
+    batch_size=CONFIG["stats_batch_size"],
+    flush_interval=CONFIG["stats_flush_seconds"],
+    durability=CONFIG["stats_durability"],
+    on_error=lambda msg: log(msg, "ERROR")
+)
 
 def append_stats(subject, assigned_to, sender="unknown", risk_level="normal"):
-    """Append entry to daily stats CSV"""
+    """Append entry to daily stats CSV (batched - see CONFIG stats_*). Returns the row."""
     try:
-        file_exists = os.path.isfile(FILES["log"])
-        with open(FILES["log"], 'a', newline='', encoding='utf-8') as f:
-            writer = csv.writer(f)
-            if not file_exists:
-                writer.writerow(['Date', 'Time', 'Subject', 'Assigned To', 'Sender', 'Risk Level'])
-            now = datetime.now()
-            writer.writerow([
-                now.strftime('%Y-%m-%d'),
-                now.strftime('%H:%M:%S'),
-                subject,
-                assigned_to,
-                sender,
-                risk_level
-            ])
+        row = stats_row(subject, assigned_to, sender, risk_level)
+        STATS.append_row(row)
+        return row
     except Exception as e:
         log(f"Error writing stats: {e}", "ERROR")
 
+# Closed days move from daily_stats.csv into a date-partitioned Parquet archive
+# once a day, so the live CSV only holds today (stats_archive.py)
+STATS_ARCHIVE = StatsArchive(FILES["stats_archive"], on_error=lambda msg: log(msg, "ERROR"))
+STATS_COMPACTION = {"day": None}  # day of the last successful compaction
+
+def compact_stats():
+    """Archive the closed days of daily_stats.csv, once a day (call while no dispatch is in flight)"""
+    today = datetime.now().date()
+    if not ARROW_AVAILABLE or STATS_COMPACTION["day"] == today:
+        return 0
+    with STATS.exclusive():  # rows queued meanwhile are written to the new file
+        moved = STATS_ARCHIVE.compact(FILES["log"], today)
+    if moved is None:
+        return 0  # failed (logged) - tried again after the next cycle
+    STATS_COMPACTION["day"] = today
+    if moved:
+        log(f"🗜️ Archived {moved} stats rows from closed days to {FILES['stats_archive']}/")
+        checkpoint_journal()  # the journal's stats offset referred to the old file
+    return moved
+
 # ==================== WATCHDOG OPERATIONS ====================
-def load_watchdog():
-    """Load urgent watchdog from JSON"""
-    try:
-        if os.path.exists(FILES["watchdog"]):
-            with open(FILES["watchdog"], 'r') as f:
-                return json.load(f)
-    except:
-        pass
-    return {}
+# Open urgent tickets are held in memory on a timer wheel keyed by SLA deadline;
+# every change is a single-row transaction in urgent_watchdog.db (sla_watchdog.py)
+WATCHDOG = SlaWatchdog(FILES["watchdog"], CONFIG["sla_minutes"], on_error=lambda msg: log(msg, "ERROR"))
 
-def save_watchdog(data):
-    """Save urgent watchdog to JSON"""
-    try:
-        with open(FILES["watchdog"], 'w') as f:
-            json.dump(data, f, indent=4, default=str)
-    except Exception as e:
-        log(f"Error saving watchdog: {e}", "ERROR")
+def next_sla_check():
+    """Seconds until the next SLA deadline passes (<= 0: overdue), or None if nothing is open"""
+    deadline = WATCHDOG.next_deadline()
+    if deadline is None:
+        return None
+    return (deadline - WATCHDOG.clock()).total_seconds()
 
-def add_to_watchdog(msg_id, subject, assigned_to, sender, risk_type):
-    """Add urgent ticket to watchdog"""
-    watchdog = load_watchdog()
-    watchdog[msg_id] = {
+def add_to_watchdog(msg_id, subject, assigned_to, sender, risk_type, timestamp=None):
+    """Add urgent ticket to watchdog; its SLA runs from timestamp (default: now), which is returned"""
+    timestamp = timestamp or WATCHDOG.clock().isoformat()
+    WATCHDOG.add(msg_id, {
         "subject": subject[:100],
         "assigned_to": assigned_to,
         "sender": sender,
         "risk_type": risk_type,
-        "timestamp": datetime.now().isoformat(),
+        "timestamp": timestamp,
         "escalation_count": 0
-    }
-    save_watchdog(watchdog)
-    log(f"🚨 Added to watchdog: {subject[:50]}... -> {assigned_to}", "CRITICAL")
+    })
+    log(f"🚨 Added to watchdog: {subject[:50]}... -> {assigned_to}", "CRITICAL",
+        event="watchdog_added", msg_id=msg_id, assigned_to=assigned_to, risk=risk_type)
+    return timestamp
 
 def remove_from_watchdog(msg_id):
     """Remove completed ticket from watchdog"""
-    watchdog = load_watchdog()
-    if msg_id in watchdog:
-        del watchdog[msg_id]
-        save_watchdog(watchdog)
-        log(f"✅ Removed from watchdog: {msg_id}", "SUCCESS")
+    if WATCHDOG.remove(msg_id):
+        log(f"✅ Removed from watchdog: {msg_id}", "SUCCESS", event="watchdog_removed", msg_id=msg_id)
 
 # ==================== RISK DETECTION ====================
+# Vocabulary and rules live in risk_rules.json (edit while running - picked up
+# before the next message). Risk Detection: (Action + Context) OR
+# (Urgency + Action) OR (High Importance)
+RISK_RULES = RulesWatcher(
+    FILES["rules"],
+    on_reload=lambda rules: log(f"🔁 Risk rules loaded: {len(rules.rules)} rules, {rules.matcher.mode} matching", "SUCCESS"),
+    on_error=lambda e: log(f"Invalid risk rules file - keeping previous rules: {e}", "ERROR")
+)
+
 def detect_risk(subject, body="", high_importance=False):
     """
     Semantic risk detection using (Action + Context) OR (Urgency + Action) logic.
     
     Returns: ("normal", "urgent", or "critical"), risk_reason
     """
-    text = (subject + " " + body).lower()
-    
-    # Check for risk actions
-    found_actions = [a for a in RISK_ACTIONS if a in text]
-    found_context = [c for c in RISK_CONTEXT if c in text]
-    found_urgency = [u for u in URGENCY_WORDS if u in text]
-    
-    # Rule 1: High Importance Flag (Outlook) = CRITICAL
-    if high_importance:
-        return "critical", "Outlook High Importance Flag"
-    
-    # Rule 2: (Action + Context) = CRITICAL (e.g., "delete patient scan")
-    if found_actions and found_context:
-        return "critical", f"Action+Context: {found_actions[0]}+{found_context[0]}"
-    
-    # Rule 3: (Urgency + Action) = CRITICAL (e.g., "STAT delete request")
-    if found_urgency and found_actions:
-        return "critical", f"Urgency+Action: {found_urgency[0]}+{found_actions[0]}"
-    
-    # Rule 4: Urgency words alone = URGENT
-    if found_urgency:
-        return "urgent", f"Urgency: {found_urgency[0]}"
-    
-    # Rule 5: Risk actions alone (without context) = WARN but not critical
-    if found_actions:
-        return "urgent", f"Action detected: {found_actions[0]}"
-    
-    return "normal", None
+    return RISK_RULES.current().classify(subject, body, high_importance)
+
+def detect_risk_many(messages, workers=None):
+    """Batch risk detection with the live rules (see risk_rules.detect_risk_many)"""
+    return classify_batch(messages, RISK_RULES.current(), workers=workers)
+
+def save_rule_stats():
+    """Write per-rule hit counts and evaluation cost for the dashboard/ops"""
+    try:
+        with open(FILES["rule_stats"], 'w') as f:
+            json.dump({
+                "updated": datetime.now().isoformat(),
+                "rules_loaded": datetime.fromtimestamp(RISK_RULES.loaded_at).isoformat() if RISK_RULES.loaded_at else None,
+                "rules": RISK_RULES.rules.stats()
+            }, f, indent=4)
+    except Exception as e:
+        log(f"Error saving rule stats: {e}", "ERROR")
 
 # ==================== SMART FILTER ====================
+# Reply prefix at the start (RE:, Accepted:, ...) OR a bot tag anywhere
+INTERNAL_REPLY_SUBJECT = re.compile(
+    r"\s*(?:re|accepted|declined|fw|fwd):|.*?\[(?:assigned|completed):",
+    re.IGNORECASE | re.DOTALL
+)
+
 def is_internal_reply(sender_email, subject, staff_list):
     """
     Smart Filter: Only skip if:
-    1. Sender IS in staff.txt AND
+    1. Sender IS in staff.txt (staff_list: a StaffIndex, or any list/set) AND
     2. Subject indicates a REPLY (RE:, Accepted:, etc.) OR contains bot tags
     """
-    is_staff = sender_email.lower() in staff_list
-    
-    reply_prefixes = ('re:', 'accepted:', 'declined:', 'fw:', 'fwd:')
-    is_reply = subject.lower().strip().startswith(reply_prefixes)
-    is_bot_tagged = '[assigned:' in subject.lower() or '[completed:' in subject.lower()
-    
-    return is_staff and (is_reply or is_bot_tagged)
+    if sender_email.lower() not in staff_list:
+        return False
+    return INTERNAL_REPLY_SUBJECT.match(subject) is not None
 
 # ==================== SLA WATCHDOG CHECK ====================
 def check_sla_breaches():
     """
-    Check all urgent tickets for SLA breaches.
+    Check urgent tickets for SLA breaches.
     If > 20 minutes: Re-assign, escalate to manager, log SLA_FAIL
+    Only tickets past their deadline are touched (deadline-ordered watchdog).
     """
-    watchdog = load_watchdog()
-    if not watchdog:
-        return
-    
-    now = datetime.now()
-    sla_limit = timedelta(minutes=CONFIG["sla_minutes"])
+    now = WATCHDOG.clock()
     
-    for msg_id, ticket in list(watchdog.items()):
+    for msg_id, ticket, elapsed in WATCHDOG.breached(now):
         try:
-            ticket_time = datetime.fromisoformat(ticket["timestamp"])
-            elapsed = now - ticket_time
+            # SLA BREACH!
+            log(f"🚨 SLA BREACH: {ticket['subject'][:50]}... ({elapsed.seconds // 60}m elapsed)", "CRITICAL",
+                event="sla_breach", msg_id=msg_id, assigned_to=ticket["assigned_to"],
+                elapsed_s=int(elapsed.total_seconds()))
+            
+            # Re-assign to next staff member
+            new_assignee = get_next_staff()
+            if new_assignee and new_assignee != ticket["assigned_to"]:
+                log(f"🔄 Re-assigning from {ticket['assigned_to']} to {new_assignee}", "WARN")
+            
+            # Escalate to manager (emailed from the outbox)
+            escalate_to_manager(ticket, elapsed)
+            
+            # Update watchdog with reset timer and escalation count
+            WATCHDOG.rearm(
+                msg_id, now,
+                escalation_count=ticket.get("escalation_count", 0) + 1,
+                assigned_to=new_assignee or ticket["assigned_to"]
+            )
+            
+            # Log SLA failure
+            append_stats(
+                f"[SLA_FAIL] {ticket['subject'][:50]}",
+                ticket["assigned_to"],
+                ticket["sender"],
+                "SLA_BREACH"
+            )
             
-            if elapsed > sla_limit:
-                # SLA BREACH!
-                log(f"🚨 SLA BREACH: {ticket['subject'][:50]}... ({elapsed.seconds // 60}m elapsed)", "CRITICAL")
-                
-                # Re-assign to next staff member
-                new_assignee = get_next_staff()
-                if new_assignee and new_assignee != ticket["assigned_to"]:
-                    log(f"🔄 Re-assigning from {ticket['assigned_to']} to {new_assignee}", "WARN")
-                
-                # Escalate to manager (would send email in real implementation)
-                escalate_to_manager(ticket, elapsed)
-                
-                # Update watchdog with reset timer and escalation count
-                watchdog[msg_id]["timestamp"] = now.isoformat()
-                watchdog[msg_id]["escalation_count"] = ticket.get("escalation_count", 0) + 1
-                watchdog[msg_id]["assigned_to"] = new_assignee or ticket["assigned_to"]
-                
-                # Log SLA failure
-                append_stats(
-                    f"[SLA_FAIL] {ticket['subject'][:50]}",
-                    ticket["assigned_to"],
-                    ticket["sender"],
-                    "SLA_BREACH"
-                )
-                
         except Exception as e:
             log(f"Error checking SLA for {msg_id}: {e}", "ERROR")
-    
-    save_watchdog(watchdog)
+
+# ==================== ESCALATIONS ====================
+# Escalations are committed to a durable outbox and emailed as per-manager
+# digests over pooled SMTP connections - the SLA check never waits on the
+# mail server, and failed sends are retried (escalation_outbox.py, smtp_pool.py)
+DEBUG_SMTP = DebugSmtpServer() if CONFIG["smtp_host"] == "debug" else None
+
+SMTP_POOL = SmtpPool(
+    DEBUG_SMTP.host if DEBUG_SMTP else CONFIG["smtp_host"],
+    DEBUG_SMTP.port if DEBUG_SMTP else CONFIG["smtp_port"],
+    size=CONFIG["smtp_pool_size"],
+    username=CONFIG["smtp_user"],
+    password=CONFIG["smtp_password"],
+    starttls=CONFIG["smtp_starttls"]
+) if CONFIG["smtp_host"] else None
+
+ESCALATIONS = EscalationOutbox(
+    FILES["outbox"],
+    send=SMTP_POOL.send if SMTP_POOL else None,
+    sender=CONFIG["smtp_from"],
+    log_path=FILES["escalations"],
+    coalesce_seconds=CONFIG["escalation_coalesce_seconds"],
+    workers=CONFIG["smtp_pool_size"],
+    on_error=lambda msg: log(msg, "ERROR")
+)
 
 def escalate_to_manager(ticket, elapsed):
-    """Send escalation email to manager"""
+    """Queue an escalation email to the manager (sent by deliver_escalations)"""
     manager = CONFIG["manager"]
     log(f"📧 Escalating to manager ({manager}): {ticket['subject'][:30]}...", "CRITICAL")
-    
-    # In production, this would send an actual email
-    # For now, we log the escalation
+    ESCALATIONS.add(manager, ticket, elapsed)
+
+def deliver_escalations(timeout=0):
+    """
+    Send the escalation digests that are due, waiting up to timeout seconds
+    for one. timeout=0 sends everything queued (shutdown, one-shot runs).
+    Returns the number of escalations delivered.
+    """
+    return ESCALATIONS.deliver(timeout, flush=not timeout)
+
+# ==================== MAIL SESSION ====================
+# The mail source (Outlook or a local Maildir). Mailbox and folder handles are
+# resolved once and reused every cycle; reconnects (with backoff) only when
+# they go stale (mail_session.py)
+def open_mail_source():
+    """Mail session for CONFIG["mail_source"], or None if it cannot run here"""
+    on_error = lambda msg: log(msg, "ERROR")
+    if CONFIG["mail_source"] == "maildir":
+        return MaildirSession(FILES["maildir"], CONFIG["processed_folder"], on_error=on_error)
+    if OUTLOOK_AVAILABLE:
+        return OutlookSession(CONFIG["mailbox"], CONFIG["processed_folder"], on_error=on_error)
+    return None
+
+MAIL = open_mail_source()
+
+# ==================== INGEST LATENCY ====================
+# Arrival -> assignment time of tickets assigned since the last report
+INGEST_LATENCY = deque(maxlen=10000)
+
+def record_latency(received):
+    """Seconds from arrival (epoch) to now, remembered for the cycle report"""
+    if received is None:
+        return None
+    latency = max(0.0, time.time() - received)
+    INGEST_LATENCY.append(latency)
+    return latency
+
+def report_latency():
+    """Log p50/p95/max arrival -> assignment time, then start a new window"""
+    if not INGEST_LATENCY:
+        return
+    samples = sorted(INGEST_LATENCY)
+    INGEST_LATENCY.clear()
+    p50 = samples[len(samples) // 2]
+    p95 = samples[min(len(samples) - 1, int(len(samples) * 0.95))]
+    log(f"⏱️ Arrival → assignment: p50 {p50:.1f}s, p95 {p95:.1f}s, max {samples[-1]:.1f}s ({len(samples)} tickets)",
+        event="ingest_latency", count=len(samples), p50_s=p50, p95_s=p95, max_s=samples[-1])
+
+# ==================== DISPATCHED MESSAGES ====================
+# Every forward is recorded, so a message forwarded just before a crash (and
+# so still unread) is archived on restart instead of being forwarded again
+DISPATCHED = MessageIndex(FILES["dispatched"], on_error=lambda msg: log(msg, "ERROR"))
+
+# ==================== DISPATCH JOURNAL ====================
+# Every step of every dispatch is journaled (assigned -> watchdog-added ->
+# forwarded -> archived), so a restart can finish or undo what a crash
+# interrupted (dispatch_journal.py)
+JOURNAL = DispatchJournal(
+    FILES["journal"],
+    checkpoint_every=CONFIG["journal_checkpoint_every"],
+    on_error=lambda msg: log(msg, "ERROR")
+)
+
+def checkpoint_journal():
+    """Checkpoint the journal with the state it must agree with (call while no dispatch is in flight)"""
+    STATS.flush()
     try:
-        with open("escalations.log", "a", encoding="utf-8") as f:
-            f.write(f"[{datetime.now().isoformat()}] ESCALATION\n")
-            f.write(f"  Manager: {manager}\n")
-            f.write(f"  Subject: {ticket['subject']}\n")
-            f.write(f"  Original Assignee: {ticket['assigned_to']}\n")
-            f.write(f"  Risk Type: {ticket['risk_type']}\n")
-            f.write(f"  Time Elapsed: {elapsed.seconds // 60} minutes\n")
-            f.write(f"  Escalation Count: {ticket.get('escalation_count', 0) + 1}\n")
-            f.write("-" * 50 + "\n")
-    except:
-        pass
+        stats_offset = os.path.getsize(FILES["log"])
+    except OSError:
+        stats_offset = 0
+    JOURNAL.checkpoint({"roster": ROSTER.state(), "stats_offset": stats_offset})
+
+def recover_dispatches():
+    """
+    Bring roster, watchdog, dispatch index and stats back in line with the
+    journal after a crash. Forwarded dispatches are rolled forward (process_inbox
+    archives them); ones that never got forwarded are rolled back (the message
+    is still unread and will be dispatched again).
+    """
+    recovery = JOURNAL.recover()
+    roster = recovery["roster"] or recovery["state"].get("roster")
+    if roster and ROSTER.restore(roster):
+        log(f"♻️ Roster position restored from the journal: {roster}", "WARN")
+    
+    for msg_id, entry in recovery["open"].items():
+        if "forwarded" in entry or DISPATCHED.get(msg_id) is not None:
+            if DISPATCHED.get(msg_id) is None:
+                DISPATCHED.add(msg_id, entry["assigned_to"], entry["tagged"], entry["risk_level"])
+            if "watchdog-added" in entry and msg_id not in WATCHDOG:
+                # The SLA clock keeps running from the original assignment, not from the restart
+                add_to_watchdog(msg_id, entry["subject"], entry["assigned_to"], entry["sender"], entry["risk_reason"],
+                                timestamp=entry.get("sla_started") or entry["watchdog-added"])
+            JOURNAL.record("rolled-forward", msg_id)  # the dispatch index sees it archived
+            log(f"♻️ Recovered forward to {entry['assigned_to']} - will be archived: {entry['subject'][:50]}...",
+                "WARN", event="recovered", msg_id=msg_id)
+        else:
+            if "watchdog-added" in entry:
+                remove_from_watchdog(msg_id)
+            JOURNAL.record("rolled-back", msg_id)
+            log(f"↩️ Rolled back unsent assignment to {entry['assigned_to']}: {entry['subject'][:50]}...",
+                "WARN", event="rolled_back", msg_id=msg_id)
+    
+    # Stats rows lost with the writer's queue: archived since the checkpoint but not in the CSV
+    written = Counter(tuple(r) for r in read_rows(FILES["log"], recovery["state"].get("stats_offset", 0)))
+    replayed = 0
+    for entry in recovery["archived"]:
+        row = tuple(entry.get("row") or ())
+        if not row:
+            continue
+        if written[row]:
+            written[row] -= 1
+        else:
+            STATS.append_row(list(row))
+            replayed += 1
+    if replayed:
+        log(f"♻️ Re-wrote {replayed} stats rows lost in the crash", "WARN")
+    
+    if recovery["replayed"]:
+        log(f"Journal: replayed {recovery['replayed']} records since the last checkpoint")
+    checkpoint_journal()
+
+# ==================== MAIL PIPELINE ====================
+# Assignment is decided in arrival order by process_inbox; the mailbox work that
+# follows (forward, then tag/mark read/archive) runs on bounded worker pools
+# (pipeline.py). Each job is a dict describing one message's outcome.
+def forward_stage(job):
+    """Forward an assigned message to its assignee (skipped for completed replies)"""
+    if job["banner"] is None:
+        return job
+    # Write-ahead: the assignment is on disk before anything is sent
+    if not JOURNAL.sync(job["intent"], timeout=CONFIG["journal_sync_seconds"]):
+        # Journal writer stuck - don't send what a crash could not account for. Undo
+        # the assignment; the message stays unread and is dispatched again next cycle
+        if job["risk_level"] in ("urgent", "critical"):
+            remove_from_watchdog(job["msg_id"])
+        JOURNAL.record("rolled-back", job["msg_id"])
+        raise RuntimeError(f"Dispatch journal not on disk after {CONFIG['journal_sync_seconds']}s - "
+                           f"not forwarded: {job['subject'][:50]}")
+    MAIL.forward(MAIL.item(job["ref"]), job["assigned_to"], job["banner"], on_behalf_of=CONFIG["mailbox"])
+    DISPATCHED.add(job["msg_id"], job["assigned_to"], job["tagged"], job["risk_level"])
+    JOURNAL.record("forwarded", job["msg_id"])
+    
+    latency = record_latency(job["received"])
+    log(f"[{job['risk_level'].upper()}] Assigned to {job['assigned_to']}: {job['subject'][:50]}...",
+        event="assigned", msg_id=job["msg_id"], assigned_to=job["assigned_to"], sender=job["sender"],
+        risk=job["risk_level"], reason=job["risk_reason"], latency_s=latency)
+    return job
+
+def archive_stage(job):
+    """Tag the original, record it in the stats, mark it read and archive it"""
+    msg = MAIL.item(job["ref"])
+    MAIL.tag(msg, job["tagged"])
+    row = append_stats(job["tagged"], job["assigned_to"], job["sender"], job["risk_level"])
+    MAIL.mark_read(msg)
+    MAIL.move(msg)
+    JOURNAL.record("archived", job["msg_id"], row=row)
+
+PIPELINE = StagedPipeline(
+    [("forward", forward_stage), ("archive", archive_stage)],
+    workers=CONFIG["pipeline_workers"],
+    thread_init=lambda: MAIL.thread_init() if MAIL is not None else None,
+    on_error=lambda msg: log(msg, "ERROR")
+)
 
 # ==================== MAIN EMAIL PROCESSING ====================
+def read_fields(ref):
+    """A message's MailFields, or None if it cannot be read (it stays unread - retried next cycle)"""
+    try:
+        return MAIL.fields(MAIL.item(ref))
+    except Exception as e:
+        log(f"Could not read message - leaving it for the next cycle: {e}", "ERROR")
+        return None
+
 def process_inbox():
     """Main email processing loop with risk detection"""
-    if not OUTLOOK_AVAILABLE:
+    if MAIL is None:
         log("Outlook not available - skipping inbox check", "WARN")
         return
     
     try:
-        outlook = win32com.client.Dispatch("Outlook.Application").GetNamespace("MAPI")
-        
-        # Find shared mailbox
-        mailbox = None
-        for i in range(50):
-            try:
-                folder = outlook.Folders(i)
-                if folder.Name.lower().strip() == CONFIG["mailbox"].lower().strip():
-                    mailbox = folder
-                    break
-            except:
-                pass
-        
-        if not mailbox:
-            log(f"Cannot find mailbox: {CONFIG['mailbox']}", "ERROR")
-            return
-        
-        inbox = mailbox.Folders["Inbox"]
-        try:
-            processed = inbox.Folders[CONFIG["processed_folder"]]
-        except:
-            log(f"Cannot find processed folder: {CONFIG['processed_folder']}", "ERROR")
-            return
-        
         # Get unread messages
-        msgs = list(inbox.Items.Restrict("[UnRead] = True"))
+        msgs = MAIL.unread()
         if not msgs:
-            return  # No new messages
+            return  # No new messages (or mailbox unreachable - already logged)
+        
+        staff_index = ROSTER.staff_index()
         
-        staff_list = get_staff_list()
+        # Extract email details (body: first 500 chars) - read ahead by the pipeline workers
+        refs = [MAIL.ref(msg) for msg in msgs]
+        details = PIPELINE.prefetch(read_fields, refs)
         
-        for msg in msgs:
+        for ref, fields in zip(refs, details):
+            if fields is None:
+                continue  # never dispatch a message we could not read
             try:
-                # Extract email details
-                try:
-                    sender_email = msg.SenderEmailAddress.lower()
-                except:
-                    sender_email = "unknown"
-                
-                try:
-                    subject = msg.Subject.strip()
-                except:
-                    subject = ""
-                
-                try:
-                    body = msg.Body[:500] if msg.Body else ""  # First 500 chars
-                except:
-                    body = ""
+                msg_id, sender_email, subject, body, high_importance, received = fields
                 
-                try:
-                    high_importance = (msg.Importance == 2)  # 2 = High
-                except:
-                    high_importance = False
-                
-                try:
-                    msg_id = msg.EntryID
-                except:
-                    msg_id = str(hash(subject + sender_email))
+                # ===== EXACTLY ONCE =====
+                # Already forwarded (the bot stopped before archiving it): just archive it
+                dispatched = DISPATCHED.get(msg_id)
+                if dispatched is not None:
+                    log(f"♻️ Already forwarded to {dispatched['assigned_to']} - archiving: {subject[:50]}...", "WARN",
+                        event="already_dispatched", msg_id=msg_id, assigned_to=dispatched["assigned_to"])
+                    PIPELINE.submit({
+                        "ref": ref, "msg_id": msg_id, "subject": subject,
+                        "tagged": dispatched["tagged"], "assigned_to": dispatched["assigned_to"],
+                        "sender": sender_email, "risk_level": dispatched["risk_level"], "banner": None
+                    })
+                    continue
                 
                 # ===== SMART FILTER =====
-                if is_internal_reply(sender_email, subject, staff_list):
-                    log(f"⏩ Skipped internal reply from {sender_email}: {subject[:50]}...")
-                    msg.Subject = f"[COMPLETED: {sender_email}] {msg.Subject}"
-                    msg.Save()
-                    append_stats(msg.Subject, "completed", sender_email, "normal")
-                    msg.UnRead = False
-                    msg.Move(processed)
+                if is_internal_reply(sender_email, subject, staff_index):
+                    staff_email = staff_index.resolve(sender_email) or sender_email
+                    log(f"⏩ Skipped internal reply from {staff_email}: {subject[:50]}...",
+                        event="completed", msg_id=msg_id, staff=staff_email)
+                    PIPELINE.submit({
+                        "ref": ref, "msg_id": msg_id, "subject": subject,
+                        "tagged": f"[COMPLETED: {staff_email}] {subject}",
+                        "assigned_to": "completed", "sender": staff_email,
+                        "risk_level": "normal", "banner": None
+                    })
                     
                     # If this was in watchdog, remove it
                     remove_from_watchdog(msg_id)
@@ -392,44 +551,42 @@ def process_inbox():
                     log(f"⚠️ Risk detected [{risk_level.upper()}]: {risk_reason}", "WARN")
                 
                 # ===== ROUND-ROBIN ASSIGNMENT =====
+                # Sequential and in arrival order, so the rotation stays fair
                 assignee = get_next_staff()
                 if not assignee:
                     log("No staff available for assignment!", "ERROR")
                     continue
                 
-                # Forward email
-                fwd = msg.Forward()
-                fwd.Recipients.Add(assignee)
+                risk_tag = f"[{risk_level.upper()}]" if risk_level != "normal" else ""
+                tagged = f"[Assigned: {assignee}] {risk_tag} {subject}"
+                intent = JOURNAL.record(
+                    "assigned", msg_id, assigned_to=assignee, subject=subject, sender=sender_email,
+                    risk_level=risk_level, risk_reason=risk_reason, tagged=tagged, roster=ROSTER.state()
+                )
                 
-                # Add risk warning if applicable
+                # Forward email (with risk warning if applicable)
                 if risk_level in ("urgent", "critical"):
-                    risk_banner = (
+                    banner = (
                         "━" * 60 + "\n"
                         f"🚨 {risk_level.upper()} RISK TICKET 🚨\n"
                         f"Reason: {risk_reason}\n"
                         f"SLA: {CONFIG['sla_minutes']} MINUTES\n"
                         "━" * 60 + "\n\n"
                     )
-                    fwd.Body = risk_banner + fwd.Body
                     
                     # Add to watchdog for SLA tracking
-                    add_to_watchdog(msg_id, subject, assignee, sender_email, risk_reason)
+                    sla_started = add_to_watchdog(msg_id, subject, assignee, sender_email, risk_reason)
+                    JOURNAL.record("watchdog-added", msg_id, sla_started=sla_started)
                 else:
-                    fwd.Body = f"--- 🤖 AUTO-ASSIGNED TO {assignee} ---\n\n" + fwd.Body
-                
-                fwd.SentOnBehalfOfName = CONFIG["mailbox"]
-                fwd.Send()
+                    banner = f"--- 🤖 AUTO-ASSIGNED TO {assignee} ---\n\n"
                 
-                log(f"[{risk_level.upper()}] Assigned to {assignee}: {subject[:50]}...")
-                
-                # Tag and archive original
-                risk_tag = f"[{risk_level.upper()}]" if risk_level != "normal" else ""
-                msg.Subject = f"[Assigned: {assignee}] {risk_tag} {msg.Subject}"
-                msg.Save()
-                
-                append_stats(msg.Subject, assignee, sender_email, risk_level)
-                msg.UnRead = False
-                msg.Move(processed)
+                # Forward, tag and archive on the pipeline workers
+                PIPELINE.submit({
+                    "ref": ref, "msg_id": msg_id, "subject": subject, "tagged": tagged,
+                    "assigned_to": assignee, "sender": sender_email,
+                    "risk_level": risk_level, "risk_reason": risk_reason,
+                    "banner": banner, "received": received, "intent": intent
+                })
                 
             except Exception as e:
                 log(f"Error processing email: {e}", "ERROR")
@@ -437,7 +594,15 @@ def process_inbox():
         
     except Exception as e:
         log(f"Outlook connection error: {e}", "ERROR")
-        # Don't crash - will retry next cycle
+        MAIL.invalidate()
+        # Don't crash - will reconnect next cycle
+    finally:
+        # Wait for the workers: messages still in flight are unread, and the next
+        # cycle must not pick them up again
+        PIPELINE.join()
+        if JOURNAL.checkpoint_due():
+            checkpoint_journal()  # nothing in flight - a consistent point
+        compact_stats()
 
 def run_job():
     """Main job: Process inbox AND check SLA breaches"""
@@ -450,9 +615,19 @@ def run_job():
         check_sla_breaches()
     except Exception as e:
         log(f"Error in check_sla_breaches: {e}", "ERROR")
+    
+    deliver_escalations()
+    flush_state()
+
+def flush_state():
+    """Periodic state flush: rule hit counts and the ingest latency report"""
+    save_rule_stats()
+    report_latency()
 
 # ==================== MAIN ENTRY POINT ====================
 if __name__ == "__main__":
+    ACTIVITY_LOG.start()  # log lines are written in the background from here on
+    
     log("=" * 60)
     log("🏥 Helpdesk Clinical Safety Bot v2.2")
     log("=" * 60)
@@ -462,26 +637,78 @@ if __name__ == "__main__":
     log(f"Staff loaded: {len(get_staff_list())} members")
     log("=" * 60)
     
-    # Initialize watchdog file if needed
-    if not os.path.exists(FILES["watchdog"]):
-        save_watchdog({})
-        log("Initialized empty watchdog file")
+    # Open the watchdog database (migrating the old JSON file once)
+    if WATCHDOG.open():
+        migrated = WATCHDOG.migrate_json(FILES["watchdog_json"])
+        if migrated:
+            log(f"Migrated {migrated} urgent tickets from {FILES['watchdog_json']}")
+        log(f"Watchdog: {len(WATCHDOG)} open urgent tickets")
+    
+    # Index of forwarded messages (exactly-once forwarding across restarts)
+    if DISPATCHED.open():
+        log(f"Dispatch index: {len(DISPATCHED)} forwarded messages on record")
+    
+    # Escalations not yet delivered before the last stop are sent first
+    if ESCALATIONS.open() and len(ESCALATIONS):
+        log(f"📧 Escalation outbox: {len(ESCALATIONS)} undelivered escalations")
+    if DEBUG_SMTP:
+        DEBUG_SMTP.start()
+        log(f"📧 Debug SMTP server on {DEBUG_SMTP.host}:{DEBUG_SMTP.port} (escalations are not really sent)")
+    
+    # Finish or undo dispatches a crash interrupted, then journal in the background
+    recover_dispatches()
+    JOURNAL.start()
     
-    # Run immediately
-    run_job()
+    # Initialize risk rules file if needed, then watch it for edits
+    if not os.path.exists(FILES["rules"]):
+        save_rules(FILES["rules"], DEFAULT_RULES)
+        log("Initialized default risk rules file")
+    RISK_RULES.current()
+    if RISK_RULES.start():
+        log(f"👀 Watching {FILES['rules']} for changes")
     
-    # Schedule to run every minute
-    schedule.every(CONFIG["check_interval_seconds"]).seconds.do(run_job)
+    # Roster state and stats rows are persisted in the background from here on
+    ROSTER.start()
+    STATS.start()
+    if not ARROW_AVAILABLE:
+        log("pyarrow not available - stats history stays in daily_stats.csv (no archive)", "WARN")
+    PIPELINE.start()
+    
+    # Ingestion, SLA checks, escalation delivery and state flushing run as
+    # independent asyncio tasks; Outlook and file work runs in executors (bot_runtime.py)
+    runtime = BotRuntime(
+        ingest=process_inbox,
+        sla_check=check_sla_breaches,
+        deliver=deliver_escalations,
+        flush=flush_state,
+        mail=MAIL,
+        poll_interval=CONFIG["check_interval_seconds"],
+        sla_interval=CONFIG["sla_check_seconds"],
+        sla_next=next_sla_check,
+        flush_interval=CONFIG["check_interval_seconds"],
+        push=CONFIG["push_ingestion"],
+        on_error=lambda msg: log(msg, "ERROR")
+    )
+    WATCHDOG.on_schedule = runtime.wake_sla  # new deadlines re-plan the SLA timer
+    if CONFIG["push_ingestion"] and MAIL is not None and MAIL.can_push():
+        log("📨 Push ingestion on - new mail is assigned as it arrives (polling kept as fallback)")
     
     log("🔄 Entering main loop (Ctrl+C to stop)")
+    runtime.run()  # returns once in-flight work has drained
+    log("Bot stopped", "INFO")
     
-    while True:
-        try:
-            schedule.run_pending()
-            time.sleep(1)
-        except KeyboardInterrupt:
-            log("Bot stopped by user", "INFO")
-            break
-        except Exception as e:
-            log(f"Unexpected error in main loop: {e}", "ERROR")
-            time.sleep(5)  # Wait before retry
\ No newline at end of file
+    # Persist anything still pending before exit
+    PIPELINE.stop()
+    checkpoint_journal()  # clean stop: the next start has nothing to replay
+    JOURNAL.stop()
+    ROSTER.stop()
+    STATS.stop()
+    WATCHDOG.close()
+    DISPATCHED.close()
+    ESCALATIONS.close()
+    if SMTP_POOL:
+        SMTP_POOL.close()
+    if DEBUG_SMTP:
+        DEBUG_SMTP.stop()
+    RISK_RULES.stop()
+    ACTIVITY_LOG.stop()
\ No newline at end of file
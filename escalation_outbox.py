@@ -0,0 +1,262 @@
+"""
+Escalation Outbox - Durable, coalesced delivery of manager escalations
+
+An SLA breach must reach the manager even if the mail server is down or
+the bot restarts, and a mass breach must not become one email (and one
+SMTP connection) per ticket:
+
+- add() commits the escalation to an SQLite outbox (WAL mode) before it
+  returns; a row is only deleted once its email has been accepted
+- escalations for the same manager queued within coalesce_seconds of the
+  first go out together as one digest email (at most digest_max tickets)
+- digests for different managers are sent in parallel, over whatever
+  send() the caller passes in - typically SmtpPool.send (smtp_pool.py)
+- a failed digest stays in the outbox and is retried with exponential
+  backoff (retry_base .. retry_max seconds); rows left over from a crash
+  are sent on the next start
+- every delivered escalation is appended to escalations.log, one write
+  per delivery round
+
+Without send() (no mail server configured) delivery is the log entry only.
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from email.message import EmailMessage
+from email.utils import formatdate, make_msgid
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS outbox (
+    id          INTEGER PRIMARY KEY,
+    manager     TEXT NOT NULL,
+    queued_at   TEXT NOT NULL,
+    ticket      TEXT NOT NULL,
+    elapsed_s   REAL NOT NULL,
+    attempts    INTEGER NOT NULL DEFAULT 0,
+    not_before  REAL NOT NULL,
+    last_error  TEXT
+);
+"""
+
+
+def format_escalation(entry):
+    """escalations.log block (also the digest body) for one outbox entry"""
+    ticket = entry["ticket"]
+    return (
+        f"[{entry['queued_at']}] ESCALATION\n"
+        f"  Manager: {entry['manager']}\n"
+        f"  Subject: {ticket['subject']}\n"
+        f"  Original Assignee: {ticket['assigned_to']}\n"
+        f"  Risk Type: {ticket['risk_type']}\n"
+        f"  Time Elapsed: {int(entry['elapsed_s']) // 60} minutes\n"
+        f"  Escalation Count: {ticket.get('escalation_count', 0) + 1}\n"
+        + "-" * 50 + "\n"
+    )
+
+
+class EscalationOutbox:
+    """Durable outbox of manager escalations, delivered as per-manager digests"""
+
+    def __init__(self, path, send=None, sender="helpdesk-bot@localhost", log_path="escalations.log",
+                 coalesce_seconds=5.0, digest_max=50, workers=4, retry_base=5.0, retry_max=300.0,
+                 synchronous="NORMAL", clock=time.time, on_error=None):
+        self.path = path
+        self.send = send                    # send(EmailMessage), raises on failure; None: log only
+        self.sender = sender
+        self.log_path = log_path
+        self.coalesce_seconds = coalesce_seconds
+        self.digest_max = digest_max
+        self.workers = workers
+        self.retry_base = retry_base
+        self.retry_max = retry_max
+        self.synchronous = synchronous      # NORMAL: survives a bot crash; FULL: also a power cut
+        self.clock = clock
+        self.on_error = on_error
+
+        self._lock = threading.RLock()
+        self._changed = threading.Condition(self._lock)
+        self._deliver_lock = threading.Lock()  # one delivery round at a time
+        self._conn = None
+        self._pending = {}   # manager -> {id: entry}
+        self._executor = None
+        self.delivered = 0   # escalations delivered
+        self.emails = 0      # digests sent
+        self.failed = 0      # failed digest attempts
+
+    # ---------- database ----------
+    def open(self):
+        """Open (creating if needed) the outbox and load undelivered escalations"""
+        with self._lock:
+            if self._conn is not None:
+                return True
+            try:
+                conn = sqlite3.connect(self.path, timeout=5, check_same_thread=False)
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute(f"PRAGMA synchronous={self.synchronous}")
+                conn.executescript(SCHEMA)
+                rows = conn.execute(
+                    "SELECT id, manager, queued_at, ticket, elapsed_s, attempts, not_before FROM outbox"
+                ).fetchall()
+            except Exception as e:
+                self._error(f"Error opening escalation outbox: {e}")
+                return False
+            self._conn = conn
+            for id_, manager, queued_at, ticket, elapsed_s, attempts, not_before in rows:
+                self._pending.setdefault(manager, {})[id_] = {
+                    "id": id_, "manager": manager, "queued_at": queued_at, "ticket": json.loads(ticket),
+                    "elapsed_s": elapsed_s, "attempts": attempts, "not_before": not_before,
+                }
+            return True
+
+    def close(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=True)
+                self._executor = None
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    # ---------- queueing ----------
+    def add(self, manager, ticket, elapsed, queued_at=None):
+        """Queue one escalation (committed before returning). False if it could not be saved."""
+        queued_at = (queued_at or datetime.now()).isoformat()
+        elapsed_s = elapsed.total_seconds() if hasattr(elapsed, "total_seconds") else float(elapsed)
+        not_before = self.clock() + self.coalesce_seconds
+        with self._lock:
+            if not self.open():
+                return False
+            try:
+                with self._conn:
+                    cursor = self._conn.execute(
+                        "INSERT INTO outbox (manager, queued_at, ticket, elapsed_s, not_before) VALUES (?, ?, ?, ?, ?)",
+                        (manager, queued_at, json.dumps(ticket, ensure_ascii=False), elapsed_s, not_before)
+                    )
+            except Exception as e:
+                self._error(f"Error saving escalation for {manager}: {e}")
+                return False
+            self._pending.setdefault(manager, {})[cursor.lastrowid] = {
+                "id": cursor.lastrowid, "manager": manager, "queued_at": queued_at, "ticket": dict(ticket),
+                "elapsed_s": elapsed_s, "attempts": 0, "not_before": not_before,
+            }
+            self._changed.notify_all()
+            return True
+
+    def next_ready(self):
+        """Clock time the next digest is due (None if the outbox is empty)"""
+        with self._lock:
+            starts = [min(e["not_before"] for e in entries.values()) for entries in self._pending.values() if entries]
+            return min(starts) if starts else None
+
+    def __len__(self):
+        with self._lock:
+            return sum(len(entries) for entries in self._pending.values())
+
+    # ---------- delivery ----------
+    def _ready(self, flush):
+        """[(manager, [entries])] digests due now - everything queued, if flush"""
+        now = self.clock()
+        digests = []
+        for manager, entries in self._pending.items():
+            if entries and (flush or min(e["not_before"] for e in entries.values()) <= now):
+                batch = sorted(entries.values(), key=lambda e: e["id"])
+                for i in range(0, len(batch), self.digest_max):
+                    digests.append((manager, batch[i:i + self.digest_max]))
+        return digests
+
+    def deliver(self, timeout=0, flush=False):
+        """
+        Send the digests that are due, waiting up to timeout seconds for one
+        to become due. flush=True sends everything queued without waiting
+        out the coalescing window (shutdown, one-shot runs). Returns the
+        number of escalations delivered.
+        """
+        with self._deliver_lock:
+            deadline = self.clock() + timeout
+            with self._changed:
+                while True:
+                    digests = self._ready(flush)
+                    if digests:
+                        break
+                    now = self.clock()
+                    if now >= deadline:
+                        return 0
+                    ready = self.next_ready()
+                    until = deadline if ready is None else min(deadline, ready)
+                    self._changed.wait(max(until - now, 0.001))
+
+            if self.send is None or len(digests) == 1:
+                results = [self._send_digest(d) for d in digests]
+            else:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="escalation")
+                results = list(self._executor.map(self._send_digest, digests))
+            return self._settle(digests, results)
+
+    def _send_digest(self, digest):
+        """None if sent, else the error"""
+        if self.send is None:
+            return None
+        try:
+            self.send(self._message(*digest))
+            return None
+        except Exception as e:
+            return e
+
+    def _message(self, manager, entries):
+        message = EmailMessage()
+        if len(entries) == 1:
+            message["Subject"] = f"🚨 SLA breach: {entries[0]['ticket']['subject'][:80]}"
+        else:
+            message["Subject"] = f"🚨 SLA breaches: {len(entries)} tickets need attention"
+        message["From"] = self.sender
+        message["To"] = manager
+        message["Date"] = formatdate(localtime=True)
+        message["Message-ID"] = make_msgid(domain=self.sender.rsplit("@", 1)[-1])
+        message.set_content("".join(format_escalation(e) for e in entries))
+        return message
+
+    def _settle(self, digests, results):
+        """Delete delivered rows, reschedule failed ones, append escalations.log"""
+        now = self.clock()
+        done, retry = [], []
+        with self._lock:
+            for (manager, entries), error in zip(digests, results):
+                if error is None:
+                    done.extend(entries)
+                    continue
+                self.failed += 1
+                self._error(f"Error sending escalation digest to {manager} ({len(entries)} tickets): {error}")
+                for e in entries:
+                    e["attempts"] += 1
+                    e["not_before"] = now + min(self.retry_max, self.retry_base * 2 ** (e["attempts"] - 1))
+                    retry.append((e["attempts"], e["not_before"], str(error), e["id"]))
+            try:
+                with self._conn:
+                    self._conn.executemany("DELETE FROM outbox WHERE id = ?", [(e["id"],) for e in done])
+                    self._conn.executemany(
+                        "UPDATE outbox SET attempts = ?, not_before = ?, last_error = ? WHERE id = ?", retry
+                    )
+            except Exception as e:
+                # Sent but still in the outbox: may be sent twice after a restart, never lost
+                self._error(f"Error updating escalation outbox: {e}")
+            for e in done:
+                self._pending[e["manager"]].pop(e["id"], None)
+            self.delivered += len(done)
+            self.emails += sum(1 for error in results if error is None)
+
+        if done and self.log_path:
+            try:
+                with open(self.log_path, "a", encoding="utf-8") as f:
+                    f.write("".join(format_escalation(e) for e in done))
+            except Exception as e:
+                self._error(f"Error writing {self.log_path}: {e}")
+        return len(done)
+
+    def _error(self, msg):
+        if self.on_error:
+            self.on_error(msg)
@@ -0,0 +1,624 @@
+"""
+Mail Session - Pluggable mail sources with cached mailbox handles
+
+Resolving the shared mailbox is expensive under COM: dispatch
+Outlook.Application, walk up to 50 top-level folders to match the mailbox
+name, then resolve Inbox and the processed folder. A MailSession does that
+once and hands back the same handles every cycle:
+
+- handles() costs one cheap property read while the handles are good
+- if that read fails (Outlook restarted, profile reloaded, ...) the handles
+  are dropped and re-resolved; failed reconnects back off exponentially
+- invalidate() forces a reconnect on the next cycle
+- watch(callback) asks for push notification of new mail (Outlook ItemAdd
+  events, or inotify on the Maildir via the optional `watchdog` package);
+  it is re-subscribed after every reconnect. Returns False if the source
+  cannot push - keep polling then.
+
+A session is also the bot's whole view of the mail source: unread(),
+fields(), forward(), tag(), mark_read() and move(). ref() and item() hand
+a message to another thread (Outlook items are bound to the thread that
+fetched them - workers look them up again by EntryID). Backends:
+
+- OutlookSession  shared mailbox in the local Outlook profile (Windows)
+- MaildirSession  a local Maildir++ tree (inbox, .Done, .Outbox) - runs
+                  anywhere, for load tests and profiling
+- FakeSession     in memory, messages behave like Outlook MailItems
+"""
+
+import email.utils
+import hashlib
+import mailbox
+import os
+import threading
+import time
+from collections import namedtuple
+from datetime import datetime
+from email.header import Header, decode_header, make_header
+from email.message import Message
+from itertools import count
+
+# Windows-specific imports (graceful fallback for Linux/Mac)
+try:
+    import pythoncom
+    import win32com.client
+    OUTLOOK_AVAILABLE = True
+except ImportError:
+    OUTLOOK_AVAILABLE = False
+
+# File monitoring is optional - Maildir falls back to polling
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+    WATCHDOG_AVAILABLE = True
+except ImportError:
+    WATCHDOG_AVAILABLE = False
+
+
+def stable_id(*parts):
+    """Message ID derived from its contents - the same in every process, unlike hash()"""
+    text = "\x1f".join("" if p is None else str(p) for p in parts)
+    return "sha1:" + hashlib.sha1(text.encode("utf-8", "surrogatepass")).hexdigest()
+
+
+class MailboxError(Exception):
+    """The mailbox or one of its folders could not be resolved"""
+
+
+# What the bot reads from each message
+MailFields = namedtuple("MailFields", ["msg_id", "sender", "subject", "body", "high_importance", "received"])
+
+BODY_CHARS = 500  # only the start of the body is used for risk detection
+
+
+class MailSession:
+    """
+    Caches (inbox, processed) folder handles across cycles.
+
+    Subclasses implement connect() (resolve the handles, raise MailboxError
+    if they cannot) and is_valid() (a cheap liveness check).
+    """
+
+    def __init__(self, min_backoff=5.0, max_backoff=300.0, on_error=None):
+        self.min_backoff = min_backoff
+        self.max_backoff = max_backoff
+        self.on_error = on_error
+
+        self._handles = None
+        self._on_new_mail = None
+        self._backoff = 0.0
+        self._retry_at = 0.0
+        self.connects = 0  # successful (re)connects, for diagnostics
+
+    def connect(self):
+        raise NotImplementedError
+
+    def is_valid(self, handles):
+        raise NotImplementedError
+
+    def handles(self):
+        """(inbox, processed), or None while the mailbox is unreachable"""
+        if self._handles is not None:
+            try:
+                if self.is_valid(self._handles):
+                    return self._handles
+            except Exception:
+                pass
+            self._handles = None
+            self._error("Mailbox handles went stale - reconnecting")
+
+        now = time.monotonic()
+        if now < self._retry_at:
+            return None
+        try:
+            self._handles = self.connect()
+        except Exception as e:
+            self._backoff = min(max(self._backoff * 2, self.min_backoff), self.max_backoff)
+            self._retry_at = now + self._backoff
+            self._error(f"{e} (retrying in {self._backoff:.0f}s)")
+            return None
+        self._backoff = 0.0
+        self.connects += 1
+        if self._on_new_mail is not None:
+            try:
+                self.subscribe(self._handles, self._on_new_mail)
+            except Exception as e:
+                self._error(f"New-mail notifications unavailable - polling only: {e}")
+        return self._handles
+
+    # ---------- push notification ----------
+    def can_push(self):
+        """Whether this source can notify about new mail"""
+        return False
+
+    def subscribe(self, handles, callback):
+        """Arrange for callback() to be called when mail arrives (per connection)"""
+        raise NotImplementedError
+
+    def watch(self, callback):
+        """Call callback() whenever new mail arrives. False if not supported."""
+        if not self.can_push():
+            return False
+        self._on_new_mail = callback
+        if self._handles is not None:
+            self.subscribe(self._handles, callback)
+        else:
+            self.handles()  # subscribes on connect
+        return True
+
+    def unwatch(self):
+        self._on_new_mail = None
+
+    def pump(self):
+        """Deliver pending notifications (Outlook events need the COM message loop)"""
+
+    def thread_init(self):
+        """Prepare the thread that will make every call on this session"""
+
+    def invalidate(self):
+        """Drop the cached handles - the next handles() call reconnects"""
+        self._handles = None
+
+    # ---------- mail source interface ----------
+    # The defaults drive Outlook MailItem-style objects (Outlook and Fake)
+    def unread(self):
+        """Unread messages in the inbox ([] while the mailbox is unreachable)"""
+        handles = self.handles()
+        if handles is None:
+            return []
+        inbox = handles[0]
+        return list(inbox.Items.Restrict("[UnRead] = True"))
+
+    def fields(self, msg):
+        """MailFields for a message - never raises, missing fields get defaults"""
+        try:
+            sender = msg.SenderEmailAddress.lower()
+        except Exception:
+            sender = "unknown"
+        try:
+            subject = msg.Subject.strip()
+        except Exception:
+            subject = ""
+        try:
+            body = msg.Body[:BODY_CHARS] if msg.Body else ""
+        except Exception:
+            body = ""
+        try:
+            high_importance = (msg.Importance == 2)  # 2 = High
+        except Exception:
+            high_importance = False
+        try:
+            received = msg.ReceivedTime.timestamp()
+        except Exception:
+            received = None
+        try:
+            msg_id = msg.EntryID
+        except Exception:
+            msg_id = stable_id(sender, subject, received)
+        return MailFields(msg_id, sender, subject, body, high_importance, received)
+
+    def forward(self, msg, to, banner="", on_behalf_of=None):
+        """Forward msg to `to`, with banner put above the original body"""
+        fwd = msg.Forward()
+        fwd.Recipients.Add(to)
+        fwd.Body = banner + fwd.Body
+        if on_behalf_of:
+            fwd.SentOnBehalfOfName = on_behalf_of
+        fwd.Send()
+
+    def tag(self, msg, subject):
+        """Replace the message subject (e.g. with the bot's [Assigned: ...] tag)"""
+        msg.Subject = subject
+        msg.Save()
+
+    def mark_read(self, msg):
+        msg.UnRead = False
+
+    def move(self, msg):
+        """Move msg to the processed folder"""
+        processed = self.handles()[1]
+        msg.Move(processed)
+
+    # ---------- cross-thread access ----------
+    def ref(self, msg):
+        """A reference to msg that any thread can pass to item()"""
+        return msg
+
+    def item(self, ref):
+        """The message behind ref, usable on the calling thread"""
+        return ref
+
+    def _error(self, msg):
+        if self.on_error:
+            self.on_error(msg)
+
+
+# ==================== OUTLOOK ====================
+class OutlookSession(MailSession):
+    """Shared mailbox in the local Outlook profile (Windows, pywin32)"""
+
+    def __init__(self, mailbox_name, processed_folder, **kwargs):
+        super().__init__(**kwargs)
+        self.mailbox_name = mailbox_name
+        self.processed_folder = processed_folder
+        self._ids = None  # (store, processed folder EntryID) of the current connection
+        self._local = threading.local()  # per-thread namespace and processed folder
+
+    def connect(self):
+        if not OUTLOOK_AVAILABLE:
+            raise MailboxError("Outlook not available")
+        outlook = win32com.client.Dispatch("Outlook.Application").GetNamespace("MAPI")
+
+        # Find shared mailbox
+        wanted = self.mailbox_name.lower().strip()
+        mailbox = None
+        for i in range(50):
+            try:
+                folder = outlook.Folders(i)
+                if folder.Name.lower().strip() == wanted:
+                    mailbox = folder
+                    break
+            except Exception:
+                pass
+        if not mailbox:
+            raise MailboxError(f"Cannot find mailbox: {self.mailbox_name}")
+
+        inbox = mailbox.Folders["Inbox"]
+        try:
+            processed = inbox.Folders[self.processed_folder]
+        except Exception:
+            raise MailboxError(f"Cannot find processed folder: {self.processed_folder}")
+        self._ids = (inbox.StoreID, processed.EntryID)
+        return inbox, processed
+
+    def is_valid(self, handles):
+        inbox, processed = handles
+        return bool(inbox.EntryID) and bool(processed.EntryID)  # one round-trip each
+
+    def can_push(self):
+        return OUTLOOK_AVAILABLE
+
+    def subscribe(self, handles, callback):
+        class _InboxEvents:
+            def OnItemAdd(self, item):
+                callback()
+
+        # Keep the Items collection alive, or Outlook drops the event sink
+        self._items = handles[0].Items
+        self._events = win32com.client.WithEvents(self._items, _InboxEvents)
+
+    def pump(self):
+        pythoncom.PumpWaitingMessages()
+
+    def thread_init(self):
+        pythoncom.CoInitialize()  # COM handles must be created and used on this thread
+
+    def _thread_handles(self):
+        """(namespace, processed folder) for the calling thread"""
+        local = self._local
+        if getattr(local, "ids", None) != self._ids:
+            local.namespace = win32com.client.Dispatch("Outlook.Application").GetNamespace("MAPI")
+            local.processed = local.namespace.GetFolderFromID(self._ids[1], self._ids[0])
+            local.ids = self._ids
+        return local.namespace, local.processed
+
+    def ref(self, msg):
+        return msg.EntryID
+
+    def item(self, ref):
+        return self._thread_handles()[0].GetItemFromID(ref, self._ids[0])
+
+    def move(self, msg):
+        msg.Move(self._thread_handles()[1])
+
+
+# ==================== MAILDIR ====================
+def _header(value):
+    """Decoded header text ('' if missing)"""
+    if value is None:
+        return ""
+    try:
+        return str(make_header(decode_header(str(value))))
+    except Exception:
+        return str(value)
+
+
+def _text_body(msg):
+    """First text/plain part of an email.message.Message, decoded"""
+    part = next((p for p in msg.walk() if p.get_content_type() == "text/plain"), None)
+    if part is None:
+        return ""
+    payload = part.get_payload(decode=True) or b""
+    return payload.decode(part.get_content_charset() or "utf-8", errors="replace")
+
+
+class MaildirSession(MailSession):
+    """
+    Local Maildir++ tree: new mail arrives in the top-level Maildir,
+    processed mail goes to .<processed_folder>, forwards are written to
+    .Outbox (hand them to a real transport from there).
+
+    Messages are addressed by Maildir key. tag() and mark_read() change
+    the cached copy; move() writes it to the processed folder in one go.
+
+    The pipeline calls in from several threads at once, and neither
+    mailbox.Maildir nor the cache is thread-safe: all access goes through
+    one lock. fields() raises if a message cannot be read - a record of
+    defaults would be dispatched as if it were the message.
+    """
+
+    def __init__(self, path, processed_folder="Done", outbox_folder="Outbox", domain="localhost", **kwargs):
+        super().__init__(**kwargs)
+        self.path = path
+        self.domain = domain  # for Message-IDs (make_msgid's default does a DNS lookup)
+        self.processed_folder = processed_folder
+        self.outbox_folder = outbox_folder
+        self._lock = threading.RLock()  # mailbox handles and the cache
+        self._cache = {}  # key -> MaildirMessage being processed
+        self._arrived = {}  # key -> delivery time (file mtime) from the last unread()
+        self._observer = None
+
+    def connect(self):
+        inbox = mailbox.Maildir(self.path, factory=None, create=True)
+        folders = inbox.list_folders()
+        get = lambda name: inbox.get_folder(name) if name in folders else inbox.add_folder(name)
+        return inbox, get(self.processed_folder), get(self.outbox_folder)
+
+    def is_valid(self, handles):
+        return os.path.isdir(os.path.join(self.path, "new"))
+
+    def unread(self):
+        """Keys of messages in new/, and in cur/ without the Seen flag"""
+        handles = self.handles()
+        if handles is None:
+            return []
+        with self._lock:
+            self._cache.clear()
+            self._arrived.clear()
+            for subdir in ("new", "cur"):
+                with os.scandir(os.path.join(self.path, subdir)) as entries:
+                    for entry in entries:
+                        if entry.name.startswith("."):
+                            continue
+                        key, _, info = entry.name.partition(":")
+                        if subdir == "new" or "S" not in info.partition(",")[2]:
+                            self._arrived[key] = entry.stat().st_mtime
+            return sorted(self._arrived, key=self._arrived.get)  # oldest first, like the Outlook inbox
+
+    def _message(self, key):
+        with self._lock:
+            msg = self._cache.get(key)
+            if msg is None:
+                inbox = self.handles()[0]
+                msg = self._cache[key] = inbox.get_message(key)
+            return msg
+
+    def fields(self, key):
+        """MailFields for a message - raises if it cannot be read (it stays unread for the next cycle)"""
+        with self._lock:
+            msg = self._message(key)
+            sender = email.utils.parseaddr(_header(msg["From"]))[1].lower() or "unknown"
+            subject = _header(msg["Subject"]).strip()
+            try:
+                body = _text_body(msg)[:BODY_CHARS]
+            except Exception:
+                body = ""
+            high_importance = (
+                str(msg.get("Importance", "")).lower() == "high"
+                or str(msg.get("X-Priority", "")).strip()[:1] in ("1", "2")
+            )
+            msg_id = str(msg.get("Message-ID") or "").strip() or key
+            return MailFields(msg_id, sender, subject, body, high_importance, self._arrived.get(key))
+
+    def forward(self, key, to, banner="", on_behalf_of=None):
+        with self._lock:
+            msg = self._message(key)
+            subject, sender, text = _header(msg['Subject']), _header(msg['From']), _text_body(msg)
+        fwd = Message()
+        fwd["From"] = on_behalf_of or "bot@localhost"
+        fwd["To"] = to
+        fwd["Subject"] = Header(f"FW: {subject}", "utf-8")
+        fwd["Date"] = email.utils.formatdate(localtime=True)
+        fwd["Message-ID"] = email.utils.make_msgid(domain=self.domain)
+        original = (
+            f"-----Original Message-----\n"
+            f"From: {sender}\n"
+            f"Subject: {subject}\n\n"
+        )
+        fwd.set_payload(banner + original + text, "utf-8")
+        with self._lock:
+            outbox = self.handles()[2]
+            outbox.add(fwd)
+
+    def tag(self, key, subject):
+        with self._lock:
+            msg = self._message(key)
+            del msg["Subject"]
+            msg["Subject"] = Header(subject, "utf-8")
+
+    def mark_read(self, key):
+        with self._lock:
+            msg = self._message(key)
+            msg.set_subdir("cur")
+            msg.add_flag("S")
+
+    def move(self, key):
+        with self._lock:
+            msg = self._message(key)
+            inbox, processed, outbox = self.handles()
+            processed.add(msg)
+            inbox.remove(key)
+            self._cache.pop(key, None)
+
+    def can_push(self):
+        return WATCHDOG_AVAILABLE
+
+    def subscribe(self, handles, callback):
+        """inotify (or the platform equivalent) on new/ - Maildir delivery renames into it"""
+        class _NewMail(FileSystemEventHandler):
+            def on_created(self, event):
+                callback()
+
+            def on_moved(self, event):
+                callback()
+
+        self.unwatch()
+        self._observer = Observer()
+        self._observer.schedule(_NewMail(), os.path.join(self.path, "new"), recursive=False)
+        self._observer.daemon = True
+        self._observer.start()
+
+    def unwatch(self):
+        super().unwatch()
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer.join(timeout=5)
+            self._observer = None
+
+    def deliver(self, subject, body="", sender="sender@example.com", high_importance=False):
+        """Drop a new message in the inbox (demo / benchmarks)"""
+        msg = Message()
+        msg["From"] = sender
+        msg["To"] = "helpdesk@localhost"
+        msg["Subject"] = Header(subject, "utf-8")
+        msg["Date"] = email.utils.formatdate(localtime=True)
+        msg["Message-ID"] = email.utils.make_msgid(domain=self.domain)
+        if high_importance:
+            msg["Importance"] = "High"
+        msg.set_payload(body, "utf-8")
+        with self._lock:
+            inbox = self.handles()[0]
+            return inbox.add(msg)
+
+
+# ==================== FAKE MAILBOX ====================
+class FakeRecipients:
+    def __init__(self):
+        self.addresses = []
+
+    def Add(self, address):
+        self.addresses.append(address)
+
+
+class FakeMessage:
+    """In-memory stand-in for an Outlook MailItem (the parts the bot uses)"""
+
+    _ids = count(1)
+
+    def __init__(self, subject, body="", sender="sender@example.com", high_importance=False, folder=None):
+        self.EntryID = f"FAKE{next(self._ids):012d}"
+        self.Subject = subject
+        self.Body = body
+        self.SenderEmailAddress = sender
+        self.Importance = 2 if high_importance else 1
+        self.ReceivedTime = datetime.now()
+        self.UnRead = True
+        self.Recipients = FakeRecipients()
+        self.SentOnBehalfOfName = None
+        self.folder = folder
+        self.sent = None  # outbox list, set on forwards
+
+    def Forward(self):
+        fwd = FakeMessage(f"FW: {self.Subject}", self.Body, self.SenderEmailAddress)
+        fwd.sent = self.folder.session.sent if self.folder else []
+        return fwd
+
+    def Send(self):
+        self.sent.append(self)
+
+    def Save(self):
+        pass
+
+    def Move(self, folder):
+        self.folder.remove(self)
+        folder.add(self)
+        return self
+
+
+class FakeItems:
+    def __init__(self, folder):
+        self.folder = folder
+
+    def Restrict(self, criteria):
+        if criteria.replace(" ", "").lower() != "[unread]=true":
+            raise ValueError(f"FakeItems only supports [UnRead] = True, got {criteria!r}")
+        return [m for m in self.folder.messages if m.UnRead]
+
+
+class FakeFolder:
+    def __init__(self, name, session):
+        self.Name = name
+        self.EntryID = f"FOLDER-{name}"
+        self.session = session
+        self.messages = []
+        self.Items = FakeItems(self)
+
+    def add(self, msg):
+        msg.folder = self
+        self.messages.append(msg)
+
+    def remove(self, msg):
+        self.messages.remove(msg)
+
+
+class FakeSession(MailSession):
+    """In-memory mailbox with an Inbox, a processed folder and a sent list"""
+
+    def __init__(self, processed_folder="Done", latency=0.0, **kwargs):
+        super().__init__(**kwargs)
+        self.inbox = FakeFolder("Inbox", self)
+        self.processed = FakeFolder(processed_folder, self)
+        self.sent = []
+        self.online = True  # set False to simulate Outlook going away
+        self.latency = latency  # seconds per simulated COM round trip
+
+    def _round_trips(self, n):
+        if self.latency:
+            time.sleep(self.latency * n)
+
+    def deliver(self, subject, body="", sender="sender@example.com", high_importance=False):
+        """Drop a new unread message in the inbox"""
+        msg = FakeMessage(subject, body, sender, high_importance)
+        self.inbox.add(msg)
+        if self._on_new_mail is not None and self.online:
+            self._on_new_mail()
+        return msg
+
+    def connect(self):
+        if not self.online:
+            raise MailboxError("Fake mailbox offline")
+        return self.inbox, self.processed
+
+    def is_valid(self, handles):
+        return self.online
+
+    def can_push(self):
+        return True
+
+    def subscribe(self, handles, callback):
+        pass  # deliver() calls it directly
+
+    # Simulated COM cost (latency > 0): one round trip per property read/write or call
+    def ref(self, msg):
+        self._round_trips(1)  # EntryID
+        return msg
+
+    def fields(self, msg):
+        self._round_trips(6)  # SenderEmailAddress, Subject, Body, Importance, EntryID, ReceivedTime
+        return super().fields(msg)
+
+    def forward(self, msg, to, banner="", on_behalf_of=None):
+        self._round_trips(5)  # Forward, Recipients.Add, Body, SentOnBehalfOfName, Send
+        super().forward(msg, to, banner, on_behalf_of)
+
+    def tag(self, msg, subject):
+        self._round_trips(2)  # Subject, Save
+        super().tag(msg, subject)
+
+    def mark_read(self, msg):
+        self._round_trips(1)
+        super().mark_read(msg)
+
+    def move(self, msg):
+        self._round_trips(1)
+        super().move(msg)
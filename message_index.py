@@ -0,0 +1,218 @@
+"""
+Message Index - Persistent record of every message the bot has forwarded
+
+A crash between forwarding a message and archiving it leaves the message
+unread, so the next cycle would forward it again. The index remembers
+each forward, so process_inbox can archive such a message instead:
+
+- keyed on a 16-byte BLAKE2 digest of the message ID (EntryID, Message-ID
+  or mail_session.stable_id()), in an SQLite table without rowids
+- a Bloom filter in memory answers "never seen" without touching the
+  database - the common case, since almost every unread message is new
+- a "maybe" from the filter costs one primary-key lookup
+- the filter holds ~1.8 MB per million messages (0.1% false positives);
+  it is resized as history grows, up to max_capacity - past that the
+  false-positive rate rises but answers stay exact
+- close() saves the filter next to the database (<path>.bloom), so a
+  clean restart loads it instead of rebuilding it from every row; the file
+  is removed on open, so after a crash the filter is always rebuilt
+"""
+
+import hashlib
+import math
+import os
+import sqlite3
+import struct
+import threading
+from datetime import datetime
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS dispatched (
+    key           BLOB PRIMARY KEY,
+    msg_id        TEXT,
+    assigned_to   TEXT,
+    tagged        TEXT,
+    risk_level    TEXT,
+    dispatched_at TEXT
+) WITHOUT ROWID;
+"""
+
+RECORD_FIELDS = ("msg_id", "assigned_to", "tagged", "risk_level", "dispatched_at")
+
+
+def digest(msg_id):
+    """16-byte key for a message ID"""
+    return hashlib.blake2b(msg_id.encode("utf-8", "surrogatepass"), digest_size=16).digest()
+
+
+class BloomFilter:
+    """Fixed-size Bloom filter over 16-byte digests (no false negatives)"""
+
+    def __init__(self, capacity, error_rate=0.001):
+        self.capacity = capacity
+        self.bits = max(64, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.bits / capacity * math.log(2)))
+        self._array = bytearray((self.bits + 7) // 8)
+        self.count = 0
+
+    def _positions(self, key):
+        # Double hashing: the digest already is two independent 64-bit hashes
+        h1 = int.from_bytes(key[:8], "little")
+        h2 = int.from_bytes(key[8:], "little") | 1
+        return ((h1 + i * h2) % self.bits for i in range(self.hashes))
+
+    def add(self, key):
+        for pos in self._positions(key):
+            self._array[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def __contains__(self, key):
+        array = self._array
+        return all(array[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(key))
+
+    _HEADER = struct.Struct("<QQQQ")  # capacity, bits, hashes, count
+
+    def save(self, path, rows):
+        """Write the filter to path, tagged with the number of rows it covers"""
+        with open(path, "wb") as f:
+            f.write(struct.pack("<Q", rows))
+            f.write(self._HEADER.pack(self.capacity, self.bits, self.hashes, self.count))
+            f.write(self._array)
+
+    @classmethod
+    def load(cls, path):
+        """(filter, rows) from save(), or (None, None) if unreadable"""
+        try:
+            with open(path, "rb") as f:
+                (rows,) = struct.unpack("<Q", f.read(8))
+                capacity, bits, hashes, count = cls._HEADER.unpack(f.read(cls._HEADER.size))
+                array = bytearray(f.read())
+        except (OSError, struct.error):
+            return None, None
+        if len(array) != (bits + 7) // 8:
+            return None, None
+        bloom = cls.__new__(cls)
+        bloom.capacity, bloom.bits, bloom.hashes, bloom.count = capacity, bits, hashes, count
+        bloom._array = array
+        return bloom, rows
+
+
+class MessageIndex:
+    """Forwarded messages, persisted to SQLite with a Bloom filter in front"""
+
+    def __init__(self, path, min_capacity=100_000, max_capacity=10_000_000, synchronous="NORMAL", on_error=None):
+        self.path = path
+        self.min_capacity = min_capacity
+        self.max_capacity = max_capacity
+        self.synchronous = synchronous
+        self.on_error = on_error
+
+        self._lock = threading.Lock()
+        self._conn = None
+        self._filter = BloomFilter(min_capacity)
+        self.lookups = 0     # get() calls
+        self.db_lookups = 0  # ...that had to ask the database
+
+    # ---------- database ----------
+    def open(self):
+        """Open (creating if needed) the database and build the filter"""
+        with self._lock:
+            if self._conn is not None:
+                return True
+            try:
+                conn = sqlite3.connect(self.path, timeout=5, check_same_thread=False)
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute(f"PRAGMA synchronous={self.synchronous}")
+                conn.executescript(SCHEMA)
+                self._conn = conn
+                self._load_filter()
+            except Exception as e:
+                self._conn = None
+                self._error(f"Error opening message index: {e}")
+                return False
+            return True
+
+    def _load_filter(self):
+        """The filter saved by close() if it matches the database, else a rebuilt one"""
+        saved = self.path + ".bloom"
+        bloom, rows = BloomFilter.load(saved) if os.path.exists(saved) else (None, None)
+        if bloom is not None and rows == self._conn.execute("SELECT COUNT(*) FROM dispatched").fetchone()[0]:
+            self._filter = bloom
+        else:
+            self._rebuild()
+        if os.path.exists(saved):
+            os.remove(saved)  # stale as soon as the next message is recorded
+
+    def _rebuild(self):
+        """New filter sized for twice the current history, filled from the database"""
+        stored = self._conn.execute("SELECT COUNT(*) FROM dispatched").fetchone()[0]
+        capacity = min(max(self.min_capacity, 2 * stored), self.max_capacity)
+        bloom = BloomFilter(capacity)
+        for (key,) in self._conn.execute("SELECT key FROM dispatched"):
+            bloom.add(key)
+        self._filter = bloom
+
+    def close(self):
+        """Close the database, saving the filter for the next start"""
+        with self._lock:
+            if self._conn is None:
+                return
+            try:
+                rows = self._conn.execute("SELECT COUNT(*) FROM dispatched").fetchone()[0]
+                self._filter.save(self.path + ".bloom", rows)
+            except Exception as e:
+                self._error(f"Error saving message index filter: {e}")
+            self._conn.close()
+            self._conn = None
+
+    # ---------- public ----------
+    def get(self, msg_id):
+        """The record of an earlier forward of msg_id ({field: value}), or None"""
+        if self._conn is None and not self.open():
+            return None
+        key = digest(msg_id)
+        self.lookups += 1
+        if key not in self._filter:
+            return None
+        with self._lock:
+            self.db_lookups += 1
+            try:
+                row = self._conn.execute(
+                    f"SELECT {', '.join(RECORD_FIELDS)} FROM dispatched WHERE key = ?", (key,)
+                ).fetchone()
+            except Exception as e:
+                self._error(f"Error reading message index: {e}")
+                return None
+        return dict(zip(RECORD_FIELDS, row)) if row else None
+
+    def __contains__(self, msg_id):
+        return self.get(msg_id) is not None
+
+    def add(self, msg_id, assigned_to, tagged, risk_level="normal"):
+        """Record that msg_id has been forwarded - its own transaction"""
+        if self._conn is None and not self.open():
+            return
+        key = digest(msg_id)
+        with self._lock:
+            try:
+                with self._conn:
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO dispatched VALUES (?, ?, ?, ?, ?, ?)",
+                        (key, msg_id, assigned_to, tagged, risk_level, datetime.now().isoformat())
+                    )
+            except Exception as e:
+                self._error(f"Error saving message index entry {msg_id}: {e}")
+                return
+            self._filter.add(key)
+            if self._filter.count > self._filter.capacity and self._filter.capacity < self.max_capacity:
+                self._rebuild()
+
+    def __len__(self):
+        with self._lock:
+            if self._conn is None:
+                return 0
+            return self._conn.execute("SELECT COUNT(*) FROM dispatched").fetchone()[0]
+
+    def _error(self, msg):
+        if self.on_error:
+            self.on_error(msg)
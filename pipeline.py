@@ -0,0 +1,137 @@
+"""
+Staged Pipeline - per-message mailbox work on bounded worker pools
+
+process_inbox decides, in arrival order, what happens to each message
+(smart filter, risk check, round-robin assignment, watchdog). The slow
+mailbox I/O around that decision does not depend on other messages, so
+it runs here:
+
+- prefetch(fn, items) reads ahead on a worker pool and yields the results
+  in input order, so the decisions are still made one by one, in order
+- each stage has its own bounded queue and `workers` threads
+- an item passes through the stages in order; a stage returning None
+  ends its journey early
+- submit() blocks while the first queue is full (backpressure)
+- join() waits until every submitted item has left the pipeline
+- an error in a stage is reported through on_error and drops that item only
+- without start(), submit() runs the stages inline on the caller's thread
+"""
+
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+_STOP = object()
+
+
+class StagedPipeline:
+    """Stages connected by bounded queues, each served by its own worker threads"""
+
+    def __init__(self, stages, workers=4, queue_size=64, thread_init=None, on_error=None):
+        self.stages = list(stages)      # [(name, fn)] - fn(item) -> item for the next stage, or None
+        self.workers = workers
+        self.queue_size = queue_size
+        self.thread_init = thread_init  # called once in every worker thread (e.g. COM init)
+        self.on_error = on_error
+
+        self._queues = []
+        self._threads = []
+        self._readers = None            # prefetch pool
+        self._pending = 0               # submitted, not yet out of the last stage
+        self._idle = threading.Condition()
+        self.failed = 0                 # items dropped by a stage error, for diagnostics
+
+    # ---------- stages ----------
+    def _run_stage(self, index, item):
+        name, fn = self.stages[index]
+        try:
+            return fn(item)
+        except Exception as e:
+            with self._idle:
+                self.failed += 1
+            if self.on_error:
+                self.on_error(f"Error in {name} stage: {e}")
+            return None
+
+    def _done(self):
+        with self._idle:
+            self._pending -= 1
+            if self._pending == 0:
+                self._idle.notify_all()
+
+    def _init(self):
+        if self.thread_init:
+            try:
+                self.thread_init()
+            except Exception as e:
+                if self.on_error:
+                    self.on_error(f"Pipeline worker init failed: {e}")
+
+    def _worker(self, index):
+        self._init()
+        inbox = self._queues[index]
+        forward_to = self._queues[index + 1] if index + 1 < len(self._queues) else None
+        while True:
+            item = inbox.get()
+            if item is _STOP:
+                return
+            result = self._run_stage(index, item)
+            if result is not None and forward_to is not None:
+                forward_to.put(result)
+            else:
+                self._done()
+
+    # ---------- public ----------
+    def submit(self, item):
+        """Queue item for the first stage (inline if the pipeline is not started)"""
+        if not self._threads:
+            for index in range(len(self.stages)):
+                item = self._run_stage(index, item)
+                if item is None:
+                    break
+            return
+        with self._idle:
+            self._pending += 1
+        self._queues[0].put(item)
+
+    def prefetch(self, fn, items):
+        """fn(item) for every item, computed ahead by the workers, yielded in order"""
+        if self._readers is None:
+            return map(fn, items)
+        return self._readers.map(fn, items)
+
+    def join(self, timeout=None):
+        """Wait until every submitted item has left the pipeline. False on timeout."""
+        with self._idle:
+            return self._idle.wait_for(lambda: self._pending == 0, timeout)
+
+    def pending(self):
+        return self._pending
+
+    def start(self):
+        """Start the worker threads (idempotent)"""
+        if self._threads:
+            return True
+        self._queues = [queue.Queue(self.queue_size) for _ in self.stages]
+        self._readers = ThreadPoolExecutor(self.workers, thread_name_prefix="read", initializer=self._init)
+        for index, (name, _) in enumerate(self.stages):
+            for n in range(self.workers):
+                thread = threading.Thread(target=self._worker, args=(index,), name=f"{name}-{n}", daemon=True)
+                thread.start()
+                self._threads.append(thread)
+        return True
+
+    def stop(self):
+        """Finish the queued items, then stop the workers"""
+        if not self._threads:
+            return
+        self.join()
+        for q in self._queues:
+            for _ in range(self.workers):
+                q.put(_STOP)
+        for thread in self._threads:
+            thread.join(timeout=10)
+        self._readers.shutdown(wait=True)
+        self._threads = []
+        self._queues = []
+        self._readers = None
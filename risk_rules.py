@@ -0,0 +1,254 @@
+"""
+Risk Rules - External, hot-reloadable rules file for detect_risk
+
+The vocabulary, match mode and the rules themselves live in risk_rules.json.
+Edit the file while the bot is running and the new rules take effect on the
+next message - no restart, no re-walk of the Outlook folders.
+
+Rules file format:
+{
+    "match_mode": "token",            # or "substring"
+    "fuzzy": false,                   # typo-tolerant actions/urgency words
+    "vocabulary": {"actions": [...], "context": [...], "urgency": [...],
+                   "fuzzy_exclude": [...]},
+    "rules": [                        # first match wins
+        {"name": "...", "when": ["actions", "context"],
+         "level": "critical", "reason": "Action+Context: {actions}+{context}"}
+    ]
+}
+
+"when" can use: high_importance, actions, context, urgency.
+"reason" can use {actions}, {context}, {urgency} (the first word found).
+
+detect_risk_many() classifies a batch (replays/backfills) without a running
+bot - importing this module opens no files, mailboxes or threads.
+"""
+
+import json
+import numbers
+import os
+import threading
+import time
+
+from risk_engine import RiskRules
+
+# File monitoring is optional - fall back to checking the mtime
+try:
+    from watchdog.events import FileSystemEventHandler
+    from watchdog.observers import Observer
+    WATCHDOG_AVAILABLE = True
+except ImportError:
+    WATCHDOG_AVAILABLE = False
+
+# ==================== DEFAULT RULES ====================
+# Risk Detection: (Action + Context) OR (Urgency + Action) OR (High Importance)
+DEFAULT_RULES = {
+    "match_mode": "token",
+    "fuzzy": False,
+    "vocabulary": {
+        "actions": [
+            "delete", "deletion", "remove", "unlink", "purge", "erase", "destroy",
+            "cancel", "void", "nullify", "terminate",
+            "merge", "merging", "merged", "split", "splitting",
+            "combine", "duplicate", "dedupe", "dedup"
+        ],
+        "context": [
+            "patient", "scan", "accession", "study", "exam", "report",
+            "imaging", "dicom", "mri", "ct", "ultrasound", "xray", "x-ray",
+            "record", "data", "file", "prior", "comparison"
+        ],
+        "urgency": [
+            "stat", "asap", "urgent", "emergency", "critical", "immediate",
+            "now", "rush", "priority", "life-threatening", "code"
+        ],
+        # Real words one typo away from a risk word - never treated as typos
+        "fuzzy_exclude": [
+            "remote", "cancer", "purse", "surge", "merger", "verge", "emerge",
+            "emergence", "spilt", "spit", "splint", "prioritise", "prioritize"
+        ]
+    },
+    "rules": [
+        {
+            "name": "high_importance",
+            "when": ["high_importance"],
+            "level": "critical",
+            "reason": "Outlook High Importance Flag"
+        },
+        {
+            "name": "action_context",
+            "when": ["actions", "context"],
+            "level": "critical",
+            "reason": "Action+Context: {actions}+{context}"
+        },
+        {
+            "name": "urgency_action",
+            "when": ["urgency", "actions"],
+            "level": "critical",
+            "reason": "Urgency+Action: {urgency}+{actions}"
+        },
+        {
+            "name": "urgency",
+            "when": ["urgency"],
+            "level": "urgent",
+            "reason": "Urgency: {urgency}"
+        },
+        {
+            "name": "action",
+            "when": ["actions"],
+            "level": "urgent",
+            "reason": "Action detected: {actions}"
+        }
+    ]
+}
+
+
+# ==================== FILE OPERATIONS ====================
+def load_rules(path):
+    """Read and compile a rules file. Raises on bad JSON or invalid rules."""
+    with open(path, 'r', encoding='utf-8') as f:
+        return RiskRules(json.load(f))
+
+
+def save_rules(path, config=DEFAULT_RULES):
+    """Write a rules file (defaults if no config given)"""
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(config, f, indent=4)
+
+
+# ==================== BATCH CLASSIFICATION ====================
+# Outlook MailItem.Importance: 0 = low, 1 = normal, 2 = high
+OUTLOOK_IMPORTANCE_HIGH = 2
+
+
+def is_high_importance(importance):
+    """
+    Whether a message's importance is high. Takes a bool, Outlook's
+    Importance (0/1/2) or an Importance header value (low/normal/high);
+    None counts as normal. Anything else raises ValueError - Outlook's
+    1 (normal) is truthy, so it must never be read as a flag.
+    """
+    if importance is None or isinstance(importance, bool):
+        return bool(importance)
+    if isinstance(importance, numbers.Integral) and 0 <= importance <= 2:
+        return importance == OUTLOOK_IMPORTANCE_HIGH
+    if isinstance(importance, str):
+        value = importance.strip().lower()
+        if value in ("", "low", "normal", "high", "0", "1", "2"):
+            return value in ("high", str(OUTLOOK_IMPORTANCE_HIGH))
+    raise ValueError(f"Unknown message importance: {importance!r} (expected a bool, 0/1/2 or low/normal/high)")
+
+
+def detect_risk_many(messages, rules=None, workers=None):
+    """
+    Batch risk detection for replays/backfills.
+
+    messages: iterable of (subject, body, importance) tuples - importance
+              as is_high_importance() reads it (Outlook's 2 = high)
+    rules: a RiskRules, or the path of a rules file (None or a missing
+           file: the built-in defaults)
+    workers: spread the batch over this many processes (None = in-process)
+
+    Yields (level, reason) records in input order.
+    """
+    if not isinstance(rules, RiskRules):
+        rules = load_rules(rules) if rules and os.path.exists(rules) else RiskRules(DEFAULT_RULES)
+    flagged = ((subject, body, is_high_importance(importance)) for subject, body, importance in messages)
+    return rules.classify_many(flagged, workers=workers)
+
+
+# ==================== HOT RELOAD ====================
+class RulesWatcher:
+    """
+    Holds the live RiskRules and swaps in a new table when the file changes.
+
+    Call current() once per message and use what it returns for that whole
+    message - a reload can only ever land between messages. The file is
+    stat'ed at most once per check_interval seconds; with the optional
+    `watchdog` package, a change event makes the very next call check.
+
+    If the file is missing the built-in defaults are used. If an edited file
+    is invalid, the previous rules stay live and on_error is called.
+    """
+
+    def __init__(self, path, check_interval=1.0, on_reload=None, on_error=None):
+        self.path = path
+        self.check_interval = check_interval
+        self.on_reload = on_reload
+        self.on_error = on_error
+
+        self._lock = threading.Lock()
+        self._version = None
+        self._next_check = 0.0
+        self._changed = threading.Event()
+        self._observer = None
+
+        self.rules = RiskRules(DEFAULT_RULES)
+        self.loaded_at = None
+        self.current()
+
+    def _file_version(self):
+        try:
+            st = os.stat(self.path)
+            return (st.st_mtime_ns, st.st_size)
+        except OSError:
+            return None
+
+    def current(self):
+        """The live RiskRules, reloading first if the file has changed"""
+        now = time.monotonic()
+        if now < self._next_check and not self._changed.is_set():
+            return self.rules
+        self._next_check = now + self.check_interval
+        self._changed.clear()
+
+        version = self._file_version()
+        if version != self._version:
+            self.reload(version)
+        return self.rules
+
+    def reload(self, version=None):
+        """Recompile from the file and swap it in (no-op if the file is missing)"""
+        with self._lock:
+            version = version if version is not None else self._file_version()
+            self._version = version
+            if version is None:
+                return self.rules
+            try:
+                new_rules = load_rules(self.path)
+            except Exception as e:
+                if self.on_error:
+                    self.on_error(e)
+                return self.rules
+
+            new_rules.inherit_stats(self.rules)
+            self.rules = new_rules  # single reference swap
+            self.loaded_at = time.time()
+            if self.on_reload:
+                self.on_reload(new_rules)
+            return new_rules
+
+    def start(self):
+        """Start push notifications for the file (only if `watchdog` is installed)"""
+        if not WATCHDOG_AVAILABLE or self._observer is not None:
+            return False
+
+        watcher = self
+        target = os.path.abspath(self.path)
+
+        class _Handler(FileSystemEventHandler):
+            def on_any_event(self, event):
+                paths = (getattr(event, "src_path", None), getattr(event, "dest_path", None))
+                if target in (os.path.abspath(p) for p in paths if p):
+                    watcher._changed.set()
+
+        self._observer = Observer()
+        self._observer.schedule(_Handler(), os.path.dirname(target), recursive=False)
+        self._observer.daemon = True
+        self._observer.start()
+        return True
+
+    def stop(self):
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer.join(timeout=5)
+            self._observer = None
@@ -0,0 +1,247 @@
+"""
+Roster - In-memory round-robin roster
+
+Keeps the staff list and the rotation index in memory so assigning a ticket
+is a list index and a counter bump - no file reads or writes per ticket.
+
+- staff.txt is re-read only when its mtime/size changes (checked at most
+  once per staff_check_interval seconds)
+- a StaffIndex (set lookup + aliases) is rebuilt alongside it for the
+  smart filter
+- roster_state.json is written by a background thread shortly after it
+  changes, and once more on stop()
+"""
+
+import json
+import os
+import threading
+import time
+
+
+def read_staff_file(path):
+    """Staff emails from a staff.txt-style file (lowercased, # comments skipped)"""
+    if not os.path.exists(path):
+        return []
+    with open(path, 'r') as f:
+        return [line.strip().lower() for line in f if line.strip() and not line.startswith('#')]
+
+
+def read_alias_file(path):
+    """
+    Aliases from a staff_aliases.txt-style file (optional):
+
+        b.shaw@sa.gov.au = brian.shaw@sa.gov.au      # another address for a person
+        @health.sa.gov.au = @sa.gov.au               # another domain for everyone
+
+    Returns (aliases, domain_aliases) dicts, lowercased.
+    """
+    aliases, domains = {}, {}
+    if not path or not os.path.exists(path):
+        return aliases, domains
+    with open(path, 'r') as f:
+        for line in f:
+            line = line.split('#', 1)[0].strip().lower()
+            if '=' not in line:
+                continue
+            alias, canonical = (part.strip() for part in line.split('=', 1))
+            if alias.startswith('@') and canonical.startswith('@'):
+                domains[alias[1:]] = canonical[1:]
+            elif alias and canonical:
+                aliases[alias] = canonical
+    return aliases, domains
+
+
+class StaffIndex:
+    """
+    Normalized staff lookup for the smart filter.
+
+    `email in index` is a frozenset/dict lookup whatever the roster size.
+    resolve() maps an alias or alternate-domain address to the staff.txt
+    address (a domain alias is applied once, so cycles cannot loop).
+    """
+
+    def __init__(self, staff, aliases=None, domain_aliases=None):
+        self.members = frozenset(staff)
+        self.aliases = {a: c for a, c in (aliases or {}).items() if c in self.members}
+        self.domain_aliases = dict(domain_aliases or {})
+
+    def resolve(self, email):
+        """staff.txt address for email, or None if it is not a staff member"""
+        email = email.strip().lower()
+        if email in self.members:
+            return email
+        canonical = self.aliases.get(email)
+        if canonical:
+            return canonical
+        if self.domain_aliases:
+            local, _, domain = email.rpartition('@')
+            if local and domain in self.domain_aliases:
+                # One domain hop only - chained or cyclic domain aliases
+                # (a.org -> b.org -> a.org) are not followed
+                email = f"{local}@{self.domain_aliases[domain]}"
+                return email if email in self.members else self.aliases.get(email)
+        return None
+
+    def __contains__(self, email):
+        if email in self.members:  # fast path: already a normalized staff address
+            return True
+        return self.resolve(email) is not None
+
+    def __len__(self):
+        return len(self.members)
+
+
+class Roster:
+    """Round-robin staff rotation held in memory, persisted in the background"""
+
+    def __init__(self, staff_file, state_file, alias_file=None, flush_interval=2.0,
+                 staff_check_interval=1.0, on_error=None):
+        self.staff_file = staff_file
+        self.state_file = state_file
+        self.alias_file = alias_file
+        self.flush_interval = flush_interval
+        self.staff_check_interval = staff_check_interval
+        self.on_error = on_error
+
+        self._lock = threading.Lock()
+        self._staff = []
+        self._index = StaffIndex([])
+        self._staff_version = None
+        self._next_staff_check = 0.0
+
+        self._state = self._load_state()
+        self._dirty = False
+        self._wake = threading.Event()
+        self._stopping = False
+        self._thread = None
+
+    # ---------- staff list ----------
+    def _file_version(self):
+        version = []
+        for path in (self.staff_file, self.alias_file):
+            try:
+                st = os.stat(path) if path else None
+                version.append((st.st_mtime_ns, st.st_size) if st else None)
+            except OSError:
+                version.append(None)
+        return tuple(version)
+
+    def _refresh(self):
+        """Re-read staff.txt (and aliases) if either changed since last time"""
+        now = time.monotonic()
+        if now < self._next_staff_check:
+            return
+        self._next_staff_check = now + self.staff_check_interval
+        version = self._file_version()
+        if version == self._staff_version:
+            return
+        try:
+            staff = read_staff_file(self.staff_file)
+            aliases, domains = read_alias_file(self.alias_file)
+            self._index = StaffIndex(staff, aliases, domains)
+            self._staff = staff
+            self._staff_version = version
+        except Exception as e:
+            self._error(f"Error loading staff list: {e}")
+
+    def staff(self):
+        """Current staff list (cached; reloaded when staff.txt changes)"""
+        self._refresh()
+        return self._staff
+
+    def staff_index(self):
+        """StaffIndex for the current staff list (rebuilt only when files change)"""
+        self._refresh()
+        return self._index
+
+    def invalidate(self):
+        """Force staff.txt to be re-checked on the next call"""
+        self._next_staff_check = 0.0
+
+    # ---------- rotation ----------
+    def _load_state(self):
+        try:
+            if os.path.exists(self.state_file):
+                with open(self.state_file, 'r') as f:
+                    return json.load(f)
+        except Exception:
+            pass
+        return {"current_index": 0, "total_processed": 0}
+
+    def state(self):
+        """Copy of the rotation state ({"current_index", "total_processed"})"""
+        with self._lock:
+            return dict(self._state)
+
+    def next_staff(self):
+        """Next staff member in rotation, or None if there is no staff"""
+        staff = self.staff()
+        if not staff:
+            return None
+
+        with self._lock:
+            idx = self._state.get("current_index", 0)
+            person = staff[idx % len(staff)]
+            self._state["current_index"] = idx + 1
+            self._state["total_processed"] = self._state.get("total_processed", 0) + 1
+            self._dirty = True
+
+        if self._thread is None:
+            self.flush()  # no background writer running - persist now
+        return person
+
+    def restore(self, state):
+        """Fast-forward to a newer rotation state (e.g. from the dispatch journal). True if applied."""
+        with self._lock:
+            if state.get("total_processed", 0) <= self._state.get("total_processed", 0):
+                return False
+            self._state = {"current_index": state.get("current_index", 0),
+                           "total_processed": state["total_processed"]}
+            self._dirty = True
+        if self._thread is None:
+            self.flush()
+        return True
+
+    # ---------- persistence ----------
+    def flush(self):
+        """Write roster_state.json now if it has changed"""
+        with self._lock:
+            if not self._dirty:
+                return
+            snapshot = dict(self._state)
+            self._dirty = False
+        try:
+            tmp = self.state_file + ".tmp"
+            with open(tmp, 'w') as f:
+                json.dump(snapshot, f, indent=4)
+            os.replace(tmp, self.state_file)
+        except Exception as e:
+            with self._lock:
+                self._dirty = True
+            self._error(f"Error saving roster state: {e}")
+
+    def _run(self):
+        while not self._stopping:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
+
+    def start(self):
+        """Start the background state writer"""
+        if self._thread is None:
+            self._stopping = False
+            self._thread = threading.Thread(target=self._run, name="roster-writer", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """Stop the background writer and flush any pending state"""
+        if self._thread is not None:
+            self._stopping = True
+            self._wake.set()
+            self._thread.join(timeout=5)
+            self._thread = None
+        self.flush()
+
+    def _error(self, msg):
+        if self.on_error:
+            self.on_error(msg)
@@ -0,0 +1,297 @@
+"""
+SLA Watchdog - Deadline-ordered, transactional store of open urgent tickets
+
+Tickets are held in memory next to a timer wheel keyed by SLA deadline
+(timer_wheel.py), so a breach check only touches tickets whose deadline has
+passed:
+
+- add / remove / rearm cost O(1)
+- breached() costs O(k) for k breached tickets, next to nothing when none are
+- next_deadline() says when to check next, so the bot can sleep until the
+  moment a deadline passes instead of polling
+- the clock is injectable (clock=, e.g. a SimulatedClock), so simulated
+  hours of SLA timers run in milliseconds
+
+Every change is also written straight to an SQLite database (WAL mode) as a
+single-row upsert or delete, so a crash can never truncate the watchdog and
+lose the SLA timers. The dashboard reads the same database with
+read_tickets() while the bot writes - WAL readers never block the writer.
+
+The old urgent_watchdog.json is imported once by migrate_json().
+"""
+
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+
+from timer_wheel import TimerWheel
+
+TICKET_FIELDS = ("subject", "assigned_to", "sender", "risk_type", "timestamp", "escalation_count")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tickets (
+    msg_id           TEXT PRIMARY KEY,
+    subject          TEXT,
+    assigned_to      TEXT,
+    sender           TEXT,
+    risk_type        TEXT,
+    timestamp        TEXT NOT NULL,
+    escalation_count INTEGER NOT NULL DEFAULT 0,
+    deadline         TEXT
+);
+CREATE INDEX IF NOT EXISTS tickets_by_deadline ON tickets (deadline);
+"""
+
+UPSERT = """
+INSERT INTO tickets (msg_id, subject, assigned_to, sender, risk_type, timestamp, escalation_count, deadline)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (msg_id) DO UPDATE SET
+    subject = excluded.subject,
+    assigned_to = excluded.assigned_to,
+    sender = excluded.sender,
+    risk_type = excluded.risk_type,
+    timestamp = excluded.timestamp,
+    escalation_count = excluded.escalation_count,
+    deadline = excluded.deadline
+"""
+
+
+def read_tickets(path, json_fallback=None):
+    """
+    Open tickets ({msg_id: ticket}) for readers such as the dashboard.
+
+    Opens the database read-only, so it never blocks or locks the bot. Falls
+    back to the old JSON file if the database has not been created yet.
+    """
+    try:
+        if os.path.exists(path):
+            conn = sqlite3.connect(f"file:{os.path.abspath(path)}?mode=ro", uri=True, timeout=5)
+            try:
+                rows = conn.execute(
+                    f"SELECT msg_id, {', '.join(TICKET_FIELDS)} FROM tickets ORDER BY deadline"
+                ).fetchall()
+            finally:
+                conn.close()
+            return {row[0]: dict(zip(TICKET_FIELDS, row[1:])) for row in rows}
+        if json_fallback and os.path.exists(json_fallback):
+            with open(json_fallback, 'r') as f:
+                return json.load(f)
+    except Exception:
+        pass
+    return {}
+
+
+class SimulatedClock:
+    """Clock for tests and benchmarks: time only moves when advance() is called"""
+
+    def __init__(self, start=None):
+        self._now = start or datetime(2026, 1, 1, 9, 0)
+
+    def __call__(self):
+        return self._now
+
+    def advance(self, seconds):
+        self._now += timedelta(seconds=seconds)
+        return self._now
+
+
+class SlaWatchdog:
+    """Open urgent tickets scheduled by SLA deadline, persisted to SQLite"""
+
+    def __init__(self, path, sla_minutes, synchronous="NORMAL", clock=datetime.now, tick=0.1,
+                 on_schedule=None, on_error=None):
+        self.path = path
+        self.sla = timedelta(minutes=sla_minutes)
+        self.synchronous = synchronous  # NORMAL: survives a bot crash; FULL: also a power cut
+        self.clock = clock              # () -> datetime
+        self.on_schedule = on_schedule  # called when a deadline is (re)armed - to re-plan a sleep
+        self.on_error = on_error
+
+        self._lock = threading.RLock()
+        self._conn = None
+        self._tickets = {}   # msg_id -> ticket dict
+        self._wheel = TimerWheel(tick=tick, start=clock().timestamp())
+        self._due = {}       # msg_id -> deadline, for tickets past it (until rearm/remove)
+
+    # ---------- database ----------
+    def open(self):
+        """Open (creating if needed) the database and load the open tickets"""
+        with self._lock:
+            if self._conn is not None:
+                return True
+            try:
+                conn = sqlite3.connect(self.path, timeout=5, check_same_thread=False)
+                conn.execute("PRAGMA journal_mode=WAL")
+                conn.execute(f"PRAGMA synchronous={self.synchronous}")
+                conn.executescript(SCHEMA)
+                rows = conn.execute(f"SELECT msg_id, {', '.join(TICKET_FIELDS)} FROM tickets").fetchall()
+            except Exception as e:
+                self._error(f"Error opening watchdog database: {e}")
+                return False
+            self._conn = conn
+
+            stored = set()
+            for row in rows:
+                stored.add(row[0])
+                if row[0] not in self._tickets:
+                    self._tickets[row[0]] = dict(zip(TICKET_FIELDS, row[1:]))
+                    self._push(row[0], self._tickets[row[0]])
+            # Changes made while the database was unavailable
+            for msg_id in self._tickets.keys() - stored:
+                self._write(msg_id)
+            return True
+
+    def _write(self, msg_id):
+        """Upsert (or delete, if it is gone) one ticket - its own transaction"""
+        if self._conn is None and not self.open():
+            return
+        ticket = self._tickets.get(msg_id)
+        try:
+            with self._conn:
+                if ticket is None:
+                    self._conn.execute("DELETE FROM tickets WHERE msg_id = ?", (msg_id,))
+                else:
+                    self._conn.execute(UPSERT, self._row(msg_id, ticket))
+        except Exception as e:
+            self._error(f"Error saving watchdog ticket {msg_id}: {e}")
+
+    def _row(self, msg_id, ticket):
+        deadline = self._deadline(ticket)
+        return (
+            msg_id,
+            *(ticket.get(f) for f in TICKET_FIELDS if f != "escalation_count"),
+            ticket.get("escalation_count") or 0,
+            deadline.isoformat() if deadline else None
+        )
+
+    def migrate_json(self, json_path):
+        """
+        One-off import of an old urgent_watchdog.json. The file is renamed to
+        *.migrated afterwards. Returns the number of tickets imported.
+        """
+        if not os.path.exists(json_path):
+            return 0
+        with self._lock:
+            if not self.open():
+                return 0
+            try:
+                with open(json_path, 'r') as f:
+                    data = json.load(f)
+                new = {msg_id: {f: t.get(f) for f in TICKET_FIELDS}
+                       for msg_id, t in data.items() if msg_id not in self._tickets}
+                with self._conn:  # all or nothing
+                    self._conn.executemany(UPSERT, [self._row(m, t) for m, t in new.items()])
+                for msg_id, ticket in new.items():
+                    self._tickets[msg_id] = ticket
+                    self._push(msg_id, ticket)
+                os.replace(json_path, json_path + ".migrated")
+                return len(new)
+            except Exception as e:
+                self._error(f"Error migrating {json_path}: {e}")
+                return 0
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    # ---------- scheduling ----------
+    def _deadline(self, ticket):
+        try:
+            return datetime.fromisoformat(ticket["timestamp"]) + self.sla
+        except Exception:
+            return None
+
+    def _push(self, msg_id, ticket):
+        """(Re)schedule msg_id from its ticket timestamp - O(1)"""
+        self._due.pop(msg_id, None)
+        deadline = self._deadline(ticket)
+        if deadline is None:
+            self._wheel.cancel(msg_id)
+            self._error(f"Bad timestamp for watchdog ticket {msg_id}: {ticket.get('timestamp')!r}")
+            return
+        if deadline <= self.clock():
+            self._wheel.cancel(msg_id)
+            self._due[msg_id] = deadline  # already overdue (e.g. loaded after downtime)
+        else:
+            self._wheel.schedule(msg_id, deadline.timestamp())
+        if self.on_schedule:
+            self.on_schedule()
+
+    def next_deadline(self):
+        """When the next breach can happen (datetime, at or before it), or None"""
+        with self._lock:
+            if self._due:
+                return min(self._due.values())
+            when = self._wheel.next_expiry()
+            return datetime.fromtimestamp(when) if when is not None else None
+
+    # ---------- tickets ----------
+    def add(self, msg_id, ticket):
+        """Start (or restart) the SLA timer for a ticket"""
+        with self._lock:
+            self.open()
+            self._tickets[msg_id] = {f: ticket.get(f) for f in TICKET_FIELDS}
+            self._push(msg_id, self._tickets[msg_id])
+            self._write(msg_id)
+
+    def remove(self, msg_id):
+        """Stop the timer for a ticket. Returns False if it was not being watched"""
+        with self._lock:
+            self.open()
+            if self._tickets.pop(msg_id, None) is None:
+                return False
+            self._wheel.cancel(msg_id)
+            self._due.pop(msg_id, None)
+            self._write(msg_id)
+            return True
+
+    def breached(self, now=None):
+        """
+        [(msg_id, ticket copy, elapsed)] for tickets past their deadline.
+
+        Tickets stay scheduled at their old deadline until rearm() is called,
+        so one that fails to escalate is reported again on the next check.
+        """
+        now = now or self.clock()
+        with self._lock:
+            self.open()
+            for msg_id, _ in self._wheel.advance(now.timestamp()):
+                self._due[msg_id] = self._deadline(self._tickets[msg_id])
+            found = sorted(self._due.items(), key=lambda item: item[1])
+            return [
+                (msg_id, dict(self._tickets[msg_id]), now - (deadline - self.sla))
+                for msg_id, deadline in found if deadline <= now
+            ]
+
+    def rearm(self, msg_id, now=None, **updates):
+        """Reset a ticket's SLA timer to now (plus any field updates)"""
+        now = now or self.clock()
+        with self._lock:
+            self.open()
+            ticket = self._tickets.get(msg_id)
+            if ticket is None:
+                return
+            ticket.update(updates)
+            ticket["timestamp"] = now.isoformat()
+            self._push(msg_id, ticket)
+            self._write(msg_id)
+
+    def tickets(self):
+        """Copy of all open tickets ({msg_id: ticket})"""
+        with self._lock:
+            self.open()
+            return {msg_id: dict(t) for msg_id, t in self._tickets.items()}
+
+    def __len__(self):
+        return len(self._tickets)
+
+    def __contains__(self, msg_id):
+        return msg_id in self._tickets
+
+    def _error(self, msg):
+        if self.on_error:
+            self.on_error(msg)
@@ -0,0 +1,225 @@
+"""
+SMTP Pool - Persistent SMTP connections, plus a local debug server
+
+SmtpPool keeps up to `size` connections to the mail server open and hands
+them out to senders, so a burst of escalations pays for the TCP (+ TLS +
+login) handshake once per connection instead of once per email:
+
+- connections are reused (most recently used first) until the server
+  drops them; one idle for longer than idle_check seconds is probed with a
+  NOOP before use
+- a connection that fails mid-send is discarded, never returned to the pool;
+  a send that finds its pooled connection dropped is retried once on a new one
+- at most `size` connections exist at a time - extra senders wait
+
+DebugSmtpServer is a minimal local SMTP server that accepts everything and
+keeps the messages in memory - a stand-in for the real server in demos,
+tests and benchmarks (with optional simulated handshake / per-message
+latency). It speaks just enough SMTP for smtplib.
+"""
+
+import smtplib
+import socketserver
+import threading
+import time
+from collections import deque
+from email import message_from_bytes
+from email.policy import default as DEFAULT_POLICY
+
+
+class SmtpPool:
+    """Bounded pool of reusable SMTP connections"""
+
+    def __init__(self, host, port=25, size=4, username=None, password=None, starttls=False,
+                 timeout=30, idle_check=60, factory=smtplib.SMTP):
+        self.host = host
+        self.port = port
+        self.size = size
+        self.username = username
+        self.password = password
+        self.starttls = starttls
+        self.timeout = timeout
+        self.idle_check = idle_check  # seconds idle before a connection is NOOP-checked
+        self.factory = factory
+
+        self._lock = threading.Lock()
+        self._idle = []                                 # [(conn, last used)], most recent last
+        self._slots = threading.BoundedSemaphore(size)  # one per connection in use
+        self._closed = False
+        self.opened = 0                                 # connections opened so far
+        self.sent = 0
+
+    def _connect(self):
+        conn = self.factory(self.host, self.port, timeout=self.timeout)
+        try:
+            if self.starttls:
+                conn.starttls()
+            if self.username:
+                conn.login(self.username, self.password or "")
+        except Exception:
+            self._discard(conn)
+            raise
+        with self._lock:
+            self.opened += 1
+        return conn
+
+    @staticmethod
+    def _discard(conn):
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def _checkout(self):
+        """An idle connection that still works, or a new one"""
+        while True:
+            with self._lock:
+                if not self._idle:
+                    break
+                conn, last_used = self._idle.pop()
+            if time.monotonic() - last_used < self.idle_check:
+                return conn, True
+            try:
+                if conn.noop()[0] == 250:
+                    return conn, True
+            except Exception:
+                pass
+            self._discard(conn)
+        return self._connect(), False
+
+    def send(self, message):
+        """Send one email.message.EmailMessage (raises on failure)"""
+        self._slots.acquire()
+        try:
+            conn, pooled = self._checkout()
+            try:
+                try:
+                    conn.send_message(message)
+                except smtplib.SMTPServerDisconnected:
+                    if not pooled:
+                        raise
+                    # The server closed a pooled connection between uses - retry once on a new one
+                    self._discard(conn)
+                    conn = self._connect()
+                    conn.send_message(message)
+            except Exception:
+                self._discard(conn)
+                raise
+            with self._lock:
+                self.sent += 1
+                if self._closed:
+                    self._discard(conn)
+                else:
+                    self._idle.append((conn, time.monotonic()))
+        finally:
+            self._slots.release()
+
+    def close(self):
+        """QUIT every idle connection (ones in use are closed when returned)"""
+        with self._lock:
+            self._closed = True
+            idle, self._idle = self._idle, []
+        for conn, _ in idle:
+            try:
+                conn.quit()
+            except Exception:
+                self._discard(conn)
+
+
+# ==================== DEBUG SERVER ====================
+class _SmtpHandler(socketserver.StreamRequestHandler):
+    """One SMTP session (no auth, no TLS - accepts every message)"""
+
+    def reply(self, line):
+        self.wfile.write(line.encode("ascii") + b"\r\n")
+
+    def handle(self):
+        server = self.server.debug
+        if server.connect_latency:
+            time.sleep(server.connect_latency)  # e.g. a TLS handshake
+        with server._lock:
+            server.connections += 1
+        self.reply("220 localhost debug SMTP")
+        mail_from, rcpt_to = None, []
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            command = line.decode("ascii", "replace").strip()
+            verb = command[:4].upper()
+            if verb in ("HELO", "EHLO"):
+                self.reply("250 localhost")
+            elif verb == "MAIL":
+                mail_from, rcpt_to = command.split(":", 1)[1].strip(), []
+                self.reply("250 OK")
+            elif verb == "RCPT":
+                rcpt_to.append(command.split(":", 1)[1].strip())
+                self.reply("250 OK")
+            elif verb == "DATA":
+                self.reply("354 End data with <CR><LF>.<CR><LF>")
+                lines = []
+                while True:
+                    line = self.rfile.readline()
+                    if not line or line in (b".\r\n", b".\n"):
+                        break
+                    lines.append(line[1:] if line.startswith(b"..") else line)
+                if server.latency:
+                    time.sleep(server.latency)
+                server._received(mail_from, rcpt_to, b"".join(lines))
+                self.reply("250 OK queued")
+            elif verb in ("RSET", "NOOP"):
+                self.reply("250 OK")
+            elif verb == "QUIT":
+                self.reply("221 Bye")
+                return
+            else:
+                self.reply("502 Command not implemented")
+
+
+class _ThreadingServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class DebugSmtpServer:
+    """Local SMTP stand-in: messages are kept in .messages (newest `keep`)"""
+
+    def __init__(self, host="127.0.0.1", port=0, latency=0.0, connect_latency=0.0, keep=1000):
+        self.latency = latency                  # seconds per message (after DATA)
+        self.connect_latency = connect_latency  # seconds per new connection
+        self.messages = deque(maxlen=keep)      # email.message.EmailMessage, with .mail_from / .rcpt_to
+        self.connections = 0
+        self.received = 0
+
+        self._lock = threading.Lock()
+        self._arrived = threading.Condition(self._lock)
+        self._server = _ThreadingServer((host, port), _SmtpHandler)
+        self._server.debug = self
+        self.host, self.port = self._server.server_address[:2]
+        self._thread = None
+
+    def _received(self, mail_from, rcpt_to, data):
+        message = message_from_bytes(data, policy=DEFAULT_POLICY)
+        message.mail_from, message.rcpt_to = mail_from, rcpt_to
+        with self._arrived:
+            self.messages.append(message)
+            self.received += 1
+            self._arrived.notify_all()
+
+    def wait_for(self, count, timeout=None):
+        """Wait until `count` messages have been received in total. False on timeout."""
+        with self._arrived:
+            return self._arrived.wait_for(lambda: self.received >= count, timeout)
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._server.serve_forever, name="debug-smtp", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        if self._thread is not None:
+            self._server.shutdown()
+            self._thread.join(timeout=5)
+            self._thread = None
+        self._server.server_close()
@@ -0,0 +1,377 @@
+"""
+Stats Archive - Date-partitioned Parquet history of daily_stats.csv
+
+Closed days are moved out of the live CSV into a compressed, columnar
+archive with one directory per day:
+
+    stats_archive/date=2025-11-21/part-<hash>.parquet
+
+- compact() moves every row dated before today out of the CSV, which then
+  only holds the current day. Rows that arrive late for a closed day go in a
+  new part next to the others; rows a day's parts already hold are skipped,
+  so a compaction interrupted by a crash can simply run again.
+- read(start, end, columns) only opens the partitions in the date range
+  (partition pruning) and only reads the requested columns (projection);
+  a column a part lacks (older CSVs) is left out, not an error.
+- part files never change once written, so read results are cached per
+  part and a repeat read with nothing new costs next to nothing.
+- rollup() counts the archive for the dashboard (stats_rollup.py); each part
+  is counted once, when it first appears.
+
+Rows are stored normalized (normalize_stats), as the dashboard reads them.
+StatsHistory puts the archive and the live CSV (StatsTail) together, for
+both raw rows and rollups. compact() writes the parts before it rewrites
+the CSV, so for a moment a closed day is in both; StatsHistory leaves out
+CSV rows dated before today whose day the archive already holds.
+Needs pyarrow; without it compact() leaves the CSV alone and read() finds
+nothing.
+"""
+
+import csv
+import hashlib
+import io
+import os
+import sys
+import threading
+from collections import Counter
+from datetime import date, datetime
+
+import pandas as pd
+
+from stats_loader import StatsTail, normalize_stats
+from stats_rollup import SOURCE_COLUMNS, Rollup, SplitRollup, StatsRollup, rollup
+
+# Parquet support (optional - the CSV keeps all history without it)
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    ARROW_AVAILABLE = True
+except ImportError:
+    ARROW_AVAILABLE = False
+
+
+class StatsArchive:
+    """Date-partitioned Parquet archive of stats rows"""
+
+    def __init__(self, root, compression="zstd", on_error=None):
+        self.root = root
+        self.compression = compression
+        self.on_error = on_error
+
+        self._lock = threading.Lock()
+        self._parts = {}     # (path, columns) -> pyarrow Table
+        self._combined = {}  # (start, end, columns) -> (part paths, DataFrame)
+        self._rollup = ((), None)  # (part paths counted, Rollup)
+        self.parts_read = 0  # part files opened, for benchmarks / diagnostics
+
+    # ---------- reading ----------
+    def partitions(self):
+        """Archived days (datetime.date), oldest first"""
+        try:
+            names = os.listdir(self.root)
+        except FileNotFoundError:
+            return []
+        days = []
+        for name in names:
+            if name.startswith("date="):
+                try:
+                    days.append(date.fromisoformat(name[5:]))
+                except ValueError:
+                    pass
+        return sorted(days)
+
+    def _all_part_paths(self):
+        return tuple(path for day in self.partitions() for path in self._part_paths(day))
+
+    def _part_paths(self, day):
+        folder = os.path.join(self.root, f"date={day.isoformat()}")
+        try:
+            return sorted(os.path.join(folder, n) for n in os.listdir(folder) if n.endswith(".parquet"))
+        except FileNotFoundError:
+            return []
+
+    def _read_part(self, path, columns):
+        key = (path, columns)
+        table = self._parts.get(key)
+        if table is None:
+            part = pq.ParquetFile(path)
+            names = part.schema_arrow.names  # older parts may lack Sender / Risk Level
+            table = part.read(columns=[c for c in columns if c in names] if columns else None)
+            self._parts[key] = table
+            self.parts_read += 1
+        return table
+
+    def read(self, start=None, end=None, columns=None):
+        """
+        Archived rows dated start..end (dates, inclusive; None: unbounded),
+        only the given columns. None if there are none (or no pyarrow).
+        Treat the frame as read-only - it is shared between calls.
+        """
+        if not ARROW_AVAILABLE:
+            return None
+        start = pd.Timestamp(start).date() if start is not None else None
+        end = pd.Timestamp(end).date() if end is not None else None
+        columns = tuple(columns) if columns else None
+        with self._lock:
+            paths = tuple(
+                path
+                for day in self.partitions()
+                if (start is None or day >= start) and (end is None or day <= end)
+                for path in self._part_paths(day)
+            )
+            key = (start, end, columns)
+            cached = self._combined.get(key)
+            if cached and cached[0] == paths:
+                return cached[1]
+            try:
+                tables = [self._read_part(path, columns) for path in paths]
+                # One conversion for the whole range - Arrow concatenation does not copy
+                frame = pa.concat_tables(tables, promote_options="default").to_pandas() if tables else None
+            except Exception as e:
+                self._error(f"Error reading stats archive: {e}")
+                return None
+            self._combined[key] = (paths, frame)
+            # Parts no longer in any cached range (e.g. replaced) are dropped
+            live = {p for ps, _ in self._combined.values() for p in ps}
+            for part_key in [k for k in self._parts if k[0] not in live]:
+                del self._parts[part_key]
+            return frame
+
+    def rollup(self):
+        """
+        Counts of every archived row (a Rollup; None if there are none). Only
+        parts added since the last call are read and counted.
+        """
+        if not ARROW_AVAILABLE:
+            return None
+        with self._lock:
+            paths = self._all_part_paths()
+            counted_paths, counted = self._rollup
+            if paths == counted_paths:
+                return counted
+            if counted is not None and set(counted_paths) <= set(paths):
+                done = set(counted_paths)
+                new = [p for p in paths if p not in done]
+            else:
+                counted, new = None, list(paths)  # a part went away - count again
+            try:
+                tables = []
+                for path in new:
+                    part = pq.ParquetFile(path)
+                    tables.append(part.read(columns=[c for c in SOURCE_COLUMNS if c in part.schema_arrow.names]))
+                table = rollup(pa.concat_tables(tables, promote_options="default").to_pandas()) if tables else None
+            except Exception as e:
+                self._error(f"Error counting stats archive: {e}")
+                return self._rollup[1]
+            if table is not None:
+                counted = Rollup(table) if counted is None else counted.extend(table)
+            self._rollup = (paths, counted)
+            return counted
+
+    # ---------- compaction ----------
+    @staticmethod
+    def _row_hashes(frame):
+        # Rendered as text first, so the hash does not depend on how the dtypes came back from Parquet
+        return pd.util.hash_pandas_object(frame.astype(str), index=False).to_numpy()
+
+    def write_day(self, day, frame):
+        """
+        Add one closed day's rows as a new part, skipping rows its parts
+        already hold. Returns the path written, or None if nothing was new.
+        """
+        folder = os.path.join(self.root, f"date={day.isoformat()}")
+        os.makedirs(folder, exist_ok=True)
+        existing = [pq.read_table(p).to_pandas() for p in self._part_paths(day)]
+        if existing:
+            archived = Counter(self._row_hashes(pd.concat(existing, ignore_index=True)[list(frame.columns)]))
+            new = []
+            for h in self._row_hashes(frame):
+                new.append(archived[h] == 0)
+                if archived[h]:
+                    archived[h] -= 1
+            frame = frame[new]
+            if frame.empty:
+                return None
+        digest = hashlib.blake2b(self._row_hashes(frame).tobytes(), digest_size=8).hexdigest()
+        path = os.path.join(folder, f"part-{digest}.parquet")
+        tmp = path + ".tmp"
+        pq.write_table(pa.Table.from_pandas(frame, preserve_index=False), tmp, compression=self.compression)
+        os.replace(tmp, path)
+        return path
+
+    def compact(self, csv_path, today=None):
+        """
+        Move the rows dated before today from the CSV into the archive; the
+        CSV is rewritten with the rest (today's rows, and any whose date
+        cannot be read). Nothing may append to the CSV meanwhile - in the
+        bot, run it inside StatsWriter.exclusive(). Returns rows moved, or
+        None if it failed (reported through on_error) - run it again.
+
+        Crash-safe: parts are written first, then the CSV is replaced, and
+        rows a day's parts hold are never archived twice. Between the two,
+        the moved rows are in both places - StatsHistory reads each once.
+        """
+        if not ARROW_AVAILABLE:
+            return 0
+        today = pd.Timestamp(today or date.today()).normalize()
+        try:
+            raw = pd.read_csv(csv_path, dtype=str, keep_default_na=False)
+        except FileNotFoundError:
+            return 0
+        except Exception as e:
+            self._error(f"Error reading {csv_path} for compaction: {e}")
+            return None
+
+        rows = normalize_stats(raw.mask(raw == ''))  # empty fields read as missing, as the dashboard reads them
+        closed = rows[rows['Date'] < today]
+        if closed.empty:
+            return 0
+        try:
+            for day, frame in closed.groupby('Date', sort=True):
+                self.write_day(day.date(), frame.reset_index(drop=True))
+        except Exception as e:
+            self._error(f"Error writing stats archive: {e}")
+            return None
+
+        # Everything else stays in the live CSV, exactly as it was written
+        keep = raw.drop(index=closed.index)
+        buf = io.StringIO(newline='')
+        writer = csv.writer(buf)
+        writer.writerow(list(raw.columns))
+        writer.writerows(keep.itertuples(index=False, name=None))
+        tmp = csv_path + ".compacting"
+        try:
+            with open(tmp, 'w', newline='', encoding='utf-8') as f:
+                f.write(buf.getvalue())
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp, csv_path)
+        except Exception as e:
+            self._error(f"Error rewriting {csv_path} after compaction (rows are archived and will not be duplicated): {e}")
+            return None
+        return len(closed)
+
+    def _error(self, msg):
+        if self.on_error:
+            self.on_error(msg)
+
+
+def _drop_days(frame, days):
+    """frame without the rows dated on one of days (the same frame if there are none)"""
+    if frame is None or not days:
+        return frame
+    drop = frame['Date'].isin(pd.to_datetime(list(days)))
+    return frame[~drop] if drop.any() else frame
+
+
+class StatsHistory:
+    """Archive plus live CSV as one frame - read with partition pruning and projection"""
+
+    def __init__(self, csv_path, archive_root, on_error=None):
+        self.tail = StatsTail(csv_path)
+        self.archive = StatsArchive(archive_root, on_error=on_error)
+        self._lock = threading.Lock()
+        self._memo = {}  # (since, until, columns) -> (archived frame, live frame, archived days, result)
+        self._live = (None, 0, None)  # (tail full_loads, rows counted, SplitRollup) of the live CSV
+        self._live_days = (None, None, set())  # (live frame, today, its days before today)
+        self._rollup = (None, None, (), StatsRollup())  # (archive Rollup, live SplitRollup, archived days, combined)
+
+    def _archived_days(self, live, today):
+        """
+        Days before today that are both in the live CSV and in the archive -
+        rows a running compact() has archived but not yet cut from the CSV.
+        Call before reading the archive: parts only ever get added, so every
+        day returned is in what is read next.
+        """
+        if not ARROW_AVAILABLE or live is None or not len(live):
+            return ()
+        seen, seen_today, days = self._live_days
+        if seen is not live or seen_today != today:
+            dates = live['Date']
+            days = set(dates[dates < today].dropna().dt.date.unique())
+            self._live_days = (live, today, days)
+        if not days:
+            return ()
+        return tuple(sorted(d for d in days & set(self.archive.partitions()) if self.archive._part_paths(d)))
+
+    def read(self, since=None, until=None, columns=None):
+        """
+        Rows dated since..until (inclusive; None: unbounded), only the given
+        columns (None: all) - archive partitions outside the range are never
+        opened. None if there are no rows at all. Read-only, like StatsTail's.
+        """
+        since = pd.Timestamp(since).normalize() if since is not None else None
+        until = pd.Timestamp(until).normalize() if until is not None else None
+        columns = list(columns) if columns else None
+        live = self.tail.read()
+        days = self._archived_days(live, pd.Timestamp.now().normalize())
+        archived = self.archive.read(start=since, end=until, columns=columns)
+        key = (since, until, tuple(columns) if columns else None)
+        with self._lock:
+            memo = self._memo.get(key)
+            if memo and memo[0] is archived and memo[1] is live and memo[2] == days:
+                return memo[3]  # nothing new in either
+
+            recent = _drop_days(live, days)  # mid-compaction: the archive's copy counts
+            if recent is not None and since is not None:
+                recent = recent[recent['Date'] >= since]
+            if recent is not None and until is not None:
+                recent = recent[recent['Date'] <= until]
+            if recent is not None and columns:
+                recent = recent.reindex(columns=columns)  # a column older CSVs lack reads as missing
+            frames = [f for f in (archived, recent) if f is not None and len(f)]
+            if len(frames) > 1:
+                result = pd.concat(frames, ignore_index=True)
+            elif frames:
+                result = frames[0]
+            else:
+                result = recent if recent is not None else archived
+            if result is not None and columns and list(result.columns) != columns:
+                result = result.reindex(columns=columns)
+            self._memo[key] = (archived, live, days, result)
+            return result
+
+    def rollup(self):
+        """
+        All history counted by date, hour, assignee, sender and risk level (a
+        StatsRollup). Only rows appended to the CSV since the last call are
+        counted; a reloaded CSV (e.g. after compaction) is counted again.
+        """
+        live, loads = self.tail.snapshot()
+        today = pd.Timestamp.now().normalize()
+        days = self._archived_days(live, today)
+        archived = self.archive.rollup()
+        with self._lock:
+            seen_loads, seen_rows, counted = self._live
+            if live is None or not len(live):
+                counted = None
+            elif counted is None or loads != seen_loads or len(live) < seen_rows:
+                counted = SplitRollup.of(rollup(live), today)
+            elif len(live) > seen_rows or counted.today != today:
+                counted = counted.add(rollup(live.iloc[seen_rows:]), today)
+            self._live = (loads, len(live) if live is not None else 0, counted)
+
+            if self._rollup[0] is not archived or self._rollup[1] is not counted or self._rollup[2] != days:
+                parts = counted.parts if counted is not None else []
+                if days and counted.closed is not None:
+                    # Mid-compaction: the archive's copy of those days counts
+                    table = _drop_days(counted.closed.table, days)
+                    if table is not counted.closed.table:
+                        parts = [Rollup(table.reset_index(drop=True)), counted.current]
+                self._rollup = (archived, counted, days, StatsRollup(archived, *parts))
+            return self._rollup[3]
+
+
+# ==================== COMMAND LINE ====================
+# python stats_archive.py [daily_stats.csv] [stats_archive] - with the bot stopped
+# (the bot compacts by itself once a day)
+if __name__ == "__main__":
+    if not ARROW_AVAILABLE:
+        print("pyarrow is not installed - pip install pyarrow")
+        sys.exit(1)
+    csv_path = sys.argv[1] if len(sys.argv) > 1 else "daily_stats.csv"
+    archive = StatsArchive(sys.argv[2] if len(sys.argv) > 2 else "stats_archive", on_error=print)
+    moved = archive.compact(csv_path)
+    if moved is None:
+        sys.exit(1)
+    print(f"[{datetime.now():%Y-%m-%d %H:%M:%S}] Archived {moved} rows; {len(archive.partitions())} days in the archive")
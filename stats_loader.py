@@ -0,0 +1,198 @@
+"""
+Stats Loader - Incremental reader of daily_stats.csv for the dashboard
+
+The bot only ever appends to daily_stats.csv, so re-parsing the whole file
+on every dashboard refresh costs more and more as history accumulates.
+StatsTail remembers how far it has read and the frame parsed so far:
+
+- read() parses only the rows appended since the last call (nothing at all
+  if the file has not grown) and appends them to the cached frame
+- a row still being written (no newline yet) is left for the next read
+- the file is reloaded in full only when it was truncated, replaced or
+  rotated (size shrank, different file id, or the byte before the saved
+  offset is no longer a line end)
+- rows are normalized (normalize_stats) once, as they are read - Date and
+  DateTime are datetime64 columns
+
+The returned frame is shared between reruns and viewers - treat it as
+read-only (filtering and .copy() are fine).
+"""
+
+import io
+import os
+import threading
+
+import pandas as pd
+
+from stats_writer import STATS_HEADER
+
+
+def per_distinct(values, parse):
+    """
+    parse() run over the distinct values only, spread back over every row -
+    stats columns repeat a lot (a few hundred days, at most 86,400 times).
+    """
+    codes, distinct = pd.factorize(values)  # missing values get code -1 -> NaT
+    parsed = parse(pd.Series(distinct, dtype=object)).reset_index(drop=True)
+    return pd.Series(parsed.reindex(codes).to_numpy(), index=values.index)
+
+
+def _parse_dates(text):
+    text = text.str.strip()
+    dates = pd.to_datetime(text, format='%Y-%m-%d', errors='coerce')
+    left = dates.isna() & text.notna()
+    if left.any():
+        dates[left] = pd.to_datetime(text[left], format='%d/%m/%Y', errors='coerce')
+        left = dates.isna() & text.notna()
+    if left.any():
+        try:
+            dates[left] = pd.to_datetime(text[left], format='mixed', dayfirst=True, errors='coerce').dt.normalize()
+        except (TypeError, ValueError):
+            pass  # e.g. timezone-aware values - left unparsed
+    return dates
+
+
+def parse_dates(values):
+    """
+    Mixed-format date strings as datetime64 (NaT where unparseable), in
+    whole-column passes: YYYY-MM-DD first, then DD/MM/YYYY for the rest,
+    then pandas' day-first parsing for whatever is still left.
+    """
+    return per_distinct(values, _parse_dates)
+
+
+def _parse_times(text):
+    text = text.str.strip()
+    # H:MM has no seconds, which to_timedelta needs; values without a colon are not times
+    clock = text.str.replace(r'^(\d{1,2}:\d{1,2})$', r'\1:00', regex=True)
+    times = pd.to_timedelta(clock.where(clock.str.contains(':', na=False)), errors='coerce')
+    left = times.isna() & text.notna() & (text != '')
+    if left.any():
+        try:
+            # "9:05 PM", "0905", ... - whatever pandas reads as a time of day
+            clock = pd.to_datetime('1970-01-01 ' + text[left], format='mixed', errors='coerce')
+            times[left] = clock - pd.Timestamp('1970-01-01')
+        except (TypeError, ValueError):
+            pass
+    return times.where(times < pd.Timedelta(days=1))  # "25:00" is not a time of day
+
+
+def parse_times(values):
+    """
+    Times of day as timedelta64 (NaT where unparseable), in whole-column
+    passes: HH:MM:SS and H:MM first, then pandas' parsing for the rest.
+    """
+    return per_distinct(values, _parse_times)
+
+
+def normalize_stats(df):
+    """Normalized stats rows: Date and DateTime as datetime64, lowercase assignees"""
+    # Normalize date format - handle mixed formats
+    df['Date'] = parse_dates(df['Date'])
+
+    # Remove rows where date parsing failed
+    df = df[df['Date'].notna()].copy()
+
+    # Normalize email addresses to lowercase to prevent duplicates
+    df['Assigned To'] = df['Assigned To'].str.lower()
+
+    # Add datetime column for time-based analysis (NaT if the time is unreadable)
+    df['DateTime'] = df['Date'] + parse_times(df['Time'])
+    return df
+
+
+def complete_rows(data):
+    """Length of the complete CSV rows at the start of data (a newline outside quotes ends a row)"""
+    end = data.rfind(b"\n") + 1
+    # A newline inside a quoted field (odd number of quotes before it) does not end a row
+    while end and data.count(b'"', 0, end) % 2:
+        end = data.rfind(b"\n", 0, end - 1) + 1
+    return end
+
+
+class StatsTail:
+    """daily_stats.csv as a DataFrame, re-reading only newly appended rows"""
+
+    def __init__(self, path, normalize=normalize_stats):
+        self.path = path
+        self.normalize = normalize
+
+        self._lock = threading.Lock()
+        self._frame = None
+        self._columns = None
+        self._offset = 0       # bytes parsed so far (always at a row boundary)
+        self._file_id = None
+        self.full_loads = 0    # counters, for benchmarks / diagnostics
+        self.rows_parsed = 0
+
+    def read(self):
+        """Current frame, or None if the file does not exist"""
+        with self._lock:
+            return self._read()
+
+    def snapshot(self):
+        """
+        (frame, full_loads) as of one read - a later snapshot with the same
+        full_loads holds the same rows, with any new ones appended at the end
+        """
+        with self._lock:
+            return self._read(), self.full_loads
+
+    def _read(self):
+        try:
+            f = open(self.path, 'rb')
+        except FileNotFoundError:
+            self._frame, self._file_id = None, None
+            return None
+        with f:
+            st = os.fstat(f.fileno())
+            file_id = (st.st_dev, st.st_ino)
+            if self._frame is None or file_id != self._file_id or not self._still_appended(f, st.st_size):
+                self._load(f, file_id)
+            elif st.st_size > self._offset:
+                self._append(f)
+        return self._frame
+
+    def _still_appended(self, f, size):
+        """True if the file is the one read before, only grown since"""
+        if size < self._offset:
+            return False  # truncated
+        if self._offset == 0:
+            return True
+        f.seek(self._offset - 1)
+        return f.read(1) == b"\n"
+
+    def _parse(self, data, header):
+        frame = pd.read_csv(
+            io.BytesIO(data), dtype=str,
+            header=0 if header else None, names=None if header else self._columns
+        )
+        self.rows_parsed += len(frame)
+        return self.normalize(frame)
+
+    def _load(self, f, file_id):
+        """Parse the whole file"""
+        f.seek(0)
+        data = f.read()
+        end = complete_rows(data)
+        self.full_loads += 1
+        self._file_id = file_id
+        if not data[:end].strip():
+            self._columns, self._offset = list(STATS_HEADER), 0
+            self._frame = self.normalize(pd.DataFrame(columns=self._columns))
+            return
+        self._frame = self._parse(data[:end], header=True)
+        self._columns = [c for c in self._frame.columns if c != 'DateTime']
+        self._offset = end
+
+    def _append(self, f):
+        """Parse the rows appended since the last read"""
+        f.seek(self._offset)
+        data = f.read()
+        end = complete_rows(data)
+        if not end:
+            return  # only a partly written row so far
+        new = self._parse(data[:end], header=False)
+        self._offset += end
+        if len(new):
+            self._frame = pd.concat([self._frame, new], ignore_index=True)
@@ -0,0 +1,189 @@
+"""
+Stats Rollup - Pre-aggregated counts of stats rows for the dashboard
+
+The dashboard's charts all count rows - by day, hour, assignee, sender or
+risk level. Instead of grouping the raw rows again on every refresh, rows
+are counted once, as they are read, into a rollup table:
+
+    Date | Hour | Assigned To | Sender | Risk Level | Count
+
+- rollup(frame) counts a batch of normalized rows. Batches are appended,
+  never merged - the same key may appear in several batches and every query
+  sums, so adding rows costs O(new rows)
+- Rollup.counts(by, start, end, assigned_only) is a slice of the table summed
+  by the given keys, and Rollup.span(by) the first and last date per key.
+  A Rollup never changes once built, so results are memoized
+- SplitRollup counts rows that keep arriving in two Rollups, split at the
+  start of today: earlier days rarely change, so their memoized slices
+  survive, while new rows go into the small one for today
+- StatsRollup adds up the results of several rollups (the archive's, and the
+  live CSV's two), so a refresh with new rows only re-slices today
+
+Results are shared between reruns and viewers - treat them as read-only.
+"""
+
+import threading
+
+import pandas as pd
+
+ROLLUP_KEYS = ['Date', 'Hour', 'Assigned To', 'Sender', 'Risk Level']
+SOURCE_COLUMNS = ['Date', 'DateTime', 'Assigned To', 'Sender', 'Risk Level']  # what rollup() reads
+
+
+def rollup(frame):
+    """Row counts of normalized stats rows by ROLLUP_KEYS (a frame: keys + Count)"""
+    missing = pd.Series(pd.NA, index=frame.index, dtype=object)
+    keys = pd.DataFrame({
+        'Date': frame['Date'],
+        'Hour': frame['DateTime'].dt.hour.astype('Int8'),  # <NA> if the time was unreadable
+        'Assigned To': frame['Assigned To'],
+        'Sender': frame['Sender'] if 'Sender' in frame else missing,          # older CSVs
+        'Risk Level': frame['Risk Level'] if 'Risk Level' in frame else missing,
+    })
+    # dropna=False: rows with a missing key still count towards the other keys
+    return keys.groupby(ROLLUP_KEYS, dropna=False, sort=False).size().reset_index(name='Count')
+
+
+def _empty(by, columns=None):
+    index = pd.MultiIndex.from_arrays([[]] * len(by), names=list(by)) if len(by) > 1 else pd.Index([], name=by[0])
+    if columns:
+        return pd.DataFrame({c: pd.Series(dtype='datetime64[us]') for c in columns}, index=index)
+    return pd.Series([], index=index, dtype='int64', name='Count')
+
+
+def _key(by, start, end, assigned_only):
+    by = (by,) if isinstance(by, str) else tuple(by)
+    start = pd.Timestamp(start).normalize() if start is not None else None
+    end = pd.Timestamp(end).normalize() if end is not None else None
+    return by, start, end, bool(assigned_only)
+
+
+class Rollup:
+    """One rollup table (see rollup()), with memoized slices"""
+
+    def __init__(self, table):
+        self.table = table
+        self._memo = {}
+
+    def extend(self, table):
+        """A new Rollup with more counted rows appended"""
+        return Rollup(pd.concat([self.table, table], ignore_index=True))
+
+    def _rows(self, start, end, assigned_only):
+        table = self.table
+        mask = pd.Series(True, index=table.index)
+        if start is not None:
+            mask &= table['Date'] >= start
+        if end is not None:
+            mask &= table['Date'] <= end
+        if assigned_only:
+            mask &= table['Assigned To'] != 'completed'
+        return table[mask]
+
+    def counts(self, by, start=None, end=None, assigned_only=False):
+        """
+        Rows dated start..end (inclusive; None: unbounded) counted by the keys
+        in `by`, as a Series. Rows whose key is missing are left out, as
+        groupby does; assigned_only leaves out completions.
+        """
+        key = ('counts',) + _key(by, start, end, assigned_only)
+        result = self._memo.get(key)
+        if result is None:
+            by, start, end, assigned_only = key[1:]
+            result = self._rows(start, end, assigned_only).groupby(list(by))['Count'].sum()
+            self._memo[key] = result
+        return result
+
+    def span(self, by, assigned_only=False):
+        """First and last date (columns First, Last) of each key in `by`"""
+        key = ('span',) + _key(by, None, None, assigned_only)
+        result = self._memo.get(key)
+        if result is None:
+            by, _, _, assigned_only = key[1:]
+            result = self._rows(None, None, assigned_only).groupby(list(by))['Date'].agg(First='min', Last='max')
+            self._memo[key] = result
+        return result
+
+
+def _extend(counted, table):
+    if counted is None:
+        return Rollup(table.reset_index(drop=True))
+    return counted.extend(table)
+
+
+class SplitRollup:
+    """Counts of rows that keep arriving - days before `today` and today in separate Rollups"""
+
+    def __init__(self, closed, current, today):
+        self.closed = closed    # Rollup of the days before today (or None)
+        self.current = current  # Rollup of today (or None)
+        self.today = today
+
+    @classmethod
+    def of(cls, table, today):
+        return cls(None, None, today).add(table, today)
+
+    @property
+    def parts(self):
+        return [p for p in (self.closed, self.current) if p is not None]
+
+    def add(self, table, today=None):
+        """A new SplitRollup with a rollup() table of new rows added"""
+        today = pd.Timestamp(today or self.today).normalize()
+        closed, current = self.closed, self.current
+        if today != self.today and current is not None:
+            # A new day - what was today is split again
+            table, current = pd.concat([current.table, table], ignore_index=True), None
+        earlier = table['Date'] < today
+        if earlier.any():
+            closed = _extend(closed, table[earlier])  # late rows for a closed day (or the first load)
+        if not earlier.all():
+            current = _extend(current, table[~earlier])
+        return SplitRollup(closed, current, today)
+
+
+class StatsRollup:
+    """Several Rollups read as one - each part's slices are added up (counts) or merged (spans)"""
+
+    def __init__(self, *parts):
+        self.parts = [p for p in parts if p is not None]
+        self._lock = threading.Lock()
+        self._memo = {}
+
+    def _combine(self, key, per_part, combine, empty):
+        with self._lock:
+            result = self._memo.get(key)
+        if result is not None:
+            return result
+        results = [r for r in (per_part(p) for p in self.parts) if len(r)]
+        if not results:
+            result = empty
+        elif len(results) == 1:
+            result = results[0]
+        else:
+            result = combine(pd.concat(results))
+        with self._lock:
+            self._memo[key] = result
+        return result
+
+    def counts(self, by, start=None, end=None, assigned_only=False):
+        """Rollup.counts() over all parts"""
+        key = ('counts',) + _key(by, start, end, assigned_only)
+        by = key[1]
+        return self._combine(
+            key, lambda p: p.counts(by, start, end, assigned_only),
+            lambda r: r.groupby(level=list(by)).sum(), _empty(by)
+        )
+
+    def span(self, by, assigned_only=False):
+        """Rollup.span() over all parts"""
+        key = ('span',) + _key(by, None, None, assigned_only)
+        by = key[1]
+        return self._combine(
+            key, lambda p: p.span(by, assigned_only),
+            lambda r: pd.DataFrame({
+                'First': r['First'].groupby(level=list(by)).min(),
+                'Last': r['Last'].groupby(level=list(by)).max(),
+            }),
+            _empty(by, ['First', 'Last'])
+        )
@@ -0,0 +1,195 @@
+"""
+Stats Writer - Buffered group-commit writer for daily_stats.csv
+
+Rows are queued in memory and written in one batch by a background thread,
+instead of opening, appending to and closing the CSV for every event.
+
+- a batch is written when batch_size rows are waiting, or flush_interval
+  seconds after the first waiting row - whichever comes first
+- the file stays open between batches; it is reopened if it is deleted or
+  replaced (e.g. archived) while the bot runs
+- durability "flush" hands each batch to the OS (survives a bot crash);
+  "fsync" also forces it to disk (survives a power cut), at a cost per batch
+- stop() writes whatever is still queued
+- exclusive() pauses writing while something else rewrites the file
+"""
+
+import csv
+import io
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+STATS_HEADER = ['Date', 'Time', 'Subject', 'Assigned To', 'Sender', 'Risk Level']
+DURABILITY_LEVELS = ("flush", "fsync")
+
+
+def stats_row(subject, assigned_to, sender="unknown", risk_level="normal", when=None):
+    """One daily_stats.csv row, timestamped `when` (default now)"""
+    when = when or datetime.now()
+    return [when.strftime('%Y-%m-%d'), when.strftime('%H:%M:%S'), subject, assigned_to, sender, risk_level]
+
+
+def read_rows(path, offset=0):
+    """Rows of a stats CSV from byte offset on (header skipped); [] if missing"""
+    try:
+        with open(path, 'r', newline='', encoding='utf-8') as f:
+            if offset > os.path.getsize(path):
+                offset = 0  # replaced since the offset was taken
+            f.seek(offset)
+            rows = list(csv.reader(f))
+    except FileNotFoundError:
+        return []
+    return rows[1:] if offset == 0 and rows and rows[0] == STATS_HEADER else rows
+
+
+class StatsWriter:
+    """Appends stats rows to a CSV in batches"""
+
+    def __init__(self, path, header=STATS_HEADER, batch_size=50, flush_interval=1.0,
+                 durability="flush", on_error=None):
+        if durability not in DURABILITY_LEVELS:
+            raise ValueError(f"durability must be one of {DURABILITY_LEVELS}, got {durability!r}")
+        self.path = path
+        self.header = header
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.durability = durability
+        self.on_error = on_error
+
+        self._lock = threading.Lock()        # guards the queue
+        self._write_lock = threading.Lock()  # one batch written at a time
+        self._pending = []
+        self._first_pending = None
+        self._file = None
+        self._file_id = None
+
+        self._wake = threading.Event()
+        self._stopping = False
+        self._thread = None
+
+    # ---------- queueing ----------
+    def append(self, subject, assigned_to, sender="unknown", risk_level="normal"):
+        """Queue one stats row, timestamped now"""
+        self.append_row(stats_row(subject, assigned_to, sender, risk_level))
+
+    def append_row(self, row):
+        """Queue a pre-built row"""
+        with self._lock:
+            if not self._pending:
+                self._first_pending = time.monotonic()
+            self._pending.append(row)
+            full = len(self._pending) >= self.batch_size
+
+        if self._thread is None:
+            self.flush()  # no background writer running - write now
+        elif full:
+            self._wake.set()
+
+    def pending(self):
+        """Number of rows queued but not yet written"""
+        with self._lock:
+            return len(self._pending)
+
+    # ---------- writing ----------
+    def _open(self):
+        """Open (or reopen) the CSV for appending, writing the header if it is new"""
+        if self._file is not None:
+            try:
+                st = os.stat(self.path)
+                if (st.st_dev, st.st_ino) == self._file_id:
+                    return self._file
+            except OSError:
+                pass
+            self._close()
+
+        is_new = not os.path.isfile(self.path) or os.path.getsize(self.path) == 0
+        f = open(self.path, 'a', newline='', encoding='utf-8')
+        if is_new and self.header:
+            csv.writer(f).writerow(self.header)
+        st = os.fstat(f.fileno())
+        self._file, self._file_id = f, (st.st_dev, st.st_ino)
+        return f
+
+    def _close(self):
+        if self._file is not None:
+            try:
+                self._file.close()
+            except Exception:
+                pass
+            self._file, self._file_id = None, None
+
+    def flush(self):
+        """Write all queued rows now (one write, one flush, optionally one fsync)"""
+        with self._write_lock:
+            with self._lock:
+                if not self._pending:
+                    return 0
+                batch, self._pending = self._pending, []
+                self._first_pending = None
+
+            buf = io.StringIO(newline='')
+            csv.writer(buf).writerows(batch)
+            try:
+                f = self._open()
+                f.write(buf.getvalue())
+                f.flush()
+                if self.durability == "fsync":
+                    os.fsync(f.fileno())
+            except Exception as e:
+                self._close()
+                with self._lock:  # keep the rows for the next attempt
+                    self._pending[:0] = batch
+                    self._first_pending = self._first_pending or time.monotonic()
+                self._error(f"Error writing stats: {e}")
+                return 0
+            return len(batch)
+
+    def _due(self):
+        with self._lock:
+            if not self._pending:
+                return False
+            return (len(self._pending) >= self.batch_size
+                    or time.monotonic() - self._first_pending >= self.flush_interval)
+
+    def _run(self):
+        while not self._stopping:
+            self._wake.wait(self.flush_interval / 2)
+            self._wake.clear()
+            if self._due():
+                self.flush()
+
+    def start(self):
+        """Start the background batch writer"""
+        if self._thread is None:
+            self._stopping = False
+            self._thread = threading.Thread(target=self._run, name="stats-writer", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        """Stop the background writer, write any queued rows and close the file"""
+        if self._thread is not None:
+            self._stopping = True
+            self._wake.set()
+            self._thread.join(timeout=5)
+            self._thread = None
+        self.flush()
+        with self._write_lock:
+            self._close()
+
+    @contextmanager
+    def exclusive(self):
+        """
+        Write out the queued rows, then hold off writing (rows are queued
+        meanwhile) and close the file - for rewriting it, e.g. compaction
+        """
+        self.flush()
+        with self._write_lock:
+            self._close()
+            yield
+
+    def _error(self, msg):
+        if self.on_error:
+            self.on_error(msg)
@@ -0,0 +1,134 @@
+"""
+Timer Wheel - Hierarchical hashed timer wheel for SLA deadlines
+
+Timers live in `levels` wheels of `slots` slots each. Level 0 has one slot
+per tick; every level up covers `slots` times the span of the one below
+(defaults: 0.1 s ticks, 4 x 64 slots - level 0 spans 6.4 s, level 3 about
+19 days). A timer goes in the lowest level whose span reaches its deadline
+and cascades down as the wheel turns:
+
+- schedule / cancel / re-schedule cost O(1) (each slot is a dict)
+- advance(now) pops every timer whose deadline has passed; each timer is
+  touched at most once per level on its way down
+- deadlines keep full precision - a timer fires on the first tick at or
+  after its deadline, so at most one tick late
+- next_expiry() is a cheap lower bound on the next deadline, for sleeping
+  until then instead of polling
+
+Times are plain floats (seconds) on whatever clock the caller uses.
+"""
+
+import math
+
+
+class TimerWheel:
+    """Keys scheduled at deadlines; advance(now) returns the expired ones"""
+
+    def __init__(self, tick=0.1, slots=64, levels=4, start=0.0):
+        self.tick = tick
+        self.slots = slots
+        self.levels = levels
+        self._bits = slots.bit_length() - 1
+        if 1 << self._bits != slots:
+            raise ValueError(f"slots must be a power of two, got {slots}")
+        self._wheels = [[{} for _ in range(slots)] for _ in range(levels)]
+        self._where = {}   # key -> (level, slot)
+        self._origin = start
+        self._slack = 1e-5 / tick  # absorbs float / microsecond rounding of times, in ticks
+        self._now = 0      # current tick (relative to origin)
+
+    def _ticks(self, when):
+        """First tick at or after `when`"""
+        return math.ceil((when - self._origin) / self.tick - self._slack)
+
+    def _place(self, key, when):
+        ticks = max(self._ticks(when), self._now + 1)
+        delta = ticks - self._now
+        level = 0
+        while level < self.levels - 1 and delta >= self.slots << (self._bits * level):
+            level += 1
+        # Beyond the top level's span the timer lands early and is re-placed then
+        slot = (ticks >> (self._bits * level)) & (self.slots - 1)
+        self._wheels[level][slot][key] = when
+        self._where[key] = (level, slot)
+
+    # ---------- public ----------
+    def schedule(self, key, when):
+        """(Re)schedule key to expire at `when` - O(1)"""
+        self.cancel(key)
+        self._place(key, when)
+
+    def cancel(self, key):
+        """Forget key's timer - O(1). False if it had none"""
+        where = self._where.pop(key, None)
+        if where is None:
+            return False
+        level, slot = where
+        del self._wheels[level][slot][key]
+        return True
+
+    def advance(self, now):
+        """Turn the wheel to `now`; [(key, deadline)] of the timers that expired, earliest first"""
+        target = math.floor((now - self._origin) / self.tick + self._slack)
+        expired = []
+        mask = self.slots - 1
+        while self._now < target:
+            # Skip the ticks where nothing expires or cascades
+            tick = self._next_tick()
+            if tick is None or tick > target:
+                self._now = target
+                break
+            self._now = tick
+            # Cascade: when a lower wheel wraps, spread the next slot of the wheel above
+            for level in range(1, self.levels):
+                if tick & ((1 << (self._bits * level)) - 1):
+                    break
+                bucket = self._wheels[level][(tick >> (self._bits * level)) & mask]
+                if bucket:
+                    timers = list(bucket.items())
+                    bucket.clear()
+                    for key, when in timers:
+                        del self._where[key]
+                        if self._ticks(when) > tick:
+                            self._place(key, when)
+                        else:
+                            expired.append((key, when))
+            bucket = self._wheels[0][tick & mask]
+            if bucket:
+                timers = list(bucket.items())
+                bucket.clear()
+                for key, when in timers:
+                    del self._where[key]
+                    if self._ticks(when) > tick:
+                        self._place(key, when)  # wrapped around from beyond the top level
+                    else:
+                        expired.append((key, when))
+        expired.sort(key=lambda e: e[1])
+        return expired
+
+    def _next_tick(self):
+        """Next tick with timers to expire (level 0) or cascade (above), or None"""
+        if not self._where:
+            return None
+        mask = self.slots - 1
+        ticks = []
+        for level in range(self.levels):
+            shift = self._bits * level
+            wheel = self._wheels[level]
+            base = self._now >> shift
+            for i in range(1, self.slots + 1):
+                if wheel[(base + i) & mask]:
+                    ticks.append((base + i) << shift)  # start of that slot's span
+                    break
+        return min(ticks)
+
+    def next_expiry(self):
+        """A time at or before the next timer fires (None if nothing is scheduled)"""
+        tick = self._next_tick()
+        return None if tick is None else self._origin + tick * self.tick
+
+    def __len__(self):
+        return len(self._where)
+
+    def __contains__(self, key):
+        return key in self._where